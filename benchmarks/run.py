@@ -0,0 +1,481 @@
+#
+# Copyright 2025 The TadoLocal and AmpScm contributors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Tado Local benchmark suite.
+
+Runs reproducible scenarios against the simulated bridge and fake cloud (no
+hardware or network) and writes machine-readable JSON results:
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --quick --compare baseline.json
+
+Scenarios:
+    handle_change   Events per second through TadoLocalAPI.handle_change
+    sse_fanout      Delivery latency from a bridge event to N SSE client queues
+    http            /zones and /devices latency percentiles
+    history         Range queries on a synthetic device_state_history table
+    startup         Cold start (import, state load, initialize) in a fresh process
+
+Metric names ending in ``_per_sec`` are higher-is-better, all others
+(``_ms``) lower-is-better; --compare uses that to flag regressions.
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from tado_local.__version__ import __version__  # noqa: E402
+
+FULL = {
+    'zones': 100,
+    'valves_per_zone': 3,
+    'events': 20000,
+    'sse_clients': 100,
+    'sse_events': 500,
+    'http_requests': 1000,
+    'history_rows': 10_000_000,
+    'history_devices': 100,
+    'history_queries': 200,
+    'startup_runs': 5,
+}
+
+QUICK = {
+    'zones': 10,
+    'valves_per_zone': 2,
+    'events': 2000,
+    'sse_clients': 20,
+    'sse_events': 100,
+    'http_requests': 200,
+    'history_rows': 200_000,
+    'history_devices': 20,
+    'history_queries': 50,
+    'startup_runs': 2,
+}
+
+
+def percentiles(samples_s: List[float]) -> Dict[str, float]:
+    """Summarize latency samples (seconds) as p50/p90/p99/max in milliseconds."""
+    ordered = sorted(samples_s)
+
+    def pick(fraction: float) -> float:
+        index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+        return round(ordered[index] * 1000, 4)
+
+    return {
+        'p50_ms': pick(0.50),
+        'p90_ms': pick(0.90),
+        'p99_ms': pick(0.99),
+        'max_ms': round(ordered[-1] * 1000, 4),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 4),
+    }
+
+
+async def build_api(db_path: str, zones: int, valves_per_zone: int, latency: float = 0.0):
+    """Create a TadoLocalAPI with cloud zone data and an initialized simulated bridge."""
+    from tado_local.api import TadoLocalAPI
+    from tado_local.fake_cloud import FakeTadoCloud
+    from tado_local.simulator import SimulatedPairing
+    from tado_local.sync import TadoCloudSync
+
+    tado_api = TadoLocalAPI(db_path)
+    cloud = FakeTadoCloud.generate(num_zones=zones, valves_per_zone=valves_per_zone, seed=1)
+    sync = TadoCloudSync(db_path, tado_api.state_manager)
+    sync.sync_home(cloud.home)
+    sync.sync_zones(cloud.zones, cloud.home_id)
+    sync.sync_device_list(cloud.device_list, cloud.home_id)
+
+    pairing = SimulatedPairing.generate(num_zones=zones, valves_per_zone=valves_per_zone, latency=latency, seed=1)
+    await tado_api.initialize(pairing, config_num=pairing.config_num)
+    return tado_api, pairing
+
+
+def sensor_keys(tado_api) -> List[tuple]:
+    """(aid, iid) of every CurrentTemperature characteristic."""
+    return [(aid, iid) for (aid, name), iid in tado_api.characteristic_iid_map.items() if name == 'CurrentTemperature']
+
+
+# ----------------------------------------------------------------------------
+# Scenarios
+# ----------------------------------------------------------------------------
+
+async def bench_handle_change(workdir: Path, cfg: Dict[str, Any]) -> Dict[str, Any]:
+    tado_api, pairing = await build_api(str(workdir / 'handle_change.db'), cfg['zones'], cfg['valves_per_zone'])
+    try:
+        keys = sensor_keys(tado_api)
+        rnd = random.Random(1)
+        start = time.perf_counter()
+        for n in range(cfg['events']):
+            aid, iid = keys[n % len(keys)]
+            await tado_api.handle_change(aid, iid, {'value': round(rnd.uniform(15, 25), 1)}, source="EVENT")
+        elapsed = time.perf_counter() - start
+        return {
+            'events': cfg['events'],
+            'events_per_sec': round(cfg['events'] / elapsed, 1),
+            'per_event_ms': round(elapsed / cfg['events'] * 1000, 4),
+        }
+    finally:
+        await tado_api.cleanup()
+
+
+async def bench_sse_fanout(workdir: Path, cfg: Dict[str, Any]) -> Dict[str, Any]:
+    tado_api, pairing = await build_api(str(workdir / 'sse.db'), cfg['zones'], cfg['valves_per_zone'])
+    clients = cfg['sse_clients']
+    latencies: List[float] = []
+    round_start = 0.0
+    round_id = 0
+    seen: Dict[int, int] = {}
+    round_done = asyncio.Event()
+
+    async def consume(index: int, queue: asyncio.Queue):
+        while True:
+            message = await queue.get()
+            if message is None:
+                return
+            if seen.get(index) != round_id:
+                seen[index] = round_id
+                latencies.append(time.perf_counter() - round_start)
+                if sum(1 for r in seen.values() if r == round_id) == clients:
+                    round_done.set()
+
+    queues = [asyncio.Queue() for _ in range(clients)]
+    tado_api.event_listeners.extend(queues)
+    consumers = [asyncio.create_task(consume(i, q)) for i, q in enumerate(queues)]
+    try:
+        keys = sensor_keys(tado_api)
+        rnd = random.Random(2)
+        for n in range(cfg['sse_events']):
+            aid, iid = keys[n % len(keys)]
+            round_id = n + 1
+            round_done.clear()
+            round_start = time.perf_counter()
+            pairing.emit(aid, iid, round(rnd.uniform(15, 25), 1) + n * 1e-6)
+            await asyncio.wait_for(round_done.wait(), timeout=10)
+            # Let trailing zone events drain before the next round
+            await asyncio.sleep(0)
+        result = {'clients': clients, 'events': cfg['sse_events']}
+        result.update(percentiles(latencies))
+        return result
+    finally:
+        await tado_api.cleanup()
+        await asyncio.gather(*consumers, return_exceptions=True)
+
+
+async def asgi_get(app, path: str) -> tuple:
+    """Perform a GET against an ASGI app in-process; returns (status, body)."""
+    status = 0
+    body = bytearray()
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+        elif message['type'] == 'http.response.body':
+            body.extend(message.get('body', b''))
+
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'',
+        'root_path': '', 'headers': [(b'host', b'localhost')], 'client': ('127.0.0.1', 1), 'server': ('localhost', 80),
+    }
+    await app(scope, receive, send)
+    return status, bytes(body)
+
+
+async def bench_http(workdir: Path, cfg: Dict[str, Any]) -> Dict[str, Any]:
+    from tado_local.routes import create_app, register_routes
+
+    tado_api, pairing = await build_api(str(workdir / 'http.db'), cfg['zones'], cfg['valves_per_zone'])
+    try:
+        app = create_app()
+        register_routes(app, lambda: tado_api)
+        results: Dict[str, Any] = {'zones': len(tado_api.state_manager.zone_cache),
+                                   'devices': len(tado_api.state_manager.device_info_cache)}
+        for path in ('/zones', '/devices'):
+            status, body = await asgi_get(app, path)
+            if status != 200:
+                raise RuntimeError(f"GET {path} returned {status}: {body[:200]!r}")
+            samples = []
+            for _ in range(cfg['http_requests']):
+                start = time.perf_counter()
+                await asgi_get(app, path)
+                samples.append(time.perf_counter() - start)
+            name = path.strip('/')
+            for metric, value in percentiles(samples).items():
+                results[f'{name}_{metric}'] = value
+            results[f'{name}_bytes'] = len(body)
+        return results
+    finally:
+        await tado_api.cleanup()
+
+
+def build_history_db(db_path: Path, rows: int, devices: int) -> None:
+    """Create (or reuse) a database with `rows` synthetic 10-second history buckets."""
+    from tado_local.database import ensure_schema_and_migrate
+
+    if db_path.exists():
+        conn = sqlite3.connect(db_path)
+        try:
+            if conn.execute("SELECT COUNT(*) FROM device_state_history").fetchone()[0] == rows:
+                return
+        except sqlite3.Error:
+            pass
+        finally:
+            conn.close()
+        db_path.unlink()
+
+    ensure_schema_and_migrate(str(db_path))
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    with conn:
+        conn.executemany("INSERT INTO devices (device_id, serial_number, device_type) VALUES (?, ?, 'radiator_valve')",
+                         ((d, f"VA{d:010d}") for d in range(1, devices + 1)))
+
+    per_device = rows // devices
+    start = datetime.datetime(2025, 1, 1)
+    rnd = random.Random(3)
+
+    def generate():
+        for device_id in range(1, devices + 1):
+            for n in range(per_device):
+                bucket = (start + datetime.timedelta(seconds=10 * n)).strftime('%Y%m%d%H%M%S')
+                yield (device_id, bucket, round(18 + rnd.random() * 4, 1), 20.0, n % 2, 1, 50.0, n % 100)
+
+    with conn:
+        conn.executemany("""
+            INSERT INTO device_state_history (device_id, timestamp_bucket, current_temperature, target_temperature,
+                current_heating_cooling_state, target_heating_cooling_state, humidity, valve_position)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, generate())
+    conn.close()
+
+
+async def bench_history(workdir: Path, cfg: Dict[str, Any]) -> Dict[str, Any]:
+    from tado_local.state import DeviceStateManager
+
+    rows = cfg['history_rows'] - cfg['history_rows'] % cfg['history_devices']
+    db_path = workdir / f"history_{rows}.db"
+    build_start = time.perf_counter()
+    build_history_db(db_path, rows, cfg['history_devices'])
+    build_s = time.perf_counter() - build_start
+
+    manager = DeviceStateManager(str(db_path))
+    span_s = (rows // cfg['history_devices']) * 10
+    origin = datetime.datetime(2025, 1, 1).timestamp()
+    rnd = random.Random(4)
+
+    results: Dict[str, Any] = {'rows': rows, 'build_s': round(build_s, 1)}
+    for label, window_s, limit in (('hour', 3600, 360), ('day', 86400, 1000)):
+        samples = []
+        for _ in range(cfg['history_queries']):
+            device_id = rnd.randint(1, cfg['history_devices'])
+            begin = origin + rnd.uniform(0, max(0, span_s - window_s))
+            start = time.perf_counter()
+            manager.get_device_history(device_id, start_time=begin, end_time=begin + window_s, limit=limit)
+            samples.append(time.perf_counter() - start)
+        for metric, value in percentiles(samples).items():
+            results[f'{label}_{metric}'] = value
+    return results
+
+
+STARTUP_CHILD = r"""
+import asyncio, json, logging, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+from tado_local.api import TadoLocalAPI
+from tado_local.routes import create_app, register_routes
+from tado_local.simulator import SimulatedPairing
+t_import = time.perf_counter()
+logging.disable(logging.CRITICAL)
+
+async def main():
+    api = TadoLocalAPI(sys.argv[2])
+    t_state = time.perf_counter()
+    app = create_app()
+    register_routes(app, lambda: api)
+    t_serve = time.perf_counter()  # HTTP can start here (persisted state, flagged stale)
+    pairing = SimulatedPairing.generate(num_zones=int(sys.argv[3]), valves_per_zone=int(sys.argv[4]), seed=1)
+    await api.initialize(pairing, config_num=pairing.config_num)
+    t_ready = time.perf_counter()
+    await api.cleanup()
+    return t_state, t_serve, t_ready
+
+t_state, t_serve, t_ready = asyncio.run(main())
+print(json.dumps({'import_ms': (t_import - t0) * 1000, 'state_load_ms': (t_state - t_import) * 1000,
+                  'serve_ms': (t_serve - t0) * 1000, 'initialize_ms': (t_ready - t_serve) * 1000,
+                  'total_ms': (t_ready - t0) * 1000}))
+"""
+
+
+async def bench_startup(workdir: Path, cfg: Dict[str, Any]) -> Dict[str, Any]:
+    db_path = workdir / 'startup.db'
+    # Warm database: devices, zones and some history exist, like a real restart
+    tado_api, _ = await build_api(str(db_path), cfg['zones'], cfg['valves_per_zone'])
+    await tado_api.cleanup()
+
+    runs = []
+    for _ in range(cfg['startup_runs']):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, '-c', STARTUP_CHILD, str(ROOT), str(db_path),
+                               str(cfg['zones']), str(cfg['valves_per_zone'])],
+                              capture_output=True, text=True, check=True)
+        wall = time.perf_counter() - start
+        sample = json.loads(proc.stdout.strip().splitlines()[-1])
+        sample['process_ms'] = wall * 1000
+        runs.append(sample)
+
+    return {key: round(statistics.median(run[key] for run in runs), 2) for key in runs[0]}
+
+
+SCENARIOS: Dict[str, Callable] = {
+    'handle_change': bench_handle_change,
+    'sse_fanout': bench_sse_fanout,
+    'http': bench_http,
+    'history': bench_history,
+    'startup': bench_startup,
+}
+
+
+# ----------------------------------------------------------------------------
+# Runner
+# ----------------------------------------------------------------------------
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return 'unknown'
+
+
+async def run(scenarios: List[str], cfg: Dict[str, Any], workdir: Path) -> Dict[str, Any]:
+    results = {}
+    for name in scenarios:
+        print(f"Running {name}...", file=sys.stderr)
+        start = time.perf_counter()
+        results[name] = await SCENARIOS[name](workdir, cfg)
+        print(f"  {name}: {json.dumps(results[name])} ({time.perf_counter() - start:.1f}s)", file=sys.stderr)
+    return results
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Return a description of every metric that regressed by more than threshold."""
+    regressions = []
+    for scenario, metrics in current['results'].items():
+        base_metrics = baseline.get('results', {}).get(scenario, {})
+        for metric, value in metrics.items():
+            base = base_metrics.get(metric)
+            if not isinstance(value, (int, float)) or not isinstance(base, (int, float)) or not base:
+                continue
+            if metric.endswith('_per_sec'):
+                change = (base - value) / base
+            elif metric.endswith('_ms'):
+                change = (value - base) / base
+            else:
+                continue
+            if change > threshold:
+                regressions.append(f"{scenario}.{metric}: {base} -> {value} ({change:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tado Local benchmark suite")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="Scenario to run (repeatable, default: all)")
+    parser.add_argument("--quick", action="store_true", help="Small sizes for smoke runs and CI")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                        help="Override a size parameter, e.g. --set history_rows=1000000")
+    parser.add_argument("--workdir", help="Directory for benchmark databases (history DB is reused between runs)")
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    parser.add_argument("--compare", help="Baseline JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Relative regression that fails --compare (default: 0.2 = 20%%)")
+    args = parser.parse_args()
+
+    cfg = dict(QUICK if args.quick else FULL)
+    for override in args.set:
+        key, _, value = override.partition('=')
+        if key not in cfg:
+            parser.error(f"Unknown parameter: {key}")
+        cfg[key] = int(value)
+
+    # Logging per change would dominate the hot paths being measured
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger('tado_local').setLevel(logging.WARNING)
+
+    scenarios = args.scenario or list(SCENARIOS)
+    workdir = Path(args.workdir) if args.workdir else Path(tempfile.mkdtemp(prefix='tado-bench-'))
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    report = {
+        'meta': {
+            'version': __version__,
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'quick': args.quick,
+            'config': cfg,
+        },
+        'results': asyncio.run(run(scenarios, cfg, workdir)),
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+        print(f"Results written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print("Regressions:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            sys.exit(1)
+        print("No regressions above threshold", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
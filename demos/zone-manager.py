@@ -215,43 +215,35 @@ def set_temperature(zones, temp):
     # Get zone names for display
     zone_names = {z['zone_id']: z['name'] for z in zone_info}
 
+    if temp is None:
+        return
+
     for zone_id in zones:
         zone_name = zone_names.get(zone_id, f'Zone {zone_id}')
+        if temp >= 1:
+            # Set temperature (heating is auto-enabled for temp >= 5)
+            print(f"Setting {zone_name} (ID: {zone_id}) to {temp:.1f}°C")
+        elif temp == 0:
+            print(f"Turning OFF {zone_name} (ID: {zone_id})")
 
-        try:
-            if temp is not None and temp >= 1:
-                # Set temperature (heating is auto-enabled for temp >= 5)
-                print(f"Setting {zone_name} (ID: {zone_id}) to {temp:.1f}°C")
-
-                payload = {"temperature": temp}
-
-                response = requests.post(
-                    f"{API_BASE}/zones/{zone_id}/set",
-                    json=payload,
-                    headers=get_headers()
-                )
-                response.raise_for_status()
-                result = response.json()
-
-                if verbose > 0:
-                    print(f"  Response: {result}")
-
-            elif temp is not None and temp == 0:
-                # Turn off (set temperature to 0)
-                print(f"Turning OFF {zone_name} (ID: {zone_id})")
+    # All zones in one request (and one write to the bridge)
+    payload = {"zones": [{"zone_id": zone_id, "temperature": temp} for zone_id in zones]}
 
-                payload = {"temperature": 0}
+    try:
+        response = requests.post(
+            f"{API_BASE}/control",
+            json=payload,
+            headers=get_headers()
+        )
+        response.raise_for_status()
+        result = response.json()
 
-                response = requests.post(
-                    f"{API_BASE}/zones/{zone_id}/set",
-                    json=payload,
-                    headers=get_headers()
-                )
-                response.raise_for_status()
+        if verbose > 0:
+            print(f"  Response: {result}")
 
-        except Exception as e:
-            print(f"Error setting temperature for {zone_name}: {e}")
-            sys.exit(1)
+    except Exception as e:
+        print(f"Error setting temperature: {e}")
+        sys.exit(1)
 
 
 def reset_to_schedule(zones):
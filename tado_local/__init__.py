@@ -20,15 +20,20 @@ from .__version__ import __version__
 __author__ = "Tado Local Contributors"
 __description__ = "REST API for Tado devices via HomeKit bridge"
 
-# Import modules that are ready
-from .cache import CharacteristicCacheSQLite
-from .database import DB_SCHEMA, HOMEKIT_SCHEMA
-from .bridge import TadoBridge
-from .state import DeviceStateManager
-from .api import TadoLocalAPI
-from .cloud import TadoCloudAPI, RateLimitInfo
-from .sync import TadoCloudSync
-from . import homekit_uuids
+# Public names are imported on first access (PEP 562) so that importing a
+# submodule such as tado_local.database does not pull in FastAPI, aiohttp,
+# aiohomekit and zeroconf.
+_LAZY_IMPORTS = {
+    "CharacteristicCacheSQLite": ".cache",
+    "DB_SCHEMA": ".database",
+    "HOMEKIT_SCHEMA": ".database",
+    "TadoBridge": ".bridge",
+    "DeviceStateManager": ".state",
+    "TadoLocalAPI": ".api",
+    "TadoCloudAPI": ".cloud",
+    "RateLimitInfo": ".cloud",
+    "TadoCloudSync": ".sync",
+}
 
 __all__ = [
     "__version__",
@@ -43,3 +48,19 @@ __all__ = [
     "TadoCloudSync",
     "homekit_uuids",
 ]
+
+
+def __getattr__(name):
+    import importlib
+
+    if name == "homekit_uuids":
+        return importlib.import_module(".homekit_uuids", __name__)
+    if name in _LAZY_IMPORTS:
+        value = getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -24,28 +24,35 @@ import os
 import signal
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-import uvicorn
-from aiohomekit.controller.ip.pairing import IpPairing
+from . import metrics
 
-from .bridge import TadoBridge
-from .api import TadoLocalAPI
-from .cloud import TadoCloudAPI
-from .routes import create_app, register_routes
+# The server stack (uvicorn, FastAPI, aiohomekit, aiohttp) is imported in run_server()
+# so that argument parsing and --help do not pay for it.
+if TYPE_CHECKING:
+    import uvicorn
+    from aiohomekit.controller.ip.pairing import IpPairing
+    from .api import TadoLocalAPI
 
 # Logger will be configured in main() based on daemon/console mode
 logger = logging.getLogger(__name__)
 
 # Global variables
-bridge_pairing: Optional[IpPairing] = None
-tado_api: Optional[TadoLocalAPI] = None
-server: Optional[uvicorn.Server] = None
+bridge_pairing: Optional['IpPairing'] = None
+tado_api: Optional['TadoLocalAPI'] = None
+server: Optional['uvicorn.Server'] = None
 shutdown_event: Optional[asyncio.Event] = None
 
 async def run_server(args):
     """Run the Tado Local server."""
-    global bridge_pairing, tado_api, server, shutdown_event
+    global tado_api, server, shutdown_event
+
+    import uvicorn
+    from .bridge import TadoBridge
+    from .api import TadoLocalAPI
+    from .cloud import TadoCloudAPI
+    from .routes import create_app, register_routes
 
     shutdown_event = asyncio.Event()
 
@@ -93,9 +100,12 @@ async def run_server(args):
 
         # Initialize the API with database path
         tado_api = TadoLocalAPI(str(db_path))
+        tado_api.STALE_AFTER = args.stale_after
 
         # Initialize Tado Cloud API (always enabled)
-        cloud_api = TadoCloudAPI(str(db_path), tado_api=tado_api)
+        cloud_api = TadoCloudAPI(str(db_path), tado_api=tado_api,
+                                 api_base_url=args.cloud_api_url,
+                                 auth_base_url=args.cloud_auth_url)
 
         # Check if already authenticated
         if not cloud_api.is_authenticated():
@@ -121,13 +131,15 @@ async def run_server(args):
         app = create_app()
         register_routes(app, lambda: tado_api)
 
-        # Set up pairing
-        bridge_pairing, bridge_ip = await TadoBridge.pair_or_load(
-            args.bridge_ip, args.pin, db_path, args.clear_pairings
-        )
-
-        # Initialize the API with the pairing
-        await tado_api.initialize(bridge_pairing)
+        # Optional stall detection and profiling (served on /diagnostics); its lag
+        # monitor also samples the event loop lag for /metrics
+        if args.diagnostics:
+            from .diagnostics import LoopDiagnostics
+            tado_api.diagnostics = LoopDiagnostics(slow_threshold=args.slow_callback_ms / 1000)
+            tado_api.diagnostics.start()
+        else:
+            # Sample event loop lag for /metrics (cancelled with the other background tasks)
+            tado_api.background_tasks.append(asyncio.create_task(metrics.monitor_event_loop_lag()))
 
         # Register mDNS service asynchronously (Avahi via DBus preferred, fall back to zeroconf)
         if not args.no_mdns:
@@ -141,6 +153,7 @@ async def run_server(args):
                     # We intentionally publish only the HTTP service to avoid duplicate
                     # registrations (the previous code registered two distinct service
                     # types which caused two external publisher processes).
+                    tado_api.mark_startup_phase('mdns', 'running')
                     try:
                         from .__version__ import __version__ as tado_version
                         # Do not advertise the bridge IP here; advertise the daemon host
@@ -153,10 +166,13 @@ async def run_server(args):
                         }, service_type='_http._tcp.local.')
                         if ok:
                             logger.info(f"HTTP mDNS service registered via {method} (advertising daemon host A/AAAA records)")
+                            tado_api.mark_startup_phase('mdns', 'done')
                         else:
                             logger.warning(f"HTTP mDNS registration: {msg} (advertising daemon host)")
+                            tado_api.mark_startup_phase('mdns', 'failed', msg)
                     except Exception as e:
                         logger.exception("HTTP mDNS async registration failed (%s) ", e)
+                        tado_api.mark_startup_phase('mdns', 'failed', e)
 
                 # schedule background registration; do not await so startup remains fast
                 task = asyncio.create_task(_schedule_mdns())
@@ -176,11 +192,43 @@ async def run_server(args):
             except Exception as e:
                 # Make this visible in normal logs; use warning so users running at INFO see it
                 logger.warning("mDNS registration scheduler unavailable: %s", e)
+                tado_api.mark_startup_phase('mdns', 'failed', e)
         else:
             logger.info("mDNS registration disabled by --no-mdns flag")
+            tado_api.mark_startup_phase('mdns', 'skipped')
 
-        logger.info( "*** Tado Local ready! ***")
-        logger.info(f"Bridge IP: {bridge_ip}")
+        # Connect the bridge in the background: the HTTP server starts right away and
+        # serves the last persisted state (flagged stale in /status) until the
+        # baseline poll completes.
+        startup_error: Optional[BaseException] = None
+
+        async def _start_bridge():
+            global bridge_pairing
+            nonlocal startup_error
+            tado_api.mark_startup_phase('bridge', 'running')
+            try:
+                bridge_pairing, bridge_ip = await TadoBridge.pair_or_load(
+                    args.bridge_ip, args.pin, db_path, args.clear_pairings
+                )
+                logger.info(f"Bridge IP: {bridge_ip}")
+                # The advertised c# tells whether the persisted accessory list is still valid
+                config_num = await TadoBridge.get_advertised_config_num(bridge_pairing.id)
+                await tado_api.initialize(bridge_pairing, config_num=config_num)
+                # Reload the accessories and write plans when the bridge announces a new c#
+                tado_api.background_tasks.append(asyncio.create_task(
+                    TadoBridge.watch_config_num(bridge_pairing.id, tado_api.handle_config_change)))
+                logger.info("*** Tado Local bridge ready, serving live state ***")
+            except Exception as e:
+                if tado_api.startup_phases['bridge']['status'] == 'running':
+                    tado_api.mark_startup_phase('bridge', 'failed', e)
+                logger.error(f"ERROR: Failed to start Tado Local bridge: {e}")
+                startup_error = e
+                if server:
+                    server.should_exit = True
+
+        tado_api.background_tasks.append(asyncio.create_task(_start_bridge()))
+
+        logger.info( "*** Tado Local started (connecting to bridge in background) ***")
         logger.info(f"API Server: http://0.0.0.0:{args.port}")
         logger.info(f"Documentation: http://0.0.0.0:{args.port}/docs")
         logger.info(f"Status: http://0.0.0.0:{args.port}/status")
@@ -277,6 +325,9 @@ async def run_server(args):
         server = uvicorn.Server(config)
         await server.serve()
 
+        if startup_error:
+            raise startup_error
+
     except KeyboardInterrupt:
         logger.info("Keyboard interrupt received, shutting down gracefully...")
     except Exception as e:
@@ -316,6 +367,9 @@ async def run_server(args):
                 logger.info("Stopping Tado Cloud API background tasks...")
                 await tado_api.cloud_api.stop_background_sync()
 
+            if tado_api.diagnostics:
+                await tado_api.diagnostics.stop()
+
             # Full cleanup
             await tado_api.cleanup()
 
@@ -411,6 +465,21 @@ API Endpoints:
                        help="Send logs to syslog instead of stdout (e.g., /dev/log, localhost:514, or remote.server:514)")
     parser.add_argument("--pid-file",
                        help="Write process ID to specified file (useful for daemon mode)")
+    parser.add_argument("--cloud-api-url",
+                       help="Override the Tado Cloud API base URL (e.g. a local tado_local.fake_cloud for testing)")
+    parser.add_argument("--cloud-auth-url",
+                       help="Override the Tado Cloud OAuth base URL (e.g. a local tado_local.fake_cloud for testing)")
+    parser.add_argument("--trace", choices=["console", "file", "otlp"],
+                       help="Record request spans (route, SQLite, HomeKit, cloud, SSE) and add trace ids to log lines. "
+                            "'otlp' needs opentelemetry-sdk and opentelemetry-exporter-otlp-proto-http")
+    parser.add_argument("--trace-file", default="~/.tado-local-traces.jsonl",
+                       help="Span output file for --trace file (default: ~/.tado-local-traces.jsonl)")
+    parser.add_argument("--stale-after", type=float, default=900,
+                       help="Report a device as stale (and send a freshness event) after this many seconds without values (default: 900)")
+    parser.add_argument("--diagnostics", action="store_true",
+                       help="Enable event loop stall detection and on-demand profiling (see /diagnostics)")
+    parser.add_argument("--slow-callback-ms", type=float, default=100,
+                       help="With --diagnostics: log loop stalls longer than this many milliseconds with their stack (default: 100)")
     # Parse CLI arguments
     args = parser.parse_args()
 
@@ -477,6 +546,12 @@ API Endpoints:
         logging.getLogger().setLevel(logging.DEBUG)
         logger.info("Verbose logging enabled")
 
+    # Request tracing (spans plus trace ids on log lines)
+    if args.trace:
+        from . import tracing
+        tracing.configure(args.trace, args.trace_file)
+        tracing.install_log_correlation()
+
     # Write PID file if requested
     if args.pid_file:
         pid_path = Path(args.pid_file)
@@ -495,6 +570,11 @@ API Endpoints:
     except Exception as e:
         logger.error(f"ERROR: {e}")
         exit(1)
+    finally:
+        if args.trace:
+            # Flush buffered spans (file / OTLP exporters)
+            from . import tracing
+            tracing.shutdown()
 
 if __name__ == "__main__":
     main()
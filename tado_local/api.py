@@ -19,20 +19,37 @@
 import asyncio
 import json
 import logging
+import sqlite3
 import time
 from collections import defaultdict
-from typing import Dict, List, Any, Optional
-
-from fastapi import HTTPException
-from aiohomekit.controller.ip.pairing import IpPairing
+from typing import TYPE_CHECKING, Dict, List, Any, Optional, Tuple, Union
 
+from . import metrics, tracing
 from .state import DeviceStateManager
-from .homekit_uuids import get_characteristic_name
+from .homekit_uuids import (
+    CHAR_SERIAL_NUMBER, CHARACTERISTIC_FORMATS, SERVICE_ACCESSORY_INFORMATION, STATE_FIELDS,
+    build_enhanced_structure, get_characteristic_name, normalize_uuid, overlay_live_values,
+)
+from .confirmations import WriteConfirmationTracker
+from .delta import DeltaEncoder
+from .freshness import FreshnessMonitor
+from .polling import AdaptivePollScheduler, importance
+from .schedule import ScheduleEngine
+from .watchdog import EventWatchdog
+
+if TYPE_CHECKING:
+    from aiohomekit.controller.ip.pairing import IpPairing
+
+    from .diagnostics import LoopDiagnostics
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 
+class BridgeUnavailableError(RuntimeError):
+    """The bridge is not connected or did not answer a request."""
+
+
 class TadoLocalAPI:
     """Tado Local that leverages HomeKit for real-time data without cloud dependency."""
     accessories_cache : List[Any]
@@ -40,44 +57,213 @@ class TadoLocalAPI:
     accessories_id : Dict[int, str]
     characteristic_map : Dict[tuple[int, int], str]
     characteristic_iid_map : Dict[tuple[int, str], int]
-    device_to_characteristics : Dict[int, List[tuple[int, int, str]]]  # device_id -> [(aid, iid, char_type)]
+    characteristic_types : Dict[tuple[int, int], Union[int, str]]  # (aid, iid) -> canonical UUID
+    device_to_characteristics : Dict[int, List[tuple[int, int, Union[int, str]]]]  # device_id -> [(aid, iid, char_type)]
+    write_plans : Dict[int, Dict[str, Dict[str, Any]]]  # device_id -> field -> {'aid', 'iid', 'format', 'min', 'max', 'step', 'valid'}
+
+    # Characteristics whose changes are pushed to SSE clients as device/zone state
+    BROADCAST_CHARACTERISTICS = ('TargetTemperature', 'CurrentTemperature', 'TargetHeatingCoolingState',
+                                 'CurrentHeatingCoolingState', 'CurrentRelativeHumidity', 'ValvePosition')
+
+    # Startup phases in order; bridge/accessories/baseline/events are required for readiness
+    STARTUP_PHASES = ('bridge', 'accessories', 'baseline', 'events', 'mdns')
+    READY_PHASES = ('bridge', 'accessories', 'baseline', 'events')
+
+    # Baseline poll: characteristics per get_characteristics request, and requests in flight
+    BASELINE_BATCH_SIZE = 50
+    BASELINE_CONCURRENCY = 4
+
+    # Seconds between event subscription retries while falling back to polling
+    EVENT_RETRY_INTERVAL = 300.0
+
+    # Writable state fields and their characteristic UUIDs
+    WRITABLE_CHARACTERISTICS = {
+        'target_temperature': DeviceStateManager.CHAR_TARGET_TEMPERATURE,
+        'target_heating_cooling_state': DeviceStateManager.CHAR_TARGET_HEATING_COOLING,
+        'target_humidity': DeviceStateManager.CHAR_TARGET_HUMIDITY,
+    }
+
+    # HAP formats written as integers (everything else numeric is written as float)
+    INTEGER_FORMATS = ('uint8', 'uint16', 'uint32', 'uint64', 'int')
+
+    # Writes to the same device within this many seconds of its previous write are sent
+    # as one put_characteristics (0 disables); a one-off write is sent right away
+    WRITE_DEBOUNCE = 0.3
+
+    # A device whose values were not confirmed by an event or read for this long is reported stale
+    STALE_AFTER = 900.0
 
     def __init__(self, db_path: str):
-        self.pairing: Optional[IpPairing] = None
+        self.pairing: Optional['IpPairing'] = None
         self.accessories_cache = []
         self.accessories_dict = {}
         self.accessories_id = {}
         self.characteristic_map = {}
         self.characteristic_iid_map = {}
+        self.characteristic_types = {}
         self.device_to_characteristics = {}
+        self.write_plans = {}
+        self.write_plans_config_num: Optional[int] = None  # c# the write plans were built for
+        self.accessories_version = 0  # Bumped whenever the accessory list is reloaded
+        self.enhanced_structure: Optional[Tuple[Tuple[Optional[int], int], List[Dict[str, Any]]]] = None  # (key, structure)
         self.event_listeners: List[asyncio.Queue] = []
         self.zone_event_listeners: List[asyncio.Queue] = []  # Zone-only listeners
+        self.delta_listeners: List[asyncio.Queue] = []  # SSE clients of the delta-encoded stream
+        self.ws_listeners: List[asyncio.Queue] = []  # WebSocket sessions (receive (event, delta event), filter themselves)
+        self.delta_encoder = DeltaEncoder()
         self.last_update: Optional[float] = None
         self.device_states: Dict[str, Dict[str, Any]] = defaultdict(dict)
         self.last_zone_states: Dict[int, Dict[str, Any]] = {}  # Track zone states to deduplicate
         self.state_manager = DeviceStateManager(db_path)
+        self.config_num: Optional[int] = None  # c# advertised by the bridge, if known
         self.is_initializing = False  # Flag to suppress logging during startup
 
+        # Startup tracking (reported in /status). Until the baseline poll completes,
+        # state comes from the last persisted values and is flagged as stale.
+        self.startup_started = time.time()
+        self.startup_phases: Dict[str, Dict[str, Any]] = {name: {'status': 'pending'} for name in self.STARTUP_PHASES}
+        self.state_is_stale = True
+
+        # Per-accessory recency: last value received (event or read) and last event
+        self.accessory_last_seen: Dict[int, float] = {}
+        self.accessory_last_event: Dict[int, float] = {}
+        self.freshness = FreshnessMonitor(self)  # Per-characteristic recency, stale events, devices.last_seen
+        self.freshness_task: Optional[asyncio.Task] = None
+        self.event_watchdog: Optional[EventWatchdog] = None
+        self.schedule_engine = ScheduleEngine(self)
+        self.schedule_task: Optional[asyncio.Task] = None
+        self.diagnostics: Optional['LoopDiagnostics'] = None  # Set by __main__ with --diagnostics
+
         # Cleanup tracking
         self.subscribed_characteristics: List[tuple[int, int]] = []
+        self.event_callback_registered = False
+        self.write_tracker = WriteConfirmationTracker(
+            self.state_manager, has_queued_writes=lambda device_id: device_id in self.pending_writes)
+        self.write_tracker_task: Optional[asyncio.Task] = None
+        self.pending_writes: Dict[int, Dict[str, Any]] = {}  # device_id -> {'updates', 'future', 'flush_now', 'task', 'calls'}
+        self.last_device_write: Dict[int, float] = {}  # device_id -> monotonic time its last write was sent
+        self.poll_scheduler: Optional[AdaptivePollScheduler] = None  # Set while polling replaces events
         self.background_tasks: List[asyncio.Task] = []
         self.is_shutting_down = False
 
-    async def initialize(self, pairing: IpPairing):
-        """Initialize the API with a HomeKit pairing."""
+    async def initialize(self, pairing: 'IpPairing', config_num: Optional[int] = None):
+        """Initialize the API with a HomeKit pairing.
+
+        The baseline poll and the event subscription run concurrently once the
+        accessory list is known.
+
+        Args:
+            pairing: Connected HomeKit pairing
+            config_num: Configuration number (c#) the bridge advertises. When it matches
+                        the persisted accessory cache, the accessory list is not downloaded.
+        """
         self.pairing = pairing
+        self.config_num = config_num
+        self.mark_startup_phase('bridge', 'done')
         self.is_initializing = True  # Suppress change logging during init
-        await self.refresh_accessories()
-        await self.initialize_device_states()
-        self.is_initializing = False  # Re-enable change logging
-        await self.setup_event_listeners()
-        logger.info("Tado Local initialized successfully")
+
+        async def _phase(name, coro):
+            self.mark_startup_phase(name, 'running')
+            try:
+                await coro
+            except Exception as e:
+                self.mark_startup_phase(name, 'failed', e)
+                raise
+            self.mark_startup_phase(name, 'done')
+
+        await _phase('accessories', self.refresh_accessories(use_cache=True))
+
+        async def _baseline():
+            await self.initialize_device_states()
+            self.state_is_stale = False
+            self.is_initializing = False  # Re-enable change logging
+
+        await asyncio.gather(_phase('baseline', _baseline()), _phase('events', self.setup_event_listeners()))
+        self._start_write_tracker()
+        self._start_schedule_engine()
+        self._start_freshness_monitor()
+        logger.info(f"Tado Local initialized successfully in {time.time() - self.startup_started:.1f}s")
+
+    def mark_startup_phase(self, name: str, status: str, error: Optional[Exception] = None):
+        """Record progress of a startup phase ('running', 'done', 'failed' or 'skipped')."""
+        phase = self.startup_phases.setdefault(name, {'status': 'pending'})
+        now = time.time()
+        if status == 'running':
+            phase['started_at'] = now
+        elif 'started_at' in phase and 'duration' not in phase:
+            phase['duration'] = round(now - phase['started_at'], 3)
+        phase['status'] = status
+        if error is not None:
+            phase['error'] = str(error)
+
+    @property
+    def is_ready(self) -> bool:
+        """True once the bridge is connected, the baseline is polled and events are set up."""
+        return all(self.startup_phases[name]['status'] in ('done', 'skipped') for name in self.READY_PHASES)
+
+    def device_freshness(self, device_id: int, characteristics: bool = True) -> Dict[str, Any]:
+        """How recently a device's values were confirmed by the bridge.
+
+        Args:
+            device_id: Device to report on
+            characteristics: Include the recency of every tracked characteristic
+
+        Returns:
+            Dict with 'last_seen', 'last_event' and 'last_changed' (epoch seconds or None),
+            'age_seconds', 'stale' and (optionally) 'characteristics' by state field
+        """
+        device_info = self.state_manager.get_device_info(device_id) or {}
+        aid = device_info.get('aid')
+        last_seen = self.accessory_last_seen.get(aid)
+        age = time.time() - last_seen if last_seen is not None else None
+        if not self.device_to_characteristics.get(device_id):
+            stale = False  # Nothing to confirm (e.g. the bridge itself)
+        else:
+            stale = self.state_is_stale or age is None or age > self.STALE_AFTER
+        freshness = {
+            'last_seen': last_seen,
+            'last_event': self.accessory_last_event.get(aid),
+            'last_changed': self.freshness.device_last_changed(device_id),
+            'age_seconds': round(age, 1) if age is not None else None,
+            'stale': stale,
+        }
+        if characteristics:
+            freshness['characteristics'] = self.freshness.device_characteristics(device_id)
+        return freshness
+
+    def zone_freshness(self, zone_id: int) -> Dict[str, Any]:
+        """Freshness of a zone: its leader's last report and any stale devices in it."""
+        zone_info = self.state_manager.zone_cache.get(zone_id, {})
+        leader_device_id = zone_info.get('leader_device_id')
+        stale_devices = sorted(
+            device_id for device_id, device_info in self.state_manager.device_info_cache.items()
+            if device_info.get('zone_id') == zone_id and self.device_freshness(device_id, characteristics=False)['stale']
+        )
+        leader = self.device_freshness(leader_device_id, characteristics=False) if leader_device_id else {}
+        return {
+            'last_seen': leader.get('last_seen'),
+            'age_seconds': leader.get('age_seconds'),
+            'stale': bool(stale_devices),
+            'stale_devices': stale_devices,
+        }
+
+    def startup_status(self) -> Dict[str, Any]:
+        """Readiness summary for /status."""
+        return {
+            'ready': self.is_ready,
+            'state_stale': self.state_is_stale,
+            'started_at': self.startup_started,
+            'phases': self.startup_phases,
+        }
 
     async def cleanup(self):
         """Clean up resources and unsubscribe from events."""
         logger.info("Starting cleanup...")
         self.is_shutting_down = True
 
+        # Send queued (debounced) writes now rather than dropping them
+        await self.flush_pending_writes()
+
         # Cancel all background tasks
         if self.background_tasks:
             logger.info(f"Cancelling {len(self.background_tasks)} background tasks")
@@ -89,6 +275,12 @@ class TadoLocalAPI:
             await asyncio.gather(*self.background_tasks, return_exceptions=True)
             logger.info("Background tasks cancelled")
 
+        # Write the last devices.last_seen batch
+        try:
+            self.freshness.persist()
+        except Exception as e:
+            logger.warning(f"Failed to persist device last_seen: {e}")
+
         # Unsubscribe from all event characteristics
         if self.pairing and self.subscribed_characteristics:
             try:
@@ -122,38 +314,135 @@ class TadoLocalAPI:
                     pass  # Queue might already be closed
             self.zone_event_listeners.clear()
 
+        # Close delta stream queues
+        for queue in self.delta_listeners:
+            queue.put_nowait(None)
+        self.delta_listeners.clear()
+
+        # End WebSocket sessions
+        for queue in self.ws_listeners:
+            queue.put_nowait(None)
+        self.ws_listeners.clear()
+
         logger.info("Cleanup complete")
 
-    async def refresh_accessories(self):
-        """Refresh accessories from HomeKit and cache them."""
+    async def refresh_accessories(self, use_cache: bool = False):
+        """Refresh accessories from HomeKit and cache them.
+
+        Args:
+            use_cache: Use the persisted accessory list if it was stored for the config
+                       number the bridge currently advertises, instead of downloading it.
+                       Startup uses this; /refresh always downloads.
+
+        Raises:
+            BridgeUnavailableError if the bridge is not connected or the download failed
+        """
         if not self.pairing:
-            raise HTTPException(status_code=503, detail="Bridge not connected")
+            raise BridgeUnavailableError("Bridge not connected")
 
         try:
-            raw_accessories = await self.pairing.list_accessories_and_characteristics()
+            raw_accessories = self._load_cached_accessories() if use_cache else None
+            if raw_accessories is not None:
+                source = f"accessory cache (c#={self.config_num})"
+            else:
+                with tracing.span('homekit.list_accessories'), \
+                        metrics.HOMEKIT_REQUEST_SECONDS.labels('list_accessories').time():
+                    raw_accessories = await self.pairing.list_accessories_and_characteristics()
+                self._save_accessory_cache(raw_accessories)
+                source = "bridge"
             self.accessories_dict = self._process_raw_accessories(raw_accessories)
             self.accessories_cache = list(self.accessories_dict.values())
+            self.accessories_version += 1
             self.last_update = time.time()
-            logger.info(f"Refreshed {len(self.accessories_cache)} accessories")
+            logger.info(f"Refreshed {len(self.accessories_cache)} accessories from {source}")
             return self.accessories_cache
         except Exception as e:
             logger.error(f"Failed to refresh accessories: {e}")
-            raise HTTPException(status_code=503, detail=f"Failed to refresh accessories: {e}")
+            raise BridgeUnavailableError(f"Failed to refresh accessories: {e}") from e
+
+    def enhanced_accessories(self, accessory_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Accessories with human-readable names and current values.
+
+        The name/format structure is built once per accessory configuration (c# and
+        accessory list reload); each call only overlays the latest known values.
+
+        Args:
+            accessory_id: Only return this accessory (database id)
+        """
+        key = (self.config_num, self.accessories_version)
+        if self.enhanced_structure is None or self.enhanced_structure[0] != key:
+            self.enhanced_structure = (key, build_enhanced_structure(self.accessories_cache))
+        structure = self.enhanced_structure[1]
+        if accessory_id is not None:
+            structure = [accessory for accessory in structure if accessory['id'] == accessory_id]
+        live_values = getattr(self, 'change_tracker', {}).get('last_values', {})
+        return overlay_live_values(structure, live_values)
+
+    def _load_cached_accessories(self) -> Optional[List[Dict[str, Any]]]:
+        """Persisted accessory list for this pairing, if it matches the advertised c#."""
+        homekit_id = getattr(self.pairing, 'id', None)
+        if self.config_num is None or not homekit_id:
+            return None
+
+        conn = sqlite3.connect(self.state_manager.db_path)
+        row = conn.execute(
+            "SELECT config_num, accessories FROM homekit_cache WHERE homekit_id = ?", (homekit_id,)
+        ).fetchone()
+        conn.close()
+
+        if not row:
+            return None
+        if row[0] != self.config_num:
+            logger.info(f"Accessory cache is for c#={row[0]} but the bridge advertises c#={self.config_num}; downloading")
+            return None
+        try:
+            return json.loads(row[1])
+        except ValueError as e:
+            logger.warning(f"Ignoring unreadable accessory cache: {e}")
+            return None
+
+    def _save_accessory_cache(self, raw_accessories: List[Dict[str, Any]]):
+        """Persist a downloaded accessory list under the advertised c#.
+
+        aiohomekit writes the same row (via CharacteristicCacheSQLite) but keeps the
+        config number it loaded at startup, so record the current one here.
+        """
+        homekit_id = getattr(self.pairing, 'id', None)
+        if self.config_num is None or not homekit_id:
+            return
+
+        conn = sqlite3.connect(self.state_manager.db_path)
+        conn.execute("""
+            INSERT INTO homekit_cache (homekit_id, config_num, accessories, updated_at)
+            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(homekit_id) DO UPDATE SET
+                config_num = excluded.config_num,
+                accessories = excluded.accessories,
+                updated_at = CURRENT_TIMESTAMP
+        """, (homekit_id, self.config_num, json.dumps(raw_accessories)))
+        conn.commit()
+        conn.close()
 
     def _process_raw_accessories(self, raw_accessories):
         accessories={}
+        write_plans = {}
+        characteristic_types = {}
+        writable_fields = {uuid: field for field, uuid in self.WRITABLE_CHARACTERISTICS.items()}
 
         for a in raw_accessories:
             aid = a.get('aid')
+            # Normalize every characteristic type once; everything downstream uses the canonical form
+            for service in a.get('services', []):
+                for char in service.get('characteristics', []):
+                    characteristic_types[(aid, char.get('iid'))] = normalize_uuid(char.get('type'))
+
             # Try to find serial number from AccessoryInformation service
             serial_number = None
 
             for service in a.get('services', []):
-                # AccessoryInformation service UUID
-                if service.get('type') == '0000003E-0000-1000-8000-0026BB765291':
+                if normalize_uuid(service.get('type')) == SERVICE_ACCESSORY_INFORMATION:
                     for char in service.get('characteristics', []):
-                        # SerialNumber characteristic UUID
-                        if char.get('type') == '00000030-0000-1000-8000-0026BB765291':
+                        if characteristic_types[(aid, char.get('iid'))] == CHAR_SERIAL_NUMBER:
                             serial_number = char.get('value')
                             break
                 if serial_number:
@@ -170,24 +459,21 @@ class TadoLocalAPI:
                 char_list = []
                 for service in a.get('services', []):
                     for char in service.get('characteristics', []):
-                        char_type = char.get('type', '').lower()
                         iid = char.get('iid')
+                        char_type = characteristic_types[(aid, iid)]
+                        field = writable_fields.get(char_type)
+                        if field and 'pw' in char.get('perms', []):
+                            write_plans.setdefault(device_id, {}).setdefault(field, {
+                                'aid': aid,
+                                'iid': iid,
+                                'format': char.get('format') or CHARACTERISTIC_FORMATS.get(char_type),
+                                'min': char.get('minValue'),
+                                'max': char.get('maxValue'),
+                                'step': char.get('minStep'),
+                                'valid': char.get('valid-values'),
+                            })
                         # Only track characteristics we care about
-                        if char_type in [
-                            DeviceStateManager.CHAR_CURRENT_TEMPERATURE,
-                            DeviceStateManager.CHAR_TARGET_TEMPERATURE,
-                            DeviceStateManager.CHAR_CURRENT_HEATING_COOLING,
-                            DeviceStateManager.CHAR_TARGET_HEATING_COOLING,
-                            DeviceStateManager.CHAR_HEATING_THRESHOLD,
-                            DeviceStateManager.CHAR_COOLING_THRESHOLD,
-                            DeviceStateManager.CHAR_TEMP_DISPLAY_UNITS,
-                            DeviceStateManager.CHAR_BATTERY_LEVEL,
-                            DeviceStateManager.CHAR_STATUS_LOW_BATTERY,
-                            DeviceStateManager.CHAR_CURRENT_HUMIDITY,
-                            DeviceStateManager.CHAR_TARGET_HUMIDITY,
-                            DeviceStateManager.CHAR_ACTIVE,
-                            DeviceStateManager.CHAR_VALVE_POSITION,
-                        ]:
+                        if char_type in STATE_FIELDS:
                             char_list.append((aid, iid, char_type))
 
                 self.device_to_characteristics[device_id] = char_list
@@ -205,8 +491,44 @@ class TadoLocalAPI:
             if device_id:
                 self.accessories_id[aid] = device_id
 
+        self.characteristic_types = characteristic_types
+        self.write_plans = write_plans
+        self.write_plans_config_num = self.config_num
         return accessories
 
+    async def handle_config_change(self, config_num: int) -> bool:
+        """React to a new configuration number (c#) advertised by the bridge.
+
+        A new c# means accessories or iids may have changed, so the accessory list
+        and write plans are downloaded again (writes fail with ValueError meanwhile).
+        When the download fails, the previous c# is restored, so the change is applied
+        again on the next call (TadoBridge.watch_config_num retries). After a
+        successful download, events are subscribed for the new characteristics and
+        the event watchdog picks its verification reads again.
+
+        Returns:
+            True if the c# changed and the accessories were refreshed
+
+        Raises:
+            BridgeUnavailableError if the accessories could not be refreshed
+        """
+        if config_num == self.config_num:
+            return False
+        logger.info(f"Bridge configuration changed (c#={self.config_num} -> {config_num}); refreshing accessories")
+        previous_config_num = self.config_num
+        self.config_num = config_num
+        try:
+            await self.refresh_accessories()
+        except Exception:
+            self.config_num = previous_config_num
+            raise
+
+        if self.subscribed_characteristics:
+            await self.setup_persistent_events()
+        if self.event_watchdog is not None:
+            self.event_watchdog.rebuild()
+        return True
+
     async def initialize_device_states(self):
         """Poll all characteristics once on startup to establish baseline state."""
         if not self.pairing:
@@ -215,57 +537,85 @@ class TadoLocalAPI:
 
         logger.info("Initializing device states from current values...")
 
-        # Collect all readable characteristics we care about
-        chars_to_poll = []
-
-        for device_id, char_list in self.device_to_characteristics.items():
-            for aid, iid, char_type in char_list:
-                # Find the characteristic to check if it's readable
-                for accessory in self.accessories_cache:
-                    if accessory.get('aid') == aid:
-                        for service in accessory.get('services', []):
-                            for char in service.get('characteristics', []):
-                                if char.get('iid') == iid:
-                                    perms = char.get('perms', [])
-                                    if 'pr' in perms:  # Readable
-                                        chars_to_poll.append((aid, iid, device_id, char_type))
-                                    break
+        # Index readable characteristics once rather than rescanning every accessory per characteristic
+        readable = {
+            (accessory.get('aid'), char.get('iid'))
+            for accessory in self.accessories_cache
+            for service in accessory.get('services', [])
+            for char in service.get('characteristics', [])
+            if 'pr' in char.get('perms', [])
+        }
+        chars_to_poll = [
+            (aid, iid, device_id, char_type)
+            for device_id, char_list in self.device_to_characteristics.items()
+            for aid, iid, char_type in char_list
+            if (aid, iid) in readable
+        ]
 
         if not chars_to_poll:
             logger.warning("No characteristics found to poll for initialization")
             return
 
-        logger.info(f"Polling {len(chars_to_poll)} characteristics for initial state...")
+        batches = [chars_to_poll[i:i + self.BASELINE_BATCH_SIZE]
+                   for i in range(0, len(chars_to_poll), self.BASELINE_BATCH_SIZE)]
+        logger.info(f"Polling {len(chars_to_poll)} characteristics for initial state in {len(batches)} request(s)...")
 
-        # Poll in batches to avoid overwhelming the device
-        batch_size = 10
         timestamp = time.time()
+        semaphore = asyncio.Semaphore(self.BASELINE_CONCURRENCY)
 
-        for i in range(0, len(chars_to_poll), batch_size):
-            batch = chars_to_poll[i:i+batch_size]
+        async def poll_batch(batch):
             char_keys = [(aid, iid) for aid, iid, _, _ in batch]
-
-            try:
-                results = await self.pairing.get_characteristics(char_keys)
-
-                for (aid, iid, device_id, char_type) in batch:
-                    if (aid, iid) in results:
-                        char_data = results[(aid, iid)]
-                        value = char_data.get('value')
-
-                        if value is not None:
-                            # Update device state
-                            field_name, old_val, new_val = self.state_manager.update_device_characteristic(
-                                device_id, char_type, value, timestamp
-                            )
-                            if field_name:
-                                logger.debug(f"Initialized device {device_id} {field_name}: {value}")
-
-            except Exception as e:
-                logger.error(f"Error polling batch during initialization: {e}")
+            async with semaphore:
+                try:
+                    with tracing.span('homekit.get_characteristics', count=len(char_keys)), \
+                            metrics.HOMEKIT_REQUEST_SECONDS.labels('get_characteristics').time():
+                        return await self.pairing.get_characteristics(char_keys)
+                except Exception as e:
+                    metrics.HOMEKIT_REQUEST_ERRORS.labels('get_characteristics').inc()
+                    logger.error(f"Error polling batch during initialization: {e}")
+                    return {}
+
+        results = {}
+        for batch_results in await asyncio.gather(*(poll_batch(batch) for batch in batches)):
+            results.update(batch_results)
+        for aid, iid in results:
+            self.accessory_last_seen[aid] = timestamp
+            self.freshness.record(aid, iid, timestamp)
+
+        # Apply everything as one batch: one history row per device, one transaction.
+        # The event subscription runs concurrently and may already have seeded the change
+        # tracker from persisted state; the polled values replace those.
+        updates = []
+        tracker = getattr(self, 'change_tracker', None)
+        for aid, iid, device_id, char_type in chars_to_poll:
+            value = results.get((aid, iid), {}).get('value')
+            if value is not None:
+                updates.append((device_id, char_type, value))
+                if tracker is not None:
+                    tracker['last_values'][(aid, iid)] = value
+
+        changes = self.state_manager.update_device_characteristics(updates, timestamp)
+        changed_devices = set()
+        for device_id, field_name, _, value in changes:
+            changed_devices.add(device_id)
+            logger.debug(f"Initialized device {device_id} {field_name}: {value}")
 
         logger.info(f"Device state initialization complete - baseline established for {len(self.device_to_characteristics)} devices")
 
+        # Clients may already be connected (the HTTP server starts before the bridge);
+        # replace the persisted state they were served with the polled values
+        if changed_devices and (self.event_listeners or self.zone_event_listeners or self.delta_listeners or self.ws_listeners):
+            changed_zones = set()
+            for device_id in changed_devices:
+                device_info = self.state_manager.get_device_info(device_id)
+                if not device_info:
+                    continue
+                await self._broadcast_device_state(device_id, device_info.get('zone_name'))
+                if device_info.get('zone_id'):
+                    changed_zones.add(device_info['zone_id'])
+            for zone_id in changed_zones:
+                await self._broadcast_zone_state(zone_id)
+
 
     async def setup_event_listeners(self):
         """Setup unified change detection with events + polling comparison."""
@@ -285,22 +635,7 @@ class TadoLocalAPI:
             current_state = self.state_manager.get_current_state(device_id)
             for aid, iid, char_type in char_list:
                 # Map char_type to state field
-                char_mapping = {
-                    DeviceStateManager.CHAR_CURRENT_TEMPERATURE: 'current_temperature',
-                    DeviceStateManager.CHAR_TARGET_TEMPERATURE: 'target_temperature',
-                    DeviceStateManager.CHAR_CURRENT_HEATING_COOLING: 'current_heating_cooling_state',
-                    DeviceStateManager.CHAR_TARGET_HEATING_COOLING: 'target_heating_cooling_state',
-                    DeviceStateManager.CHAR_HEATING_THRESHOLD: 'heating_threshold_temperature',
-                    DeviceStateManager.CHAR_COOLING_THRESHOLD: 'cooling_threshold_temperature',
-                    DeviceStateManager.CHAR_TEMP_DISPLAY_UNITS: 'temperature_display_units',
-                    DeviceStateManager.CHAR_BATTERY_LEVEL: 'battery_level',
-                    DeviceStateManager.CHAR_STATUS_LOW_BATTERY: 'status_low_battery',
-                    DeviceStateManager.CHAR_CURRENT_HUMIDITY: 'humidity',
-                    DeviceStateManager.CHAR_TARGET_HUMIDITY: 'target_humidity',
-                    DeviceStateManager.CHAR_ACTIVE: 'active_state',
-                    DeviceStateManager.CHAR_VALVE_POSITION: 'valve_position',
-                }
-                field_name = char_mapping.get(char_type.lower())
+                field_name = STATE_FIELDS.get(char_type)
                 if field_name and field_name in current_state:
                     self.change_tracker['last_values'][(aid, iid)] = current_state[field_name]
 
@@ -315,6 +650,36 @@ class TadoLocalAPI:
             await self.setup_polling_system()
         else:
             logger.info("Events active, skipping polling (would just hit 3-hour cache)")
+            self._start_event_watchdog()
+
+    def _start_event_watchdog(self):
+        """Start verifying the event stream (once events are subscribed)."""
+        if self.event_watchdog is not None:
+            return
+        self.event_watchdog = EventWatchdog(self)
+        self.background_tasks.append(asyncio.create_task(self.event_watchdog.run()))
+
+    def _start_write_tracker(self):
+        """Start settling writes the bridge never confirmed."""
+        if self.write_tracker_task is not None:
+            return
+        self.write_tracker_task = asyncio.create_task(self.write_tracker.run())
+        self.background_tasks.append(self.write_tracker_task)
+
+    def _start_freshness_monitor(self):
+        """Start announcing stale devices and persisting devices.last_seen."""
+        if self.freshness_task is not None:
+            return
+        self.freshness_task = asyncio.create_task(self.freshness.run())
+        self.background_tasks.append(self.freshness_task)
+
+    def _start_schedule_engine(self):
+        """Load the local zone schedules and start applying them."""
+        if self.schedule_task is not None:
+            return
+        self.schedule_engine.load()
+        self.schedule_task = asyncio.create_task(self.schedule_engine.run())
+        self.background_tasks.append(self.schedule_task)
 
     async def setup_persistent_events(self):
         """Set up persistent event subscriptions to all event characteristics."""
@@ -328,9 +693,11 @@ class TadoLocalAPI:
                 for k, v in update_data.items():
                     asyncio.create_task(self.handle_change(k[0], k[1], v, source="EVENT"))
 
-            # Register the callback with the pairing's dispatcher
-            self.pairing.dispatcher_connect(event_callback)
-            logger.info("Event callback registered with dispatcher")
+            # Register the callback with the pairing's dispatcher (once; subscription is retried while polling)
+            if not self.event_callback_registered:
+                self.pairing.dispatcher_connect(event_callback)
+                self.event_callback_registered = True
+                logger.info("Event callback registered with dispatcher")
 
             # Collect ALL event-capable characteristics from ALL accessories
             all_event_characteristics = []
@@ -342,12 +709,12 @@ class TadoLocalAPI:
                         perms = char.get('perms', [])
                         if 'ev' in perms:  # Event notification supported
                             iid = char.get('iid')
-                            char_type = char.get('type', '').lower()
+                            char_name = get_characteristic_name(self.characteristic_types.get((aid, iid), char.get('type', '')))
 
                             # Track what this characteristic is
                             all_event_characteristics.append((aid, iid))
-                            self.characteristic_map[(aid, iid)] = get_characteristic_name(char_type)
-                            self.characteristic_iid_map[(aid,  get_characteristic_name(char_type))] = iid
+                            self.characteristic_map[(aid, iid)] = char_name
+                            self.characteristic_iid_map[(aid, char_name)] = iid
                             self.change_tracker['event_characteristics'].add((aid, iid))
 
             if all_event_characteristics:
@@ -374,6 +741,18 @@ class TadoLocalAPI:
     
     async def handle_change(self, aid, iid, update_data, source="UNKNOWN"):
         """Unified handler for all characteristic changes (events AND polling)."""
+        if not tracing.enabled():
+            await self._handle_change(aid, iid, update_data, source)
+            return
+
+        # Writes register their (aid, iid); the echoed event joins the write's trace
+        parent = tracing.resume_echo((aid, iid)) if source == "EVENT" else None
+        with tracing.span('homekit.change', parent=parent, aid=aid, iid=iid, source=source):
+            await self._handle_change(aid, iid, update_data, source)
+
+    async def _handle_change(self, aid, iid, update_data, source):
+        started = time.perf_counter()
+        result = 'ignored'
         try:
             # Extract change information
             value = update_data.get('value')
@@ -389,38 +768,42 @@ class TadoLocalAPI:
                 logger.debug(f"[{source}] Ignoring None value for aid={aid} iid={iid} (likely connection issue)")
                 return
 
-            # Get characteristic info - try cached first, then lookup
+            self.accessory_last_seen[aid] = timestamp
+            if source == "EVENT":
+                self.accessory_last_event[aid] = timestamp
+            self.freshness.record(aid, iid, timestamp, event=source == "EVENT")
+            if self.freshness.stale_devices:
+                await self.freshness.device_reported(self.accessories_id.get(aid))
+            if self.write_tracker.pending:
+                self.write_tracker.observe(aid, iid, value)
+
+            # Get characteristic info - try cached first, then the canonical type from ingest
             char_key = (aid, iid)
+            char_type = self.characteristic_types.get(char_key)
             char_name = self.characteristic_map.get(char_key)
 
-            # If not in cache, look it up from the accessory data
             if not char_name:
-                for accessory in self.accessories_cache:
-                    if accessory.get('aid') == aid:
-                        for service in accessory.get('services', []):
-                            for char in service.get('characteristics', []):
-                                if char.get('iid') == iid:
-                                    char_type = char.get('type', '').lower()
-                                    char_name = get_characteristic_name(char_type)
-                                    # Cache it for next time
-                                    self.characteristic_map[char_key] = char_name
-                                    break
-                            if char_name:
-                                break
-                        break
-
-                # Fallback if still not found
-                if not char_name:
+                if char_type is not None:
+                    char_name = get_characteristic_name(char_type)
+                    # Cache it for next time
+                    self.characteristic_map[char_key] = char_name
+                else:
                     char_name = f"{aid}.{iid}"
 
+            if source == "EVENT":
+                metrics.EVENTS_RECEIVED.labels(aid, char_name).inc()
 
             # Check if this is actually a change
             last_value = self.change_tracker['last_values'].get(char_key)
             if last_value == value:
+                result = 'unchanged'
                 return  # No actual change
 
             # Store new value
             self.change_tracker['last_values'][char_key] = value
+            self.freshness.record_change(aid, iid, timestamp)
+            result = 'changed'
+            metrics.CHANGES.labels(source).inc()
 
             # Get device info for better logging
             device_id = self.accessories_id.get(aid)
@@ -430,31 +813,12 @@ class TadoLocalAPI:
             is_zone_leader = device_info.get('is_zone_leader', False)
 
             # Update device state manager
-            if device_id:
-                # Find the accessory by aid (since events come with aid, not device_id)
-                accessory = None
-                for acc in self.accessories_cache:
-                    if acc.get('aid') == aid:
-                        accessory = acc
-                        break
-
-                if accessory and accessory.get('id'):
-                    # Find the characteristic type for this aid/iid
-                    char_type = None
-                    for service in accessory.get('services', []):
-                        for char in service.get('characteristics', []):
-                            if char.get('iid') == iid:
-                                char_type = char.get('type', '').lower()
-                                break
-                        if char_type:
-                            break
-
-                    if char_type:
-                        field_name, old_val, new_val = self.state_manager.update_device_characteristic(
-                            accessory['id'], char_type, value, timestamp
-                        )
-                        if field_name:
-                            logger.debug(f"Updated device {accessory['id']} {field_name}: {old_val} -> {new_val}")
+            if device_id and char_type is not None:
+                field_name, old_val, new_val = self.state_manager.update_device_characteristic(
+                    device_id, char_type, value, timestamp
+                )
+                if field_name:
+                    logger.debug(f"Updated device {device_id} {field_name}: {old_val} -> {new_val}")
 
             # Skip logging during initialization
             if not self.is_initializing:
@@ -477,12 +841,92 @@ class TadoLocalAPI:
             # Don't send raw characteristic events anymore - we'll send aggregated state changes
 
             # Broadcast aggregated state change for relevant characteristics
-            if char_name in ['TargetTemperature', 'CurrentTemperature', 'TargetHeatingCoolingState',
-                            'CurrentHeatingCoolingState', 'CurrentRelativeHumidity', 'ValvePosition']:
+            if char_name in self.BROADCAST_CHARACTERISTICS:
                 await self.broadcast_state_change(device_id, zone_name)
 
         except Exception as e:
+            result = 'error'
             logger.error(f"Error handling unified change: {e}")
+        finally:
+            metrics.HANDLE_CHANGE_SECONDS.labels(result).observe(time.perf_counter() - started)
+
+    async def apply_state_batch(self, updates, source="UNKNOWN") -> int:
+        """
+        Apply a batch of characteristic updates in one coalesced pass.
+
+        Used by sources that produce many values at once (cloud zone states,
+        bulk polls). Devices are resolved from in-memory caches only, repeated
+        updates for the same characteristic are coalesced (last value wins),
+        and each affected zone is broadcast once after the whole batch is applied.
+
+        Args:
+            updates: Iterable of (device_id, char_name, value) tuples, e.g.
+                (12, 'CurrentRelativeHumidity', 48.0). Values must be typed
+                (float/int/bool) so the change check compares like with like.
+            source: Origin of the values, used for logging and change counters
+
+        Returns:
+            Number of characteristics that actually changed
+        """
+        if not hasattr(self, 'change_tracker'):
+            logger.debug(f"[{source}] Change tracker not ready, dropping batch")
+            return 0
+
+        # Coalesce: last value per (aid, iid) wins
+        pending: Dict[tuple[int, int], tuple[int, str, Union[int, str], Any]] = {}
+        for device_id, char_name, value in updates:
+            if value is None:
+                continue
+            for aid, iid, char_type in self.device_to_characteristics.get(device_id, []):
+                if get_characteristic_name(char_type) == char_name:
+                    pending[(aid, iid)] = (device_id, char_name, char_type, value)
+                    break
+            else:
+                logger.debug(f"[{source}] Device {device_id} has no {char_name} characteristic, skipping")
+
+        timestamp = time.time()
+        changed_devices: Dict[int, str] = {}  # device_id -> zone_name
+        changed_zones = set()
+        changes = 0
+
+        for char_key, (device_id, char_name, char_type, value) in pending.items():
+            last_value = self.change_tracker['last_values'].get(char_key)
+            if last_value == value:
+                continue
+            self.change_tracker['last_values'][char_key] = value
+            changes += 1
+            metrics.CHANGES.labels(source).inc()
+
+            self.state_manager.update_device_characteristic(device_id, char_type, value, timestamp)
+
+            device_info = self.state_manager.get_device_info(device_id)
+            zone_name = device_info.get('zone_name', 'No Zone')
+            if not self.is_initializing:
+                src = "E" if source == "EVENT" else "P"
+                if source == "EVENT":
+                    self.change_tracker['events_received'] += 1
+                else:
+                    self.change_tracker['polling_changes'] += 1
+
+                if device_info.get('is_zone_leader', False):
+                    logger.info(f"[{src}] {zone_name} | {char_name}: {last_value} -> {value}")
+                else:
+                    device_name = device_info.get('name') or device_info.get('serial_number', f'Device {device_id}')
+                    logger.info(f"[{src}] {zone_name} ({device_name}) | {char_name}: {last_value} -> {value}")
+
+            if char_name in self.BROADCAST_CHARACTERISTICS:
+                changed_devices[device_id] = zone_name
+                changed_zones.add(device_info.get('zone_id'))
+
+        try:
+            for device_id, zone_name in changed_devices.items():
+                await self._broadcast_device_state(device_id, zone_name)
+            for zone_id in changed_zones:
+                await self._broadcast_zone_state(zone_id)
+        except Exception as e:
+            logger.debug(f"Error broadcasting batch state change: {e}")
+
+        return changes
 
     async def broadcast_event(self, event_data):
         """Broadcast change event to all connected SSE clients."""
@@ -498,14 +942,30 @@ class TadoLocalAPI:
                 # Device and other events only go to all-events listeners
                 target_listeners = self.event_listeners
 
+            metrics.SSE_EVENTS.labels(event_data.get('type', 'unknown')).inc()
+
             # Send to all connected event listeners
             disconnected_listeners = []
-            for listener in target_listeners:
-                try:
-                    await listener.put(event_message)
-                except Exception as e:
-                    logger.info(f"Failed to add msg to queue: Disconnect listener {e}")
-                    disconnected_listeners.append(listener)
+            with tracing.span('sse.broadcast', type=event_data.get('type'), listeners=len(target_listeners)):
+                for listener in target_listeners:
+                    try:
+                        await listener.put(event_message)
+                        metrics.sse_enqueued(listener)
+                    except Exception as e:
+                        logger.info(f"Failed to add msg to queue: Disconnect listener {e}")
+                        disconnected_listeners.append(listener)
+
+            # Encode for the delta stream even without subscribers, so new ones start from the current state
+            delta_event = self.delta_encoder.encode(event_data)
+            if delta_event is not None and self.delta_listeners:
+                delta_message = f"data: {json.dumps(delta_event)}\n\n"
+                for listener in self.delta_listeners:
+                    listener.put_nowait(delta_message)
+                    metrics.sse_enqueued(listener)
+
+            # WebSocket sessions encode (JSON or MessagePack) and filter the event themselves
+            for listener in self.ws_listeners:
+                listener.put_nowait((event_data, delta_event))
 
             # Remove disconnected listeners
             for listener in disconnected_listeners:
@@ -559,90 +1019,109 @@ class TadoLocalAPI:
             if not device_info:
                 return
 
-            serial = device_info.get('serial_number')
-            zone_id = device_info.get('zone_id')
-
-            # Build device state
-            device_state = self._build_device_state(device_id)
-
-            # Broadcast device state change
-            device_event = {
-                'type': 'device',
-                'device_id': device_id,
-                'serial': serial,
-                'zone_name': zone_name,
-                'state': device_state,
-                'timestamp': time.time()
-            }
-            await self.broadcast_event(device_event)
+            await self._broadcast_device_state(device_id, zone_name)
 
             # Also broadcast zone state if device is assigned to a zone
-            if zone_id and zone_id in self.state_manager.zone_cache:
-                zone_info = self.state_manager.zone_cache[zone_id]
-                zone_name = zone_info['name']
-                leader_device_id = zone_info['leader_device_id']
-                is_circuit_driver = zone_info['is_circuit_driver']
-
-                # Get leader state for zone
-                if leader_device_id:
-                    leader_state = self._build_device_state(leader_device_id)
-
-                    # Build zone state using zone logic
-                    zone_state = {
-                        'cur_temp_c': leader_state['cur_temp_c'],
-                        'cur_temp_f': leader_state['cur_temp_f'],
-                        'hum_perc': leader_state['hum_perc'],
-                        'target_temp_c': leader_state['target_temp_c'],
-                        'target_temp_f': leader_state['target_temp_f'],
-                        'mode': 0,
-                        'cur_heating': 0
-                    }
-
-                    # Apply circuit driver logic for heating states (using cache)
-                    if is_circuit_driver:
-                        # Circuit driver - check radiator valves in zone (from cache)
-                        other_devices = [dev_id for dev_id, dev_info in self.state_manager.device_info_cache.items()
-                                        if dev_info.get('zone_id') == zone_id and not dev_info.get('is_circuit_driver')]
-
-                        if other_devices:
-                            for valve_id in other_devices:
-                                valve_state = self._build_device_state(valve_id)
-                                if valve_state and valve_state.get('mode') == 1:
-                                    zone_state['mode'] = 1
-                                if valve_state and valve_state.get('cur_heating') == 1:
-                                    zone_state['cur_heating'] = 1
-                        else:
-                            # Circuit driver alone in zone - use its own state
-                            zone_state['mode'] = leader_state['mode']
-                            zone_state['cur_heating'] = leader_state['cur_heating']
-                    else:
-                        # Regular device - use leader state
-                        zone_state['mode'] = leader_state['mode']
-                        zone_state['cur_heating'] = leader_state['cur_heating']
-
-                    # Only broadcast if zone state actually changed
-                    last_zone_state = self.last_zone_states.get(zone_id)
-                    if last_zone_state != zone_state:
-                        self.last_zone_states[zone_id] = zone_state.copy()
-
-                        # Broadcast zone state change
-                        zone_event = {
-                            'type': 'zone',
-                            'zone_id': zone_id,
-                            'zone_name': zone_name,
-                            'state': zone_state,
-                            'timestamp': time.time()
-                        }
-                        await self.broadcast_event(zone_event)
+            await self._broadcast_zone_state(device_info.get('zone_id'))
 
         except Exception as e:
             logger.debug(f"Error broadcasting state change: {e}")
 
+    async def _broadcast_device_state(self, device_id: int, zone_name: str):
+        """Broadcast the standardized state of a single device."""
+        device_info = self.state_manager.get_device_info(device_id)
+        device_event = {
+            'type': 'device',
+            'device_id': device_id,
+            'serial': device_info.get('serial_number'),
+            'zone_name': zone_name,
+            'state': self._build_device_state(device_id),
+            'timestamp': time.time()
+        }
+        await self.broadcast_event(device_event)
+
+    def _build_zone_state(self, zone_id: Optional[int]) -> Optional[dict]:
+        """Build the aggregated state of a zone from its leader (and valves for circuit drivers).
+
+        Returns:
+            The zone state, or None if the zone is unknown or has no leader
+        """
+        if not zone_id or zone_id not in self.state_manager.zone_cache:
+            return None
+        zone_info = self.state_manager.zone_cache[zone_id]
+        leader_device_id = zone_info['leader_device_id']
+        is_circuit_driver = zone_info['is_circuit_driver']
+        if not leader_device_id:
+            return None
+
+        # Get leader state for zone
+        leader_state = self._build_device_state(leader_device_id)
+
+        # Build zone state using zone logic
+        zone_state = {
+            'cur_temp_c': leader_state['cur_temp_c'],
+            'cur_temp_f': leader_state['cur_temp_f'],
+            'hum_perc': leader_state['hum_perc'],
+            'target_temp_c': leader_state['target_temp_c'],
+            'target_temp_f': leader_state['target_temp_f'],
+            'mode': 0,
+            'cur_heating': 0
+        }
+
+        # Apply circuit driver logic for heating states (using cache)
+        if is_circuit_driver:
+            # Circuit driver - check radiator valves in zone (from cache)
+            other_devices = [dev_id for dev_id, dev_info in self.state_manager.device_info_cache.items()
+                            if dev_info.get('zone_id') == zone_id and not dev_info.get('is_circuit_driver')]
+
+            if other_devices:
+                for valve_id in other_devices:
+                    valve_state = self._build_device_state(valve_id)
+                    if valve_state and valve_state.get('mode') == 1:
+                        zone_state['mode'] = 1
+                    if valve_state and valve_state.get('cur_heating') == 1:
+                        zone_state['cur_heating'] = 1
+            else:
+                # Circuit driver alone in zone - use its own state
+                zone_state['mode'] = leader_state['mode']
+                zone_state['cur_heating'] = leader_state['cur_heating']
+        else:
+            # Regular device - use leader state
+            zone_state['mode'] = leader_state['mode']
+            zone_state['cur_heating'] = leader_state['cur_heating']
+        return zone_state
+
+    async def _broadcast_zone_state(self, zone_id: Optional[int]):
+        """Broadcast the aggregated state of a zone, if it changed since the last broadcast."""
+        try:
+            zone_state = self._build_zone_state(zone_id)
+            if zone_state is None:
+                return
+
+            # Only broadcast if zone state actually changed
+            last_zone_state = self.last_zone_states.get(zone_id)
+            if last_zone_state != zone_state:
+                self.last_zone_states[zone_id] = zone_state.copy()
+
+                # Broadcast zone state change
+                zone_event = {
+                    'type': 'zone',
+                    'zone_id': zone_id,
+                    'zone_name': self.state_manager.zone_cache[zone_id]['name'],
+                    'state': zone_state,
+                    'timestamp': time.time()
+                }
+                await self.broadcast_event(zone_event)
+
+        except Exception as e:
+            logger.debug(f"Error broadcasting zone state: {e}")
+
     async def setup_polling_system(self):
         """Setup polling system for comparison with events."""
         try:
             # Find all interesting characteristics for polling (not just temperature)
             self.poll_chars = []
+            self.poll_char_types = {}
 
             for accessory in self.accessories_cache:
                 aid = accessory["aid"]
@@ -654,6 +1133,7 @@ class TadoLocalAPI:
                         if "ev" in perms and "pr" in perms:
                             iid = char["iid"]
                             self.poll_chars.append((aid, iid))
+                            self.poll_char_types[(aid, iid)] = normalize_uuid(char.get("type"))
 
             if self.poll_chars:
                 logger.info(f"Found {len(self.poll_chars)} characteristics for polling")
@@ -670,73 +1150,80 @@ class TadoLocalAPI:
             logger.warning(f"Failed to setup polling system: {e}")
 
     async def background_polling_loop(self):
-        """Background task that polls all monitored characteristics.
+        """Background task that polls the monitored characteristics while events are unavailable.
 
-        Uses intelligent polling intervals:
-        - Fast poll (60s) for characteristics that have events but might not fire reliably
-        - Slow poll (120s) as safety net for everything else
+        Each characteristic is polled on its own adaptive interval (see tado_local.polling).
+        Event subscription is retried every EVENT_RETRY_INTERVAL seconds and polling
+        stops as soon as it succeeds.
         """
-        fast_poll_interval = 60  # 1 minute for priority characteristics
-        slow_poll_interval = 120  # 2 minutes for everything
-
-        # Track characteristics that need faster polling (like humidity)
-        priority_chars = set()
-
-        # Identify priority characteristics (humidity, battery, etc.)
-        for aid, iid in self.monitored_characteristics:
-            char_key = (aid, iid)
-            char_name = self.characteristic_map.get(char_key, "")
+        scheduler = AdaptivePollScheduler(
+            self.monitored_characteristics,
+            lambda key: importance(self.poll_char_types.get(key, '')),
+        )
+        self.poll_scheduler = scheduler
+        next_event_retry = time.monotonic() + self.EVENT_RETRY_INTERVAL
+        logger.info(f"Adaptive polling for {len(scheduler)} characteristics")
 
-            # Add humidity to priority list
-            if 'humidity' in char_name.lower():
-                priority_chars.add((aid, iid))
-
-        if priority_chars:
-            logger.info(f"Fast polling ({fast_poll_interval}s) for {len(priority_chars)} characteristics")
-            logger.info(f"Normal polling ({slow_poll_interval}s) for {len(self.monitored_characteristics) - len(priority_chars)} characteristics")
-
-        last_fast_poll = 0
-        last_slow_poll = 0
-
-        while not self.is_shutting_down:
-            try:
-                current_time = time.time()
-                await asyncio.sleep(10)  # Check every 10 seconds
-
-                if not self.pairing or not hasattr(self, 'monitored_characteristics'):
-                    continue
+        try:
+            while not self.is_shutting_down:
+                try:
+                    now = time.monotonic()
+                    deadline = scheduler.next_deadline()
+                    wake_at = next_event_retry if deadline is None else min(next_event_retry, deadline)
+                    if wake_at > now:
+                        await asyncio.sleep(wake_at - now)
+                        continue
+
+                    if not self.pairing:
+                        await asyncio.sleep(10)
+                        continue
+
+                    if now >= next_event_retry:
+                        next_event_retry = now + self.EVENT_RETRY_INTERVAL
+                        if await self.setup_persistent_events():
+                            logger.info("Event subscription restored, stopping polling")
+                            self._start_event_watchdog()
+                            return
+
+                    due = scheduler.pop_due(now)
+                    if not due:
+                        continue
+
+                    logger.debug(f"Polling {len(due)} characteristics (batch size {scheduler.batch_size})")
+                    started = time.perf_counter()
+                    values = await self._poll_characteristics(due, "POLLING", batch_size=len(due))
+                    scheduler.observe_latency(time.perf_counter() - started, len(due))
+                    for key in due:
+                        scheduler.record(key, values.get(key))
 
-                # Fast poll priority characteristics
-                if current_time - last_fast_poll >= fast_poll_interval and priority_chars:
-                    logger.debug(f"Fast polling {len(priority_chars)} priority characteristics")
-                    await self._poll_characteristics(list(priority_chars), "FAST-POLL")
-                    last_fast_poll = current_time
+                except Exception as e:
+                    logger.error(f"Background polling error: {e}")
+                    await asyncio.sleep(5)  # Short delay before retrying
+        finally:
+            self.poll_scheduler = None
 
-                # Slow poll all characteristics
-                if current_time - last_slow_poll >= slow_poll_interval:
-                    logger.debug(f"Slow polling {len(self.monitored_characteristics)} characteristics")
-                    await self._poll_characteristics(self.monitored_characteristics, "POLLING")
-                    last_slow_poll = current_time
+    async def _poll_characteristics(self, char_list, source="POLLING", batch_size=15):
+        """Poll a list of characteristics and process changes.
 
-            except Exception as e:
-                logger.error(f"Background polling error: {e}")
-                await asyncio.sleep(5)  # Short delay before retrying
+        Returns:
+            Dict mapping (aid, iid) to the value read
+        """
+        values = {}
 
-    async def _poll_characteristics(self, char_list, source="POLLING"):
-        """Poll a list of characteristics and process changes."""
         # Poll in batches to avoid overwhelming the device
-        batch_size = 15
-
         for i in range(0, len(char_list), batch_size):
             batch = char_list[i:i+batch_size]
 
             try:
-                results = await self.pairing.get_characteristics(batch)
+                with tracing.span('homekit.get_characteristics', count=len(batch)), \
+                        metrics.HOMEKIT_REQUEST_SECONDS.labels('get_characteristics').time():
+                    results = await self.pairing.get_characteristics(batch)
 
                 for aid, iid in batch:
                     if (aid, iid) in results:
                         char_data = results[(aid, iid)]
                         value = char_data.get('value')
+                        values[(aid, iid)] = value
 
                         # Create proper update_data format for unified change handler
                         update_data = {
@@ -747,8 +1234,11 @@ class TadoLocalAPI:
                         await self.handle_change(aid, iid, update_data, source)
 
             except Exception as e:
+                metrics.HOMEKIT_REQUEST_ERRORS.labels('get_characteristics').inc()
                 logger.error(f"Error polling batch: {e}")
 
+        return values
+
     async def handle_homekit_event(self, event_data):
         """Handle incoming HomeKit events and update device states."""
         try:
@@ -776,71 +1266,252 @@ class TadoLocalAPI:
         except Exception as e:
             logger.error(f"Error handling HomeKit event: {e}")
 
-    async def set_device_characteristics(self, device_id: int, char_updates: Dict[str, Any]) -> bool:
+    async def set_device_characteristics(self, device_id: int, char_updates: Dict[str, Any],
+                                         wait: bool = True) -> Dict[str, Any]:
         """
         Set characteristics for a device.
 
+        A write to a device that was not written in the last WRITE_DEBOUNCE seconds is
+        sent right away. Writes that follow within that window are queued and sent
+        WRITE_DEBOUNCE seconds after the first queued one, so a burst (e.g. dragging a
+        slider) becomes a few HomeKit writes instead of one per value. Later values win
+        and fields from different calls (mode and temperature) are merged. The
+        optimistic state shows the merged values right away.
+
         Args:
             device_id: Database device ID
             char_updates: Dict mapping characteristic UUIDs to values
                          e.g., {'target_temperature': 21.0, 'target_heating_cooling_state': 1}
+            wait: Wait until the write has been sent; when False, return once it is queued
 
         Returns:
-            True if successful
+            The merged values of the write this call was part of (the values the bridge
+            received when waiting; the values queued so far otherwise)
 
         Raises:
             ValueError if device not found or characteristics not writable
+            RuntimeError if the bridge rejected the write (when waiting)
         """
         if not self.pairing:
             raise ValueError("Bridge not connected")
 
-        # Get device info from in-memory cache
-        device_info = self.state_manager.get_device_info(device_id)
-        if not device_info:
+        if not self.state_manager.get_device_info(device_id):
             raise ValueError(f"Device {device_id} not found")
 
-        aid = device_info.get('aid')
-        if not aid:
-            # Cache might be stale, try reloading
-            logger.info(f"Device {device_id} has no aid in cache, reloading device cache...")
-            self.state_manager._load_device_cache()
-            device_info = self.state_manager.get_device_info(device_id)
-            aid = device_info.get('aid') if device_info else None
+        resolved = self._resolve_writes(device_id, char_updates, quiet=True)
+        if not resolved:
+            raise ValueError("No valid characteristics to set")
+        char_updates = {field: value for field, (_, _, value) in resolved.items()}
+
+        pending = self.pending_writes.get(device_id)
+        if pending is None:
+            loop = asyncio.get_running_loop()
+            pending = {'updates': {}, 'future': loop.create_future(), 'flush_now': asyncio.Event(), 'calls': 0}
+            # Mark the result as retrieved so failed writes nobody waits for don't warn
+            pending['future'].add_done_callback(lambda f: f.cancelled() or f.exception())
+            self.pending_writes[device_id] = pending
+            # Only debounce when the device was just written (part of a burst)
+            since_last = time.monotonic() - self.last_device_write.get(device_id, float('-inf'))
+            delay = self.WRITE_DEBOUNCE if since_last < self.WRITE_DEBOUNCE else 0
+            pending['task'] = asyncio.create_task(self._flush_device_writes(device_id, delay))
+        elif pending['calls']:
+            logger.debug(f"Coalescing write for device {device_id}: {pending['updates']} + {char_updates}")
+        pending['updates'].update(char_updates)
+        pending['calls'] += 1
+        self.state_manager.set_optimistic_state(device_id, char_updates, merge=True)
+
+        if not wait:
+            return dict(pending['updates'])
+        return await asyncio.shield(pending['future'])
+
+    async def _flush_device_writes(self, device_id: int, delay: float):
+        """Send the queued writes of a device after the debounce delay (or when flush_now is set).
+
+        The queued writes' future always completes: with the written values, or with the
+        error when the writes could not be resolved, failed or were rejected by the bridge
+        (the optimistic state is cleared then).
+        """
+        flush_now = self.pending_writes[device_id]['flush_now']
+        if delay:
+            try:
+                await asyncio.wait_for(flush_now.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+        pending = self.pending_writes.pop(device_id)
+        updates = pending['updates']
+        if pending['calls'] > 1:
+            metrics.WRITES_COALESCED.inc(pending['calls'] - 1)
 
-            if not aid:
-                raise ValueError(f"Device {device_id} has no HomeKit accessory ID (aid)")
+        try:
+            # The write plans may have changed (new c#) since the writes were queued
+            characteristics_to_set = list(self._resolve_writes(device_id, updates).values())
+        except ValueError as e:
+            logger.error(f"Cannot write {updates} to device {device_id}: {e}")
+            self.state_manager.clear_optimistic_state(device_id)
+            pending['future'].set_exception(e)
+            return
+        self.last_device_write[device_id] = time.monotonic()
 
-        # Map characteristic names to UUIDs
-        char_uuid_map = {
-            'target_temperature': DeviceStateManager.CHAR_TARGET_TEMPERATURE,
-            'target_heating_cooling_state': DeviceStateManager.CHAR_TARGET_HEATING_COOLING,
-            'target_humidity': DeviceStateManager.CHAR_TARGET_HUMIDITY,
-        }
+        # Set the characteristics
+        logger.debug(f"Sending to HomeKit: {characteristics_to_set}")
+        for set_aid, set_iid, _ in characteristics_to_set:
+            tracing.expect_echo((set_aid, set_iid))
+        self.write_tracker.record_write(device_id, characteristics_to_set)
+        try:
+            with tracing.span('homekit.put_characteristics', device_id=device_id, count=len(characteristics_to_set)), \
+                    metrics.HOMEKIT_REQUEST_SECONDS.labels('put_characteristics').time():
+                errors = await self.pairing.put_characteristics(characteristics_to_set)
+        except Exception as e:
+            metrics.HOMEKIT_REQUEST_ERRORS.labels('put_characteristics').inc()
+            logger.error(f"Failed to write {updates} to device {device_id}: {e}")
+            self.write_tracker.record_rejected([(aid, iid) for aid, iid, _ in characteristics_to_set])
+            self.state_manager.clear_optimistic_state(device_id)
+            pending['future'].set_exception(e)
+            return
+
+        if errors:
+            logger.warning(f"Bridge rejected writes for device {device_id}: {errors}")
+            self.write_tracker.record_rejected(list(errors))
+            self.state_manager.clear_optimistic_state(device_id)
+            rejected = {f"{aid}.{iid}": error for (aid, iid), error in errors.items()}
+            pending['future'].set_exception(RuntimeError(f"Bridge rejected writes for device {device_id}: {rejected}"))
+            return
+        pending['future'].set_result(updates)
+
+    async def flush_pending_writes(self, device_ids: Optional[List[int]] = None):
+        """Send queued writes now instead of after the debounce delay.
+
+        Args:
+            device_ids: Only flush these devices (all queued writes when None)
+        """
+        pending_writes = [pending for device_id, pending in self.pending_writes.items()
+                          if device_ids is None or device_id in device_ids]
+        for pending in pending_writes:
+            pending['flush_now'].set()
+        await asyncio.gather(*(pending['task'] for pending in pending_writes), return_exceptions=True)
+
+    def _resolve_writes(self, device_id: int, char_updates: Dict[str, Any], quiet: bool = False) -> Dict[str, tuple]:
+        """Map {field: value} to (aid, iid, value) writes using the device's write plan.
 
-        # Find the characteristic IIDs in the accessory
-        characteristics_to_set = []
+        Values are checked against the characteristic's HomeKit metadata and converted
+        to its format (floats are rounded to minStep). Fields the device cannot write
+        are skipped.
+
+        Returns:
+            Dict mapping field to the (aid, iid, value) write
+
+        Raises:
+            ValueError if a value is invalid for its characteristic, or the write plans
+            are from an older accessory configuration
+        """
+        if self.write_plans_config_num != self.config_num:
+            raise ValueError(f"Accessory configuration changed (c#={self.config_num}); refresh accessories first")
+
+        plan = self.write_plans.get(device_id, {})
+        writes = {}
         for char_name, value in char_updates.items():
-            char_uuid = char_uuid_map.get(char_name)
-            if not char_uuid:
-                logger.warning(f"Unknown characteristic: {char_name}")
+            entry = plan.get(char_name)
+            if entry is None:
+                if not quiet:
+                    if char_name in self.WRITABLE_CHARACTERISTICS:
+                        logger.warning(f"Device {device_id} has no writable {char_name}")
+                    else:
+                        logger.warning(f"Unknown characteristic: {char_name}")
                 continue
+            value = self._check_write_value(device_id, char_name, entry, value)
+            writes[char_name] = (entry['aid'], entry['iid'], value)
+            if not quiet:
+                logger.info(f"Setting {char_name} on device {device_id} (aid={entry['aid']}, iid={entry['iid']}) to {value}")
+        return writes
+
+    def _check_write_value(self, device_id: int, char_name: str, entry: Dict[str, Any], value: Any) -> Any:
+        """Validate a value against a write plan entry and convert it to the HAP format."""
+        fmt = entry['format']
+        if fmt == 'bool':
+            if value not in (True, False, 0, 1):
+                raise ValueError(f"{char_name} must be a boolean, got {value!r}")
+            return bool(value)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"{char_name} must be a number, got {value!r}")
+
+        if fmt in self.INTEGER_FORMATS:
+            if value != int(value):
+                raise ValueError(f"{char_name} must be a whole number, got {value!r}")
+            value = int(value)
+        else:
+            value = float(value)
+            step = entry['step']
+            if step:
+                base = entry['min'] or 0
+                value = round(base + round((value - base) / step) * step, 6)
+
+        if (entry['min'] is not None and value < entry['min']) or (entry['max'] is not None and value > entry['max']):
+            raise ValueError(f"{char_name}={value} is outside {entry['min']}..{entry['max']} for device {device_id}")
+        if entry['valid'] is not None and value not in entry['valid']:
+            raise ValueError(f"{char_name}={value} is not supported by device {device_id} (valid: {entry['valid']})")
+        return value
+
+    async def set_characteristics_bulk(self, updates: Dict[int, Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+        """
+        Set characteristics on several devices with a single put_characteristics call.
 
-            # Find the IID for this characteristic
-            for acc in self.accessories_cache:
-                if acc.get('aid') == aid:
-                    for service in acc.get('services', []):
-                        for char in service.get('characteristics', []):
-                            if char.get('type').lower() == char_uuid.lower():
-                                iid = char.get('iid')
-                                if iid:
-                                    characteristics_to_set.append((aid, iid, value))
-                                    logger.info(f"Setting {char_name} on device {device_id} (aid={aid}, iid={iid}) to {value}")
-                                break
-
-        if not characteristics_to_set:
-            raise ValueError("No valid characteristics to set")
+        Optimistic state is applied to all devices before the write and cleared again
+        for devices whose write the bridge rejected. Queued single-device writes for
+        these devices are sent first, so they cannot overwrite the bulk values later.
 
-        # Set the characteristics
-        logger.debug(f"Sending to HomeKit: {characteristics_to_set}")
-        await self.pairing.put_characteristics(characteristics_to_set)
-        return True
+        Args:
+            updates: Dict mapping device_id to {field: value},
+                     e.g., {12: {'target_temperature': 21.0}, 14: {'target_heating_cooling_state': 0}}
+
+        Returns:
+            Dict mapping device_id to the HAP errors of its writes ("aid.iid" -> error); empty when applied
+
+        Raises:
+            ValueError if the bridge is not connected or a device has nothing writable
+        """
+        if not self.pairing:
+            raise ValueError("Bridge not connected")
+
+        writes = []
+        owners = {}
+        resolved_updates = {}
+        for device_id, char_updates in updates.items():
+            device_writes = self._resolve_writes(device_id, char_updates)
+            if not device_writes:
+                raise ValueError(f"No valid characteristics to set for device {device_id}")
+            writes.extend(device_writes.values())
+            resolved_updates[device_id] = {field: value for field, (_, _, value) in device_writes.items()}
+            for aid, iid, _ in device_writes.values():
+                owners[(aid, iid)] = device_id
+        updates = resolved_updates
+        await self.flush_pending_writes(list(updates))
+
+        for device_id, char_updates in updates.items():
+            self.state_manager.set_optimistic_state(device_id, char_updates, merge=True)
+        for aid, iid, _ in writes:
+            tracing.expect_echo((aid, iid))
+        for device_id in updates:
+            self.write_tracker.record_write(device_id, [w for w in writes if owners[(w[0], w[1])] == device_id])
+
+        try:
+            with tracing.span('homekit.put_characteristics', devices=len(updates), count=len(writes)), \
+                    metrics.HOMEKIT_REQUEST_SECONDS.labels('put_characteristics').time():
+                errors = await self.pairing.put_characteristics(writes)
+        except Exception:
+            metrics.HOMEKIT_REQUEST_ERRORS.labels('put_characteristics').inc()
+            self.write_tracker.record_rejected(list(owners))
+            for device_id in updates:
+                self.state_manager.clear_optimistic_state(device_id)
+            raise
+
+        results: Dict[int, Dict[str, Any]] = {device_id: {} for device_id in updates}
+        self.write_tracker.record_rejected(list(errors or {}))
+        for (aid, iid), error in (errors or {}).items():
+            device_id = owners.get((aid, iid))
+            if device_id is not None:
+                results[device_id][f"{aid}.{iid}"] = error
+        for device_id, device_errors in results.items():
+            if device_errors:
+                logger.warning(f"Bridge rejected writes for device {device_id}: {device_errors}")
+                self.state_manager.clear_optimistic_state(device_id)
+        return results
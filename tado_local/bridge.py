@@ -22,7 +22,7 @@ import sqlite3
 import traceback
 import uuid
 from pathlib import Path
-from typing import Optional
+from typing import Any, Awaitable, Callable, Optional
 
 from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
 from cryptography.hazmat.primitives import serialization
@@ -353,6 +353,115 @@ class TadoBridge:
         logger.error("============================================================")
         raise Exception("All pairing attempts failed - see troubleshooting info above")
 
+    @staticmethod
+    async def get_advertised_config_num(accessory_id: str, timeout: float = 3.0) -> Optional[int]:
+        """Look up the configuration number (c#) a HomeKit accessory advertises via mDNS.
+
+        The c# changes whenever the accessory database changes (devices added or
+        removed), so a cached accessory list with the same number is still valid.
+
+        Args:
+            accessory_id: HomeKit accessory id (AccessoryPairingID, the 'id' TXT record)
+            timeout: Seconds to wait for the bridge to answer
+
+        Returns:
+            The advertised config number, or None if the bridge was not found in time
+        """
+        from zeroconf import ServiceStateChange
+        from zeroconf.asyncio import AsyncServiceBrowser
+
+        service_type = "_hap._tcp.local."
+        loop = asyncio.get_running_loop()
+        found: asyncio.Future = loop.create_future()
+        lookups = set()
+
+        async def _check(name: str):
+            config_num = await TadoBridge._resolve_config_num(async_zc, name, accessory_id, timeout)
+            if config_num is not None and not found.done():
+                found.set_result(config_num)
+
+        def _on_change(zeroconf, service_type, name, state_change):
+            if state_change in (ServiceStateChange.Added, ServiceStateChange.Updated):
+                task = loop.create_task(_check(name))
+                lookups.add(task)
+                task.add_done_callback(lookups.discard)
+
+        async_zc = AsyncZeroconf()
+        browser = None
+        try:
+            browser = AsyncServiceBrowser(async_zc.zeroconf, service_type, handlers=[_on_change])
+            config_num = await asyncio.wait_for(found, timeout)
+            logger.info(f"Bridge advertises configuration number c#={config_num}")
+            return config_num
+        except asyncio.TimeoutError:
+            logger.info(f"Bridge {accessory_id} not seen via mDNS within {timeout:.0f}s; accessory cache not used")
+            return None
+        except Exception as e:
+            logger.warning(f"mDNS lookup of bridge configuration number failed: {e}")
+            return None
+        finally:
+            for task in list(lookups):
+                task.cancel()
+            if browser:
+                await browser.async_cancel()
+            await async_zc.async_close()
+
+    @staticmethod
+    async def _resolve_config_num(async_zc: AsyncZeroconf, name: str, accessory_id: str, timeout: float) -> Optional[int]:
+        """The c# of a _hap._tcp service, if it is the given accessory."""
+        from zeroconf.asyncio import AsyncServiceInfo
+
+        info = AsyncServiceInfo("_hap._tcp.local.", name)
+        if not await info.async_request(async_zc.zeroconf, int(timeout * 1000)):
+            return None
+        props = {k.decode().lower(): (v or b'').decode() for k, v in info.properties.items()}
+        if props.get('id', '').lower() != accessory_id.lower():
+            return None
+        return int(props['c#'])
+
+    @staticmethod
+    async def watch_config_num(accessory_id: str, on_change: Callable[[int], Awaitable[Any]],
+                               timeout: float = 3.0, retry_interval: float = 60.0):
+        """Pass every configuration number (c#) the accessory advertises to on_change.
+
+        Runs until cancelled. The bridge re-announces itself via mDNS when its c#
+        changes (devices added or removed). When on_change fails (e.g. the accessory
+        list could not be downloaded), the same announcement is retried after
+        retry_interval seconds.
+
+        Args:
+            accessory_id: HomeKit accessory id (AccessoryPairingID, the 'id' TXT record)
+            on_change: Coroutine function called with the advertised c#
+            timeout: Seconds to wait for a service to resolve
+            retry_interval: Seconds before a failed on_change is retried
+        """
+        from zeroconf import ServiceStateChange
+        from zeroconf.asyncio import AsyncServiceBrowser
+
+        service_type = "_hap._tcp.local."
+        loop = asyncio.get_running_loop()
+        announced: asyncio.Queue = asyncio.Queue()
+
+        def _on_change(zeroconf, service_type, name, state_change):
+            if state_change in (ServiceStateChange.Added, ServiceStateChange.Updated):
+                announced.put_nowait(name)
+
+        async_zc = AsyncZeroconf()
+        browser = AsyncServiceBrowser(async_zc.zeroconf, service_type, handlers=[_on_change])
+        try:
+            while True:
+                name = await announced.get()
+                try:
+                    config_num = await TadoBridge._resolve_config_num(async_zc, name, accessory_id, timeout)
+                    if config_num is not None:
+                        await on_change(config_num)
+                except Exception as e:
+                    logger.error(f"Failed to apply bridge configuration change (retrying in {retry_interval:.0f}s): {e}")
+                    loop.call_later(retry_interval, announced.put_nowait, name)
+        finally:
+            await browser.async_cancel()
+            await async_zc.async_close()
+
     @staticmethod
     async def pair_or_load(bridge_ip: Optional[str], pin: Optional[str], db_path: Path, clear_pairings: bool = False):
         """Load existing pairing or perform new pairing."""
@@ -423,11 +532,10 @@ class TadoBridge:
                 # Create pairing with controller instance
                 pairing = IpPairing(controller, pairing_data)
 
-                # Test connection
+                # Test connection (pair-verify). The accessory list is loaded later by
+                # TadoLocalAPI.initialize, from the cache when the config number matches.
                 await pairing._ensure_connected()
-                accessories = await pairing.list_accessories_and_characteristics()
                 logger.info(f"Successfully connected to {selected_bridge_ip}!")
-                logger.info(f"Found {len(accessories)} accessories")
 
                 return pairing, selected_bridge_ip
 
@@ -70,22 +70,39 @@ Benefits:
 import asyncio
 import logging
 import time
-from typing import Optional, Dict, Any
+from typing import TYPE_CHECKING, Optional, Dict, Any
 from datetime import datetime, timedelta
 import sqlite3
 import json
+from . import metrics, tracing
 from .database import CLOUD_SCHEMA
-from .api import TadoLocalAPI
 from .__version__ import __version__
 
-try:
-    import aiohttp
-except ImportError:
-    aiohttp = None
+if TYPE_CHECKING:
+    from .api import TadoLocalAPI
+
+# aiohttp is imported on first use (see _load_aiohttp) to keep package import fast
+aiohttp = None
 
 logger = logging.getLogger(__name__)
 
 
+def _load_aiohttp():
+    """Import aiohttp on first use.
+
+    Returns:
+        The aiohttp module, or None if it is not installed
+    """
+    global aiohttp
+    if aiohttp is None:
+        try:
+            import aiohttp as _aiohttp
+        except ImportError:
+            return None
+        aiohttp = _aiohttp
+    return aiohttp
+
+
 class RateLimitInfo:
     """
     Tado API rate limit information parsed from response headers.
@@ -204,12 +221,20 @@ class TadoCloudAPI:
     # User-Agent for API identification and communication channel
     USER_AGENT = f"TadoLocal/{__version__} (+https://github.com/ampscm/TadoLocal)"
 
-    def __init__(self, db_path: str, tado_api: TadoLocalAPI):
+    def __init__(self, db_path: str, tado_api: 'TadoLocalAPI',
+                 api_base_url: Optional[str] = None, auth_base_url: Optional[str] = None):
         """Initialize Tado Cloud API client.
 
         Args:
             db_path: Path to SQLite database for token storage
+            tado_api: TadoLocalAPI instance that receives synced cloud data
+            api_base_url: Override for API_BASE_URL (e.g. tado_local.fake_cloud)
+            auth_base_url: Override for AUTH_BASE_URL
         """
+        if api_base_url:
+            self.API_BASE_URL = api_base_url.rstrip('/')
+        if auth_base_url:
+            self.AUTH_BASE_URL = auth_base_url.rstrip('/')
         self.db_path = db_path
         self.tado_api = tado_api
         self.access_token: Optional[str] = None
@@ -313,7 +338,7 @@ class TadoCloudAPI:
             logger.info("Device code still valid, not starting new authentication request.")
             return False
 
-        if aiohttp is None:
+        if _load_aiohttp() is None:
             logger.error("aiohttp not installed - cannot use Tado Cloud API")
             logger.error("Install with: pip install aiohttp")
             return False
@@ -502,7 +527,7 @@ class TadoCloudAPI:
             logger.warning("No refresh token available")
             return False
 
-        if aiohttp is None:
+        if _load_aiohttp() is None:
             logger.error("aiohttp not installed")
             return False
 
@@ -517,6 +542,7 @@ class TadoCloudAPI:
                     },
                     headers={'User-Agent': self.USER_AGENT}
                 ) as resp:
+                    metrics.CLOUD_REQUESTS.labels('token', resp.status).inc()
                     if resp.status == 200:
                         token_data = await resp.json()
                         self._save_tokens(token_data)
@@ -642,7 +668,9 @@ class TadoCloudAPI:
 
                             # Sync to database
                             from .sync import TadoCloudSync
-                            sync = TadoCloudSync(self.db_path)
+                            # Sync diffs against (and patches) the state manager caches in place
+                            state_manager = self.tado_api.state_manager if self.tado_api else None
+                            sync = TadoCloudSync(self.db_path, state_manager)
 
                             # Pass what we fetched (None values will be skipped in sync)
                             if await sync.sync_all(self,
@@ -650,11 +678,6 @@ class TadoCloudAPI:
                                                    zones_data=zones,
                                                    zone_states_data=zone_states,
                                                    devices_data=devices):
-                                # Reload caches to pick up any changes (especially zone/device creation)
-                                if self.tado_api and self.tado_api.state_manager:
-                                    self.tado_api.state_manager._load_device_cache()
-                                    self.tado_api.state_manager._load_zone_cache()
-
                                 # Calculate next sync time (use shorter of the two intervals)
                                 next_dynamic_in = dynamic_interval - (time.time() - last_dynamic_sync)
                                 next_static_in = static_interval - (time.time() - last_static_sync)
@@ -744,6 +767,9 @@ class TadoCloudAPI:
         new_limit = RateLimitInfo.from_headers(headers)
         if new_limit.granted_calls:
             self.rate_limit = new_limit
+            metrics.CLOUD_RATE_LIMIT_GRANTED.set(new_limit.granted_calls)
+            if new_limit.remaining_calls is not None:
+                metrics.CLOUD_RATE_LIMIT_REMAINING.set(new_limit.remaining_calls)
 
             # Log warning if getting close to limit
             if new_limit.remaining_calls is not None and new_limit.granted_calls:
@@ -829,6 +855,29 @@ class TadoCloudAPI:
 
         logger.debug(f"Cached endpoint '{endpoint}' (expires: {expires_at.isoformat()})")
 
+    def _touch_cache(self, endpoint: str, cache_lifetime_hours: float = 4.0):
+        """
+        Extend the expiry of a cached response without rewriting its payload.
+
+        Args:
+            endpoint: API endpoint path
+            cache_lifetime_hours: How long to cache from now (default: 4 hours)
+        """
+        if not self.home_id:
+            return
+
+        expires_at = datetime.now() + timedelta(hours=cache_lifetime_hours)
+
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("""
+            UPDATE tado_cloud_cache SET expires_at = ?
+            WHERE home_id = ? AND endpoint = ?
+        """, (expires_at.isoformat(), self.home_id, endpoint))
+        conn.commit()
+        conn.close()
+
+        logger.debug(f"Extended cache for endpoint '{endpoint}' (expires: {expires_at.isoformat()})")
+
     def _clear_cache(self, endpoint: Optional[str] = None):
         """
         Clear cached data.
@@ -872,7 +921,7 @@ class TadoCloudAPI:
         Returns:
             Response data dict or None on error
         """
-        if aiohttp is None:
+        if _load_aiohttp() is None:
             logger.error("aiohttp not installed")
             return None
 
@@ -897,48 +946,52 @@ class TadoCloudAPI:
 
             url = f"{self.API_BASE_URL}/homes/{self.home_id}/{endpoint}"
 
-            async with aiohttp.ClientSession() as session:
-                logger.debug(f"Fetching {url}")
-                async with session.get(url, headers=headers) as resp:
-                    # Update rate limit tracking from response headers
-                    self._update_rate_limit(resp.headers)
-
-                    # 304 Not Modified - use cached data
-                    if resp.status == 304:
-                        logger.info(f"API returned 304 Not Modified for {url} - served from cache")
-                        if cached:
-                            # Update expiry time
-                            self._set_cache(endpoint, cached['data'], cached['etag'], cache_lifetime_hours)
-                            return cached['data']
-                        else:
-                            logger.warning(f"Got 304 but no cache available for {url}")
-                            return None
+            with tracing.span('cloud.fetch', endpoint=endpoint or 'home') as fetch_span:
+                async with aiohttp.ClientSession() as session:
+                    logger.debug(f"Fetching {url}")
+                    async with session.get(url, headers=headers) as resp:
+                        metrics.CLOUD_REQUESTS.labels(endpoint or 'home', resp.status).inc()
+                        fetch_span.set_attribute('http.status_code', resp.status)
+                        # Update rate limit tracking from response headers
+                        self._update_rate_limit(resp.headers)
+
+                        # 304 Not Modified - use cached data
+                        if resp.status == 304:
+                            logger.info(f"API returned 304 Not Modified for {url} - served from cache")
+                            if cached:
+                                # Update expiry time only (payload and ETag are unchanged)
+                                self._touch_cache(endpoint, cache_lifetime_hours)
+                                return cached['data']
+                            else:
+                                logger.warning(f"Got 304 but no cache available for {url}")
+                                return None
 
-                    # Success
-                    elif resp.status == 200:
-                        data = await resp.json()
-                        etag = resp.headers.get('ETag')
+                        # Success
+                        elif resp.status == 200:
+                            data = await resp.json()
+                            etag = resp.headers.get('ETag')
 
-                        # Cache the response
-                        self._set_cache(endpoint, data, etag, cache_lifetime_hours)
+                            # Cache the response
+                            self._set_cache(endpoint, data, etag, cache_lifetime_hours)
 
-                        logger.info(f"Fetched {url} from API (fresh, not cached)")
-                        return data
+                            logger.info(f"Fetched {url} from API (fresh, not cached)")
+                            return data
 
-                    # Rate limit exceeded
-                    elif resp.status == 429:
-                        error_text = await resp.text()
-                        logger.error(f"Rate limit exceeded for {url}: {error_text}")
-                        logger.warning(f"Tado API rate limit: {self.rate_limit.remaining_calls}/{self.rate_limit.granted_calls} calls remaining")
-                        return None
+                        # Rate limit exceeded
+                        elif resp.status == 429:
+                            error_text = await resp.text()
+                            logger.error(f"Rate limit exceeded for {url}: {error_text}")
+                            logger.warning(f"Tado API rate limit: {self.rate_limit.remaining_calls}/{self.rate_limit.granted_calls} calls remaining")
+                            return None
 
-                    # Error
-                    else:
-                        error_text = await resp.text()
-                        logger.error(f"Failed to fetch {url}: HTTP {resp.status} - {error_text}")
-                        return None
+                        # Error
+                        else:
+                            error_text = await resp.text()
+                            logger.error(f"Failed to fetch {url}: HTTP {resp.status} - {error_text}")
+                            return None
 
         except Exception as e:
+            metrics.CLOUD_REQUESTS.labels(endpoint or 'home', 'error').inc()
             logger.error(f"Error fetching {url}: {e}")
             return None
 
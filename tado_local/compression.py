@@ -0,0 +1,216 @@
+#
+# Copyright 2025 The TadoLocal and AmpScm contributors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Response compression (gzip, and brotli when installed).
+
+The encoding is negotiated from ``Accept-Encoding``. Responses smaller than
+``minimum_size`` are sent as they are, so small JSON replies pay no CPU or latency.
+Streaming responses are compressed incrementally. Server-Sent Events get their
+headers right away and are flushed after every event, so clients still receive
+each event as soon as it is sent.
+
+brotli is optional: ``pip install brotli`` (or ``brotlicffi``) enables ``br``.
+"""
+
+import zlib
+from typing import List, Optional, Tuple
+
+from . import metrics
+
+# Content types that are already compressed
+_SKIP_PREFIXES = (b'image/', b'audio/', b'video/', b'application/zip', b'application/gzip', b'application/octet-stream')
+
+# brotli is optional and imported on first use (see _load_brotli)
+brotli = None
+
+
+def _load_brotli():
+    """Import brotli (or brotlicffi) on first use.
+
+    Returns:
+        The brotli module, or None if neither is installed
+    """
+    global brotli
+    if brotli is None:
+        try:
+            import brotli as _brotli
+        except ImportError:
+            try:
+                import brotlicffi as _brotli
+            except ImportError:
+                return None
+        brotli = _brotli
+    return brotli
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick 'br' or 'gzip' from an Accept-Encoding header (None for identity)."""
+    supported = ('br', 'gzip') if _load_brotli() is not None else ('gzip',)
+    weights = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name == '*':
+            for encoding in supported:
+                weights.setdefault(encoding, q)
+        elif name in supported:
+            weights[name] = q
+    candidates = [encoding for encoding in supported if weights.get(encoding, 0) > 0]
+    # Highest q wins; on ties the order of `supported` (br first) decides
+    return max(candidates, key=lambda encoding: weights[encoding]) if candidates else None
+
+
+class _Compressor:
+    """Incremental compressor with a per-chunk flush for streams."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == 'br':
+            self._br = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)  # wbits 31: gzip container
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        if self.encoding == 'br':
+            return self._br.process(data) + (self._br.flush() if flush else b'')
+        return self._zlib.compress(data) + (self._zlib.flush(zlib.Z_SYNC_FLUSH) if flush else b'')
+
+    def finish(self) -> bytes:
+        if self.encoding == 'br':
+            return self._br.finish()
+        return self._zlib.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing HTTP responses according to Accept-Encoding."""
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        """
+        Args:
+            app: ASGI application
+            minimum_size: Responses smaller than this many bytes are not compressed
+                          (Server-Sent Events are always compressed once negotiated)
+            gzip_level: zlib compression level (1-9)
+            brotli_quality: brotli quality (0-11); low values suit dynamic responses
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        accept = ''
+        for name, value in scope.get('headers', []):
+            if name == b'accept-encoding':
+                accept = value.decode('latin-1')
+                break
+        encoding = choose_encoding(accept) if accept else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await self.app(scope, receive, _CompressingSend(self, encoding, send))
+
+
+class _CompressingSend:
+    """Wraps `send` for one response; decides on compression at the first body message."""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+        self.streaming_events = False
+
+    async def __call__(self, message):
+        if message['type'] == 'http.response.start':
+            self.start = message
+            headers = dict(message.get('headers', []))
+            content_type = headers.get(b'content-type', b'')
+            self.streaming_events = content_type.startswith(b'text/event-stream')
+            self.passthrough = (b'content-encoding' in headers or message.get('status', 200) in (204, 304)
+                                or content_type.startswith(_SKIP_PREFIXES))
+            if self.streaming_events and not self.passthrough:
+                # Event streams may stay silent for a while: send the headers now, not at the first event
+                self.compressor = _Compressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+                await self._send_start(compressed_length=None)
+            return
+
+        if message['type'] != 'http.response.body' or self.passthrough:
+            await self._send_start()
+            await self.send(message)
+            return
+
+        body = message.get('body', b'')
+        more_body = message.get('more_body', False)
+
+        if self.compressor is None:
+            if not more_body and not self.streaming_events and len(body) < self.middleware.minimum_size:
+                # Small complete response: not worth compressing
+                await self._send_start()
+                await self.send(message)
+                return
+            self.compressor = _Compressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+            if not more_body:
+                # Complete response in one message: compress it in one go with a correct length
+                data = self.compressor.compress(body) + self.compressor.finish()
+                await self._send_start(compressed_length=len(data))
+                self._count(len(body), len(data))
+                await self.send({'type': 'http.response.body', 'body': data})
+                return
+            await self._send_start(compressed_length=None)
+
+        if more_body:
+            # Flush per message for event streams so every event reaches the client immediately
+            data = self.compressor.compress(body, flush=self.streaming_events)
+        else:
+            data = self.compressor.compress(body) + self.compressor.finish()
+        self._count(len(body), len(data))
+        if data or not more_body:
+            await self.send({'type': 'http.response.body', 'body': data, 'more_body': more_body})
+
+    async def _send_start(self, compressed_length: Optional[int] = -1):
+        """Send the held response start; compressed_length -1 means uncompressed, None means streamed."""
+        if self.start is None:
+            return
+        start, self.start = self.start, None
+        if compressed_length != -1:
+            headers: List[Tuple[bytes, bytes]] = [(name, value) for name, value in start.get('headers', [])
+                                                  if name not in (b'content-length', b'vary')]
+            vary = [value for name, value in start.get('headers', []) if name == b'vary']
+            headers.append((b'content-encoding', self.encoding.encode()))
+            headers.append((b'vary', b', '.join(vary + [b'Accept-Encoding'])))
+            if compressed_length is not None:
+                headers.append((b'content-length', str(compressed_length).encode()))
+            start = {**start, 'headers': headers}
+        await self.send(start)
+
+    def _count(self, bytes_in: int, bytes_out: int):
+        metrics.HTTP_COMPRESSION_BYTES.labels(self.encoding, 'in').inc(bytes_in)
+        metrics.HTTP_COMPRESSION_BYTES.labels(self.encoding, 'out').inc(bytes_out)
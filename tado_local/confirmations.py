@@ -0,0 +1,186 @@
+#
+# Copyright 2025 The TadoLocal and AmpScm contributors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Tracking of writes until the bridge confirms them.
+
+Every characteristic write is recorded with its expected value. When the bridge
+reports that characteristic again (normally the echoed event, otherwise a poll),
+the write is settled:
+
+- ``confirmed``: the reported value matches; the command-to-confirmation latency
+  is recorded for the device
+- ``overridden``: the device reports a different value (e.g. clamped or changed
+  on the device itself)
+- ``rejected``: put_characteristics returned an error or failed
+- ``timeout``: nothing was reported within ``timeout`` seconds (checked on every
+  write and report, and every ``check_interval`` seconds by ``run()``)
+
+When a device has no unsettled writes left, and no writes queued to be sent, its
+optimistic state is cleared, so predictions are only served until the real value
+is known.
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter, deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+OUTCOMES = ('confirmed', 'overridden', 'rejected', 'timeout')
+
+
+def _matches(expected: Any, actual: Any) -> bool:
+    if isinstance(expected, (int, float)) and isinstance(actual, (int, float)):
+        # The bridge rounds to the characteristic's step (0.1 or 0.5 °C)
+        return abs(expected - actual) < 0.05
+    return expected == actual
+
+
+def _percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    ordered = sorted(values)
+
+    def pick(fraction: float) -> Optional[float]:
+        if not ordered:
+            return None
+        return round(ordered[min(len(ordered) - 1, int(fraction * (len(ordered) - 1)))] * 1000, 1)
+
+    return {'p50': pick(0.5), 'p90': pick(0.9), 'p99': pick(0.99), 'max': pick(1.0)}
+
+
+class WriteConfirmationTracker:
+    """Matches outgoing writes with the values the bridge reports back."""
+
+    def __init__(self, state_manager, timeout: float = 60.0, samples: int = 100, check_interval: float = 5.0,
+                 has_queued_writes: Optional[Callable[[int], bool]] = None):
+        """
+        Args:
+            state_manager: DeviceStateManager whose optimistic state is cleared on settlement
+            timeout: Seconds after which an unconfirmed write counts as timed out
+            samples: Latency samples kept per device
+            check_interval: Seconds between timeout checks in run()
+            has_queued_writes: Returns True while a device has writes waiting to be sent;
+                               their values stay in the optimistic state
+        """
+        self.state_manager = state_manager
+        self.timeout = timeout
+        self.samples = samples
+        self.check_interval = check_interval
+        self.has_queued_writes = has_queued_writes
+        self.pending: Dict[Tuple[int, int], Dict[str, Any]] = {}  # (aid, iid) -> write
+        self.latencies: Dict[int, Deque[float]] = {}  # device_id -> seconds
+        self.outcomes: Dict[int, Counter] = {}  # device_id -> outcome counts
+
+    def record_write(self, device_id: int, writes: List[tuple]):
+        """Remember writes that were just sent.
+
+        Args:
+            device_id: Device the writes belong to
+            writes: (aid, iid, value) triples
+        """
+        self.expire()
+        now = time.monotonic()
+        for aid, iid, value in writes:
+            # A write superseded before it was confirmed keeps the original send time
+            previous = self.pending.get((aid, iid))
+            sent_at = previous['sent_at'] if previous is not None else now
+            self.pending[(aid, iid)] = {'device_id': device_id, 'value': value, 'sent_at': sent_at}
+
+    def record_rejected(self, keys: List[Tuple[int, int]]):
+        """Settle writes the bridge refused (error status or failed request)."""
+        for key in keys:
+            write = self.pending.pop(key, None)
+            if write is not None:
+                self._settle(write['device_id'], 'rejected')
+
+    def observe(self, aid: int, iid: int, value: Any) -> Optional[str]:
+        """Feed a value reported by the bridge.
+
+        Returns:
+            The outcome if this settled a pending write, else None
+        """
+        self.expire()
+        write = self.pending.pop((aid, iid), None)
+        if write is None:
+            return None
+
+        device_id = write['device_id']
+        if _matches(write['value'], value):
+            latency = time.monotonic() - write['sent_at']
+            self.latencies.setdefault(device_id, deque(maxlen=self.samples)).append(latency)
+            metrics.WRITE_CONFIRM_SECONDS.observe(latency)
+            logger.debug(f"Write to device {device_id} ({aid}.{iid}={value}) confirmed after {latency * 1000:.0f} ms")
+            outcome = 'confirmed'
+        else:
+            logger.info(f"Write to device {device_id} ({aid}.{iid}) expected {write['value']}, bridge reported {value}")
+            outcome = 'overridden'
+        self._settle(device_id, outcome)
+        return outcome
+
+    def _settle(self, device_id: int, outcome: str):
+        self.outcomes.setdefault(device_id, Counter())[outcome] += 1
+        metrics.WRITE_OUTCOMES.labels(outcome).inc()
+        if any(write['device_id'] == device_id for write in self.pending.values()):
+            return
+        if self.has_queued_writes is not None and self.has_queued_writes(device_id):
+            return
+        self.state_manager.clear_optimistic_state(device_id)
+
+    def expire(self) -> int:
+        """Settle writes that were not confirmed within the timeout.
+
+        Returns:
+            Number of writes that timed out
+        """
+        if not self.pending:
+            return 0
+        cutoff = time.monotonic() - self.timeout
+        expired = 0
+        for key in [key for key, write in self.pending.items() if write['sent_at'] < cutoff]:
+            write = self.pending.pop(key)
+            logger.warning(f"Write to device {write['device_id']} ({key[0]}.{key[1]}) was not confirmed "
+                           f"within {self.timeout:.0f}s")
+            self._settle(write['device_id'], 'timeout')
+            expired += 1
+        return expired
+
+    async def run(self):
+        """Settle timed-out writes periodically, also when no writes or reports arrive."""
+        while True:
+            await asyncio.sleep(self.check_interval)
+            self.expire()
+
+    def summary(self) -> Dict[str, Any]:
+        """Latency percentiles (ms) and outcome counts, overall and per device."""
+        self.expire()
+        totals = Counter()
+        devices = {}
+        for device_id in sorted(set(self.latencies) | set(self.outcomes)):
+            outcomes = self.outcomes.get(device_id, Counter())
+            totals.update(outcomes)
+            devices[device_id] = {
+                'latency_ms': _percentiles(list(self.latencies.get(device_id, ()))),
+                **{outcome: outcomes.get(outcome, 0) for outcome in OUTCOMES},
+            }
+        return {
+            'pending': len(self.pending),
+            'latency_ms': _percentiles([v for samples in self.latencies.values() for v in samples]),
+            **{outcome: totals.get(outcome, 0) for outcome in OUTCOMES},
+            'devices': devices,
+        }
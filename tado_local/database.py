@@ -16,6 +16,8 @@
 
 """Database schema for Tado Local."""
 
+import os
+
 DB_SCHEMA = """
 CREATE TABLE IF NOT EXISTS pairings (
     id INTEGER PRIMARY KEY,
@@ -116,6 +118,17 @@ CREATE TABLE IF NOT EXISTS device_state_history (
 );
 
 CREATE INDEX IF NOT EXISTS idx_history_device_time ON device_state_history(device_id, timestamp_bucket DESC);
+
+-- Local weekly programs, applied by the schedule engine (day_of_week 0 = Monday,
+-- start_time 'HH:MM' local time, temperature NULL = heating off)
+CREATE TABLE IF NOT EXISTS zone_schedules (
+    zone_id INTEGER NOT NULL,
+    day_of_week INTEGER NOT NULL,
+    start_time TEXT NOT NULL,
+    temperature REAL,
+    PRIMARY KEY (zone_id, day_of_week, start_time),
+    FOREIGN KEY (zone_id) REFERENCES zones(zone_id) ON DELETE CASCADE
+);
 """
 
 HOMEKIT_SCHEMA = """
@@ -156,13 +169,31 @@ CREATE INDEX IF NOT EXISTS idx_cloud_cache_expiry ON tado_cloud_cache(home_id, e
 """
 
 
+# Databases already migrated by this process (absolute path). The state manager,
+# HomeKit cache and bridge all call ensure_schema_and_migrate() defensively;
+# only the first call per database does any work.
+_migrated_databases = set()
+
+
 def ensure_schema_and_migrate(db_path: str):
     """Ensure all schemas exist and run DB migrations using PRAGMA user_version.
 
     Creates core schemas (DB_SCHEMA, HOMEKIT_SCHEMA, CLOUD_SCHEMA) and applies
     incremental migrations. Currently migration to user_version 2 adds a stable
     uuid column to the `zones` table and populates it with generated UUIDs.
+
+    Runs once per database per process; later calls return immediately as long
+    as the database file still exists.
     """
+    db_key = os.path.abspath(os.path.expanduser(str(db_path)))
+    if db_key in _migrated_databases and os.path.exists(db_key):
+        return
+
+    _migrate(db_path)
+    _migrated_databases.add(db_key)
+
+
+def _migrate(db_path: str):
     import sqlite3
     import uuid as _uuid
     # Supported schema version for this codebase. If the database reports a
@@ -0,0 +1,124 @@
+#
+# Copyright 2025 The TadoLocal and AmpScm contributors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Delta encoding of zone and device events.
+
+Delta subscribers get only the state fields that changed since the previous event
+for the same zone or device::
+
+    {"type": "device", "device_id": 4, "seq": 812, "delta": {"valve_position": 45}, "timestamp": ...}
+
+Every event carries a sequence number that increases by one per event of its type
+(zone, device, freshness, ...) in the delta stream, so a client filtering on event
+types still sees consecutive numbers. Full events (``"keyframe": true``) are sent for the first event of a zone or
+device, when its name/serial changes, and periodically (every ``keyframe_every``
+events or ``keyframe_interval`` seconds per zone or device). Clients that see a gap
+in ``seq`` for an event type should reconnect (or wait for the next keyframe).
+
+All delta subscribers share one encoder: they all receive the same stream, and new
+subscribers start with keyframes of the state the next deltas are relative to.
+"""
+
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Events with a per-entity state, and the field identifying the entity
+ENTITY_FIELDS = {'zone': 'zone_id', 'device': 'device_id'}
+
+_MISSING = object()
+
+
+class DeltaEncoder:
+    """Turns full state events into deltas against the last emitted state."""
+
+    def __init__(self, keyframe_every: int = 50, keyframe_interval: float = 600.0,
+                 clock: Callable[[], float] = time.time):
+        """
+        Args:
+            keyframe_every: Send a full event after this many deltas for a zone or device
+            keyframe_interval: Send a full event if the last one for a zone or device is older (seconds)
+            clock: Time source (for tests)
+        """
+        self.keyframe_every = keyframe_every
+        self.keyframe_interval = keyframe_interval
+        self.clock = clock
+        self.seq: Dict[str, int] = {}  # event type -> last sequence number
+        self.last: Dict[Tuple[str, Any], Dict[str, Any]] = {}  # (type, id) -> last full event
+        self.deltas_since_keyframe: Dict[Tuple[str, Any], int] = {}
+        self.keyframe_at: Dict[Tuple[str, Any], float] = {}
+        self.keyframes_sent = 0
+        self.deltas_sent = 0
+
+    def encode(self, event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Encode an event for the delta stream.
+
+        Returns:
+            A delta or keyframe event, the event itself (with a seq) if it has no
+            per-entity state, or None if nothing changed
+        """
+        id_field = ENTITY_FIELDS.get(event.get('type'))
+        if id_field is None or not isinstance(event.get('state'), dict):
+            return {**event, 'seq': self._next_seq(event.get('type'))}
+
+        key = (event['type'], event[id_field])
+        previous = self.last.get(key)
+        now = self.clock()
+        if (previous is None
+                or self.deltas_since_keyframe.get(key, 0) >= self.keyframe_every
+                or now - self.keyframe_at.get(key, now) >= self.keyframe_interval
+                or any(previous.get(k) != v for k, v in event.items() if k not in ('state', 'timestamp'))):
+            self.last[key] = event
+            return self._keyframe(key, event, now)
+
+        old_state = previous['state']
+        new_state = event['state']
+        delta = {k: v for k, v in new_state.items() if old_state.get(k, _MISSING) != v}
+        delta.update({k: None for k in old_state if k not in new_state})
+        if not delta:
+            return None
+
+        self.last[key] = event
+        self.deltas_since_keyframe[key] = self.deltas_since_keyframe.get(key, 0) + 1
+        self.deltas_sent += 1
+        return {'type': event['type'], id_field: event[id_field], 'seq': self._next_seq(event['type']), 'delta': delta,
+                'timestamp': event.get('timestamp')}
+
+    def _next_seq(self, event_type: Optional[str]) -> int:
+        self.seq[event_type] = self.seq.get(event_type, 0) + 1
+        return self.seq[event_type]
+
+    def _keyframe(self, key: Tuple[str, Any], event: Dict[str, Any], now: float) -> Dict[str, Any]:
+        self.deltas_since_keyframe[key] = 0
+        self.keyframe_at[key] = now
+        self.keyframes_sent += 1
+        return {**event, 'seq': self._next_seq(key[0]), 'keyframe': True}
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Keyframes of the last emitted state of every zone and device.
+
+        Sent to new subscribers; their ``seq`` is the current sequence number of
+        their event type, so the next event of that type continues at seq + 1.
+        """
+        return [{**event, 'seq': self.seq.get(event['type'], 0), 'keyframe': True} for event in self.last.values()]
+
+    def summary(self) -> Dict[str, Any]:
+        """Counters for /status."""
+        return {
+            'seq': dict(self.seq),
+            'tracked': len(self.last),
+            'keyframes': self.keyframes_sent,
+            'deltas': self.deltas_sent,
+        }
@@ -0,0 +1,200 @@
+#
+# Copyright 2025 The TadoLocal and AmpScm contributors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Event loop diagnostics: lag monitoring, slow-callback stacks and profiling.
+
+Enabled with ``--diagnostics``. SQLite, JSON and logging all run on the single
+asyncio loop, so any slow step delays SSE delivery for every client. This module
+makes those stalls visible:
+
+- The event loop lag monitor (``metrics.monitor_event_loop_lag``) is the heartbeat:
+  it measures scheduling lag continuously, for /metrics and for this module.
+- A watchdog thread notices when the heartbeat stops (the loop is blocked by a
+  callback or coroutine step) and captures the loop thread's stack while it is
+  still stuck, so the log shows *what* was slow, not just that something was.
+- ``capture_profile()`` runs cProfile on the loop thread for a number of seconds
+  and returns the stats, served for download by ``/diagnostics/profile``.
+"""
+
+import asyncio
+import cProfile
+import io
+import logging
+import marshal
+import pstats
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class LoopDiagnostics:
+    """Measures event loop lag and records stalls with the blocking stack."""
+
+    def __init__(self, slow_threshold: float = 0.1, interval: float = 0.05, window: float = 600.0, max_stalls: int = 50):
+        """
+        Args:
+            slow_threshold: Seconds the loop may be blocked before a stall is recorded
+            interval: Heartbeat interval in seconds
+            window: Seconds of lag samples kept for the rolling summary
+            max_stalls: Number of recent stalls kept (with stacks)
+        """
+        self.slow_threshold = slow_threshold
+        self.interval = interval
+        self.window = window
+        self._samples: Deque[tuple] = deque()  # (monotonic time, lag seconds)
+        self.stalls: Deque[Dict[str, Any]] = deque(maxlen=max_stalls)
+        self.stall_count = 0
+        self.started_at: Optional[float] = None
+
+        self._last_beat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._captured_stack: Optional[List[str]] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._profile_lock = asyncio.Lock()
+
+    def start(self):
+        """Start the lag monitor and watchdog thread (call from the event loop).
+
+        The lag monitor also feeds the /metrics lag histogram, so don't run a
+        separate ``metrics.monitor_event_loop_lag`` alongside it.
+        """
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self.started_at = time.time()
+        self._stop.clear()
+        self._task = asyncio.create_task(metrics.monitor_event_loop_lag(self.interval, self._heartbeat))
+        self._watchdog = threading.Thread(target=self._watch, name="tado-loop-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info(f"Loop diagnostics enabled (slow threshold {self.slow_threshold * 1000:.0f} ms)")
+
+    async def stop(self):
+        """Stop monitoring."""
+        self._stop.set()
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def _heartbeat(self, lag: float):
+        """Lag sample from the lag monitor."""
+        now = time.monotonic()
+        blocked_for = now - self._last_beat - self.interval
+        self._last_beat = now
+
+        self._samples.append((now, lag))
+        cutoff = now - self.window
+        while self._samples and self._samples[0][0] < cutoff:
+            self._samples.popleft()
+
+        if blocked_for >= self.slow_threshold:
+            self._record_stall(blocked_for)
+
+    def _watch(self):
+        """Watchdog thread: grab the loop thread's stack while it is blocked."""
+        check_every = min(self.interval, self.slow_threshold) / 2
+        while not self._stop.wait(check_every):
+            if self._captured_stack is not None:
+                continue
+            if time.monotonic() - self._last_beat - self.interval < self.slow_threshold:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is not None:
+                self._captured_stack = traceback.format_stack(frame)
+
+    def _record_stall(self, duration: float):
+        stack = self._captured_stack
+        self._captured_stack = None
+        self.stall_count += 1
+        stall = {
+            'timestamp': time.time(),
+            'duration_ms': round(duration * 1000, 1),
+            'stack': [line.rstrip() for line in stack] if stack else None,
+        }
+        self.stalls.append(stall)
+        if stack:
+            logger.warning(f"Event loop blocked for {stall['duration_ms']} ms in:\n{''.join(stack[-8:])}")
+        else:
+            logger.warning(f"Event loop blocked for {stall['duration_ms']} ms (stack not captured)")
+
+    def summary(self) -> Dict[str, Any]:
+        """Rolling lag summary and recent stalls."""
+        lags = sorted(lag for _, lag in self._samples)
+
+        def pick(fraction: float) -> Optional[float]:
+            if not lags:
+                return None
+            return round(lags[min(len(lags) - 1, int(fraction * (len(lags) - 1)))] * 1000, 2)
+
+        return {
+            'enabled': True,
+            'since': self.started_at,
+            'slow_threshold_ms': self.slow_threshold * 1000,
+            'window_seconds': self.window,
+            'samples': len(lags),
+            'lag_ms': {'p50': pick(0.5), 'p90': pick(0.9), 'p99': pick(0.99), 'max': pick(1.0)},
+            'stall_count': self.stall_count,
+            'recent_stalls': list(self.stalls),
+            'profiling': self._profile_lock.locked(),
+        }
+
+    @property
+    def profiling(self) -> bool:
+        return self._profile_lock.locked()
+
+    async def capture_profile(self, seconds: float) -> pstats.Stats:
+        """Profile everything the event loop runs for the given number of seconds.
+
+        cProfile hooks the calling thread, which is the event loop thread, so all
+        callbacks and coroutine steps executed while sleeping are captured.
+
+        Raises:
+            RuntimeError if a capture is already running
+        """
+        if self._profile_lock.locked():
+            raise RuntimeError("A profile capture is already running")
+        async with self._profile_lock:
+            profiler = cProfile.Profile()
+            logger.info(f"Capturing {seconds:.0f}s event loop profile")
+            profiler.enable()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                profiler.disable()
+            return pstats.Stats(profiler)
+
+
+def stats_to_bytes(stats: pstats.Stats) -> bytes:
+    """Serialize stats in the .prof format read by pstats, snakeviz, etc."""
+    return marshal.dumps(stats.stats)
+
+
+def stats_to_text(stats: pstats.Stats, sort: str = 'cumulative', limit: int = 60) -> str:
+    """Render the top entries of a profile as text."""
+    stream = io.StringIO()
+    stats.stream = stream
+    stats.sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
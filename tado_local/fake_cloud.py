@@ -0,0 +1,409 @@
+#
+# Copyright 2025 The TadoLocal and AmpScm contributors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Offline stand-in for the Tado Cloud API, for tests and benchmarks.
+
+Implements the subset of the Tado cloud that `TadoCloudAPI` talks to:
+
+- OAuth device authorization flow (``/oauth2/device_authorize``, ``/oauth2/token``)
+  including refresh token rotation
+- ``/api/v2/me``, ``/api/v2/homes/{id}``, ``zones``, ``zoneStates`` and ``deviceList``
+- ETag / ``If-None-Match`` handling with 304 responses
+- ``ratelimit-policy`` / ``ratelimit`` headers and 429 once the quota is used up
+- Configurable latency and failure injection
+
+Usage in tests::
+
+    async with FakeTadoCloud.generate(num_zones=3) as cloud:
+        api = TadoCloudAPI(db_path, tado_api,
+                           api_base_url=cloud.api_base_url,
+                           auth_base_url=cloud.auth_base_url)
+
+Or standalone, to point a running Tado Local at it::
+
+    python -m tado_local.fake_cloud --port 8099 --zones 10
+    python -m tado_local --cloud-api-url http://127.0.0.1:8099/api/v2 \\
+                         --cloud-auth-url http://127.0.0.1:8099/oauth2
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import secrets
+import time
+from collections import Counter, deque
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+
+class FakeTadoCloud:
+    """In-process fake of the Tado Cloud API served by aiohttp."""
+
+    DEVICE_GRANT = 'urn:ietf:params:oauth:grant-type:device_code'
+
+    def __init__(
+        self,
+        home: Optional[Dict[str, Any]] = None,
+        zones: Optional[List[Dict[str, Any]]] = None,
+        zone_states: Optional[Dict[str, Any]] = None,
+        device_list: Optional[Dict[str, Any]] = None,
+        latency: float = 0.0,
+        latency_jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        rate_limit: int = 100,
+        auto_authorize: bool = True,
+        poll_interval: int = 0,
+        access_token_ttl: int = 600,
+        seed: Optional[int] = None,
+    ):
+        """Initialize the fake cloud.
+
+        Args:
+            home: Payload for ``homes/{id}`` (must contain 'id' and 'name')
+            zones: Payload for ``zones``
+            zone_states: Payload for ``zoneStates``
+            device_list: Payload for ``deviceList``
+            latency: Seconds added to every response
+            latency_jitter: Extra random latency (0..jitter seconds)
+            failure_rate: Probability (0..1) that a data request fails with HTTP 500
+            rate_limit: Data calls allowed per day before answering 429
+            auto_authorize: Approve device codes without calling authorize()
+            poll_interval: 'interval' returned by device_authorize (client poll delay)
+            access_token_ttl: Access token lifetime in seconds
+            seed: Seed for latency jitter and failure injection
+        """
+        self.home = home or {'id': 1, 'name': 'Fake Home', 'dateTimeZone': 'Europe/Amsterdam', 'temperatureUnit': 'CELSIUS'}
+        self.home_id = self.home['id']
+        self.zones = zones if zones is not None else []
+        self.zone_states = zone_states if zone_states is not None else {'zoneStates': {}}
+        self.device_list = device_list if device_list is not None else {'entries': []}
+
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.failure_rate = failure_rate
+        self.rate_limit = rate_limit
+        self.auto_authorize = auto_authorize
+        self.poll_interval = poll_interval
+        self.access_token_ttl = access_token_ttl
+        self._random = random.Random(seed)
+
+        # OAuth state
+        self._device_codes: Dict[str, Dict[str, Any]] = {}  # device_code -> {user_code, authorized, expires_at}
+        self._access_tokens: Dict[str, float] = {}  # access_token -> expires_at
+        self._refresh_tokens: set = set()
+
+        # Request accounting
+        self.calls_made = 0  # Data calls counted against the rate limit
+        self.requests: Counter = Counter()  # route name -> count
+        self.not_modified: Counter = Counter()  # route name -> 304 count
+        self._forced_failures: deque = deque()
+
+        self._runner: Optional[web.AppRunner] = None
+        self.base_url: Optional[str] = None
+        self.app = self._create_app()
+
+    @classmethod
+    def generate(cls, num_zones: int = 5, valves_per_zone: int = 2, home_id: int = 1, **kwargs) -> 'FakeTadoCloud':
+        """Create a fake cloud with a synthetic home of num_zones heating zones.
+
+        Each zone gets one RU02 thermostat as zone leader and valves_per_zone VA02
+        radiator valves; an IB01 bridge is listed in deviceList without a zone.
+        Serial numbers follow the real prefixes so device type detection works.
+        """
+        seed = kwargs.get('seed')
+        rnd = random.Random(seed)
+        zones = []
+        zone_states = {}
+        entries = [{'device': {'serialNo': 'IB0000000001', 'deviceType': 'IB01', 'currentFwVersion': '120.1'}}]
+
+        serial = 1
+        for zone_id in range(1, num_zones + 1):
+            devices = []
+            for index in range(valves_per_zone + 1):
+                serial += 1
+                leader = index == 0
+                device = {
+                    'serialNo': f"{'RU' if leader else 'VA'}{serial:010d}",
+                    'deviceType': 'RU02' if leader else 'VA02',
+                    'currentFwVersion': '240.3' if leader else '215.1',
+                    'batteryState': 'NORMAL',
+                    'duties': ['ZONE_UI', 'ZONE_LEADER'] if leader else ['ZONE_DRIVER'],
+                }
+                devices.append(device)
+                entries.append({'device': dict(device), 'zone': {'discriminator': zone_id, 'duties': device['duties']}})
+
+            zones.append({'id': zone_id, 'name': f'Zone {zone_id}', 'type': 'HEATING', 'devices': devices})
+            zone_states[str(zone_id)] = {
+                'setting': {'type': 'HEATING', 'power': 'ON', 'temperature': {'celsius': 20.0}},
+                'sensorDataPoints': {
+                    'insideTemperature': {'celsius': round(rnd.uniform(17.0, 22.0), 2)},
+                    'humidity': {'percentage': round(rnd.uniform(35.0, 65.0), 1)},
+                },
+            }
+
+        home = {'id': home_id, 'name': 'Fake Home', 'dateTimeZone': 'Europe/Amsterdam', 'temperatureUnit': 'CELSIUS'}
+        return cls(home=home, zones=zones, zone_states={'zoneStates': zone_states}, device_list={'entries': entries}, **kwargs)
+
+    # ------------------------------------------------------------------------
+    # Server lifecycle
+    # ------------------------------------------------------------------------
+
+    @property
+    def api_base_url(self) -> str:
+        """Value for TadoCloudAPI api_base_url."""
+        return f"{self.base_url}/api/v2"
+
+    @property
+    def auth_base_url(self) -> str:
+        """Value for TadoCloudAPI auth_base_url."""
+        return f"{self.base_url}/oauth2"
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """Start serving; port 0 picks a free port. Returns the base URL."""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_host, bound_port = self._runner.addresses[0][:2]
+        self.base_url = f"http://{bound_host}:{bound_port}"
+        logger.info(f"Fake Tado cloud listening on {self.base_url}")
+        return self.base_url
+
+    async def stop(self):
+        """Stop serving."""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> 'FakeTadoCloud':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    # ------------------------------------------------------------------------
+    # Test controls
+    # ------------------------------------------------------------------------
+
+    def authorize(self, user_code: Optional[str] = None):
+        """Approve a pending device code (all pending codes if user_code is None)."""
+        for info in self._device_codes.values():
+            if user_code is None or info['user_code'] == user_code:
+                info['authorized'] = True
+
+    def fail_next(self, count: int = 1, status: int = 500):
+        """Make the next count data requests fail with the given HTTP status."""
+        self._forced_failures.extend([status] * count)
+
+    def expire_access_tokens(self):
+        """Invalidate all issued access tokens (forces a refresh on the client)."""
+        self._access_tokens.clear()
+
+    def reset_rate_limit(self):
+        """Start a new rate limit window."""
+        self.calls_made = 0
+
+    # ------------------------------------------------------------------------
+    # aiohttp application
+    # ------------------------------------------------------------------------
+
+    def _create_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post('/oauth2/device_authorize', self._device_authorize)
+        app.router.add_post('/oauth2/token', self._token)
+        app.router.add_get('/api/v2/me', self._me)
+        app.router.add_get('/api/v2/homes/{home_id}', self._home)
+        app.router.add_get('/api/v2/homes/{home_id}/', self._home)
+        app.router.add_get('/api/v2/homes/{home_id}/zones', self._zones)
+        app.router.add_get('/api/v2/homes/{home_id}/zoneStates', self._zone_states)
+        app.router.add_get('/api/v2/homes/{home_id}/deviceList', self._device_list)
+        return app
+
+    async def _delay(self):
+        delay = self.latency
+        if self.latency_jitter:
+            delay += self._random.uniform(0, self.latency_jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _rate_limit_headers(self) -> Dict[str, str]:
+        remaining = max(0, self.rate_limit - self.calls_made)
+        return {
+            'ratelimit-policy': f'"perday";q={self.rate_limit};w=86400',
+            'ratelimit': f'"perday";r={remaining};t=86400',
+        }
+
+    async def _device_authorize(self, request: web.Request) -> web.Response:
+        self.requests['device_authorize'] += 1
+        await self._delay()
+        device_code = secrets.token_urlsafe(16)
+        user_code = secrets.token_hex(3).upper()
+        expires_in = 300
+        self._device_codes[device_code] = {
+            'user_code': user_code,
+            'authorized': self.auto_authorize,
+            'expires_at': time.time() + expires_in,
+        }
+        return web.json_response({
+            'device_code': device_code,
+            'user_code': user_code,
+            'verification_uri': f"{self.base_url}/oauth2/activate",
+            'verification_uri_complete': f"{self.base_url}/oauth2/activate?user_code={user_code}",
+            'expires_in': expires_in,
+            'interval': self.poll_interval,
+        })
+
+    def _issue_tokens(self) -> Dict[str, Any]:
+        access_token = secrets.token_urlsafe(24)
+        refresh_token = secrets.token_urlsafe(24)
+        self._access_tokens[access_token] = time.time() + self.access_token_ttl
+        self._refresh_tokens.add(refresh_token)
+        return {
+            'access_token': access_token,
+            'refresh_token': refresh_token,
+            'token_type': 'Bearer',
+            'expires_in': self.access_token_ttl,
+            'scope': 'offline_access',
+        }
+
+    async def _token(self, request: web.Request) -> web.Response:
+        self.requests['token'] += 1
+        await self._delay()
+        params = request.query
+        grant_type = params.get('grant_type')
+
+        if grant_type == self.DEVICE_GRANT:
+            info = self._device_codes.get(params.get('device_code', ''))
+            if not info:
+                return web.json_response({'error': 'invalid_grant'}, status=400)
+            if time.time() >= info['expires_at']:
+                return web.json_response({'error': 'expired_token'}, status=400)
+            if not info['authorized']:
+                return web.json_response({'error': 'authorization_pending'}, status=400)
+            del self._device_codes[params['device_code']]
+            return web.json_response(self._issue_tokens())
+
+        if grant_type == 'refresh_token':
+            refresh_token = params.get('refresh_token')
+            if refresh_token not in self._refresh_tokens:
+                return web.json_response({'error': 'invalid_grant'}, status=400)
+            # Refresh tokens rotate on each use
+            self._refresh_tokens.discard(refresh_token)
+            return web.json_response(self._issue_tokens())
+
+        return web.json_response({'error': 'unsupported_grant_type'}, status=400)
+
+    def _check_auth(self, request: web.Request) -> Optional[web.Response]:
+        auth = request.headers.get('Authorization', '')
+        token = auth[len('Bearer '):] if auth.startswith('Bearer ') else None
+        expires_at = self._access_tokens.get(token)
+        if expires_at is None or time.time() >= expires_at:
+            return web.json_response({'errors': [{'code': 'unauthorized'}]}, status=401)
+        return None
+
+    async def _me(self, request: web.Request) -> web.Response:
+        self.requests['me'] += 1
+        await self._delay()
+        denied = self._check_auth(request)
+        if denied:
+            return denied
+        return web.json_response({'name': 'Fake User', 'homes': [{'id': self.home_id, 'name': self.home['name']}]})
+
+    async def _serve_data(self, request: web.Request, route: str, payload: Any) -> web.Response:
+        """Serve a home data endpoint with auth, rate limiting, failures and ETag support."""
+        self.requests[route] += 1
+        await self._delay()
+
+        denied = self._check_auth(request)
+        if denied:
+            return denied
+
+        if str(self.home_id) != request.match_info['home_id']:
+            return web.json_response({'errors': [{'code': 'notFound'}]}, status=404)
+
+        if self.calls_made >= self.rate_limit:
+            return web.json_response({'errors': [{'code': 'rateLimitExceeded'}]}, status=429,
+                                     headers=self._rate_limit_headers())
+        self.calls_made += 1
+        headers = self._rate_limit_headers()
+
+        if self._forced_failures:
+            status = self._forced_failures.popleft()
+            return web.json_response({'errors': [{'code': 'injectedFailure'}]}, status=status, headers=headers)
+        if self.failure_rate and self._random.random() < self.failure_rate:
+            return web.json_response({'errors': [{'code': 'injectedFailure'}]}, status=500, headers=headers)
+
+        body = json.dumps(payload, sort_keys=True)
+        etag = '"' + hashlib.sha1(body.encode()).hexdigest() + '"'
+        headers['ETag'] = etag
+        if request.headers.get('If-None-Match') == etag:
+            self.not_modified[route] += 1
+            return web.Response(status=304, headers=headers)
+        return web.Response(text=body, content_type='application/json', headers=headers)
+
+    async def _home(self, request: web.Request) -> web.Response:
+        return await self._serve_data(request, 'home', self.home)
+
+    async def _zones(self, request: web.Request) -> web.Response:
+        return await self._serve_data(request, 'zones', self.zones)
+
+    async def _zone_states(self, request: web.Request) -> web.Response:
+        return await self._serve_data(request, 'zoneStates', self.zone_states)
+
+    async def _device_list(self, request: web.Request) -> web.Response:
+        return await self._serve_data(request, 'deviceList', self.device_list)
+
+
+async def _serve_forever(cloud: FakeTadoCloud, host: str, port: int):
+    await cloud.start(host, port)
+    print(f"API base URL:  {cloud.api_base_url}")
+    print(f"Auth base URL: {cloud.auth_base_url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await cloud.stop()
+
+
+def main():
+    """Run the fake cloud as a standalone server."""
+    parser = argparse.ArgumentParser(description="Offline fake of the Tado Cloud API")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind to")
+    parser.add_argument("--port", type=int, default=8099, help="Port to listen on")
+    parser.add_argument("--zones", type=int, default=5, help="Number of generated heating zones")
+    parser.add_argument("--valves-per-zone", type=int, default=2, help="Radiator valves per zone")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds of latency added to each response")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Probability of HTTP 500 on data requests")
+    parser.add_argument("--rate-limit", type=int, default=100, help="Data calls allowed per day")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    cloud = FakeTadoCloud.generate(num_zones=args.zones, valves_per_zone=args.valves_per_zone,
+                                   latency=args.latency, failure_rate=args.failure_rate, rate_limit=args.rate_limit)
+    try:
+        asyncio.run(_serve_forever(cloud, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
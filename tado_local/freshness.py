@@ -0,0 +1,209 @@
+#
+# Copyright 2025 The TadoLocal and AmpScm contributors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Per-characteristic recency and stale device notifications.
+
+For every characteristic the monitor remembers when the bridge last reported it
+(event or read), when it last sent an event, and when its value last changed. All
+of this is kept in memory; ``devices.last_seen`` is written in one batch every
+``persist_interval`` seconds (and at shutdown) for devices seen since the last batch.
+
+A device is stale when none of its values was reported for ``STALE_AFTER`` seconds
+(see ``TadoLocalAPI.device_freshness``). Every ``check_interval`` seconds the monitor
+compares this with the last notification and broadcasts a ``freshness`` event when
+a device becomes stale; a device that reports again is announced immediately::
+
+    {"type": "freshness", "device_id": 4, "serial": "VA...", "zone_id": 2,
+     "freshness": {"last_seen": ..., "age_seconds": 951.3, "stale": true, ...}, "timestamp": ...}
+"""
+
+import asyncio
+import logging
+import sqlite3
+import time
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set, Tuple
+
+from . import metrics
+from .homekit_uuids import STATE_FIELDS
+
+if TYPE_CHECKING:
+    from .api import TadoLocalAPI
+
+logger = logging.getLogger(__name__)
+
+
+class FreshnessMonitor:
+    """Tracks when characteristics were last reported and announces stale devices."""
+
+    def __init__(self, tado_api: 'TadoLocalAPI', check_interval: float = 30.0, persist_interval: float = 300.0,
+                 clock: Callable[[], float] = time.time):
+        """
+        Args:
+            tado_api: API whose devices are monitored (and whose database holds devices.last_seen)
+            check_interval: Seconds between stale checks
+            persist_interval: Seconds between devices.last_seen batches
+            clock: Returns the current epoch time (for tests)
+        """
+        self.tado_api = tado_api
+        self.check_interval = check_interval
+        self.persist_interval = persist_interval
+        self.clock = clock
+        self.characteristics: Dict[Tuple[int, int], Dict[str, Optional[float]]] = {}  # (aid, iid) -> recency
+        self.stale_devices: Set[int] = set()  # Devices last announced as stale
+        self.persisted: Dict[int, float] = {}  # device_id -> last_seen written to the database
+        self.notifications = 0
+        self.persisted_rows = 0
+        self.last_persist: Optional[float] = None
+
+    def record(self, aid: int, iid: int, timestamp: float, event: bool = False):
+        """Remember that the bridge reported a characteristic (event=False for reads)."""
+        entry = self.characteristics.get((aid, iid))
+        if entry is None:
+            entry = self.characteristics[(aid, iid)] = {'last_seen': None, 'last_event': None, 'last_changed': None}
+        entry['last_seen'] = timestamp
+        if event:
+            entry['last_event'] = timestamp
+
+    def record_change(self, aid: int, iid: int, timestamp: float):
+        """Remember that a reported value differed from the previous one."""
+        entry = self.characteristics.get((aid, iid))
+        if entry is not None:
+            entry['last_changed'] = timestamp
+
+    def device_last_changed(self, device_id: int) -> Optional[float]:
+        """When any tracked characteristic of a device last changed value (epoch seconds or None)."""
+        last_changed = None
+        for aid, iid, _ in self.tado_api.device_to_characteristics.get(device_id, []):
+            entry = self.characteristics.get((aid, iid))
+            if entry and entry['last_changed'] is not None and (last_changed is None or entry['last_changed'] > last_changed):
+                last_changed = entry['last_changed']
+        return last_changed
+
+    def device_characteristics(self, device_id: int) -> Dict[str, Dict[str, Optional[float]]]:
+        """Recency of the tracked characteristics of a device, by state field."""
+        result = {}
+        for aid, iid, char_type in self.tado_api.device_to_characteristics.get(device_id, []):
+            entry = self.characteristics.get((aid, iid))
+            result[STATE_FIELDS.get(char_type, f"{aid}.{iid}")] = dict(entry) if entry else {
+                'last_seen': None, 'last_event': None, 'last_changed': None}
+        return result
+
+    async def check(self) -> List[int]:
+        """Announce devices whose stale status changed since the last check.
+
+        Nothing is announced while the startup baseline is still missing.
+
+        Returns:
+            Device ids for which a freshness event was broadcast
+        """
+        tado_api = self.tado_api
+        if tado_api.state_is_stale:
+            return []
+        announced = []
+        for device_id in list(tado_api.device_to_characteristics):
+            stale = tado_api.device_freshness(device_id, characteristics=False)['stale']
+            if stale != (device_id in self.stale_devices):
+                await self.announce(device_id, stale)
+                announced.append(device_id)
+        metrics.STALE_DEVICES.set(len(self.stale_devices))
+        return announced
+
+    async def device_reported(self, device_id: int):
+        """Announce a stale device as fresh as soon as it reports again."""
+        if device_id in self.stale_devices:
+            await self.announce(device_id, False)
+            metrics.STALE_DEVICES.set(len(self.stale_devices))
+
+    async def announce(self, device_id: int, stale: bool):
+        tado_api = self.tado_api
+        if stale:
+            self.stale_devices.add(device_id)
+        else:
+            self.stale_devices.discard(device_id)
+        self.notifications += 1
+        device_info = tado_api.state_manager.get_device_info(device_id) or {}
+        freshness = tado_api.device_freshness(device_id, characteristics=False)
+        if stale:
+            logger.warning(f"Device {device_id} ({device_info.get('serial_number')}) is stale: "
+                           f"no values for {freshness['age_seconds']}s")
+        else:
+            logger.info(f"Device {device_id} ({device_info.get('serial_number')}) reports again")
+        await tado_api.broadcast_event({
+            'type': 'freshness',
+            'device_id': device_id,
+            'serial': device_info.get('serial_number'),
+            'zone_id': device_info.get('zone_id'),
+            'zone_name': device_info.get('zone_name'),
+            'freshness': freshness,
+            'timestamp': self.clock(),
+        })
+
+    def persist(self) -> int:
+        """Write devices.last_seen for devices seen since the previous batch (one transaction).
+
+        Returns:
+            Number of devices updated
+        """
+        tado_api = self.tado_api
+        rows = []
+        for aid, last_seen in list(tado_api.accessory_last_seen.items()):
+            device_id = tado_api.accessories_id.get(aid)
+            if device_id is None or self.persisted.get(device_id, 0) >= last_seen:
+                continue
+            # Same format as SQLite's CURRENT_TIMESTAMP (UTC) used elsewhere for this column
+            stamp = datetime.fromtimestamp(last_seen, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+            rows.append((stamp, device_id, last_seen))
+        self.last_persist = self.clock()
+        if not rows:
+            return 0
+
+        conn = sqlite3.connect(tado_api.state_manager.db_path)
+        try:
+            conn.executemany("UPDATE devices SET last_seen = ? WHERE device_id = ?",
+                             [(stamp, device_id) for stamp, device_id, _ in rows])
+            conn.commit()
+        finally:
+            conn.close()
+        for _, device_id, last_seen in rows:
+            self.persisted[device_id] = last_seen
+        self.persisted_rows += len(rows)
+        logger.debug(f"Persisted last_seen for {len(rows)} device(s)")
+        return len(rows)
+
+    async def run(self):
+        """Check and persist periodically until the API shuts down."""
+        logger.info(f"Freshness monitor started (stale after {self.tado_api.STALE_AFTER:.0f}s)")
+        next_persist = self.clock() + self.persist_interval
+        while not self.tado_api.is_shutting_down:
+            await asyncio.sleep(self.check_interval)
+            try:
+                await self.check()
+                if self.clock() >= next_persist:
+                    next_persist = self.clock() + self.persist_interval
+                    self.persist()
+            except Exception as e:
+                logger.error(f"Freshness check failed: {e}")
+
+    def summary(self) -> Dict[str, Any]:
+        """Stale devices and counters for /status."""
+        return {
+            'stale_after': self.tado_api.STALE_AFTER,
+            'stale_devices': sorted(self.stale_devices),
+            'notifications': self.notifications,
+            'persisted_rows': self.persisted_rows,
+            'last_persist': self.last_persist,
+        }
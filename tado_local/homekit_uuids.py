@@ -41,8 +41,20 @@ CUSTOM TADO SERVICES:
 ====================
 - E44673A0-247B-4360-8A76-DB9DA69C0100: Tado proprietary service
 - Uses Tado's own UUID namespace for vendor-specific functionality
+
+CANONICAL UUIDS:
+================
+Bridges may report UUIDs in upper or lower case, and in full or short form ("4A").
+normalize_uuid() turns them into one canonical key: Apple UUIDs (the HAP base UUID)
+become their short-form int (0x4A), vendor UUIDs an upper-case string. Accessory
+data is normalized once when it is loaded; the frozen lookup tables below are keyed
+by canonical UUIDs.
 """
 
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Union
+
 HOMEKIT_SERVICES = {
     "0000003E-0000-1000-8000-0026BB765291": "AccessoryInformation",
     "00000043-0000-1000-8000-0026BB765291": "Lightbulb",
@@ -280,25 +292,110 @@ TADO_CHARACTERISTICS = {
     "E44673A0-247B-4360-8A76-DB9DA69C0101": "TadoProprietaryControl",
 }
 
-def get_service_name(uuid: str) -> str:
-    """Convert HomeKit service UUID to human-readable name."""
-    # Normalize UUID to uppercase for lookup
-    uuid_upper = uuid.upper()
+# Suffix shared by all Apple-defined UUIDs (HAP base UUID 0000xxxx-0000-1000-8000-0026BB765291)
+HAP_BASE_UUID_SUFFIX = "-0000-1000-8000-0026BB765291"
+
+@lru_cache(maxsize=1024)
+def _normalize_uuid_str(uuid: str) -> Union[int, str]:
+    upper = uuid.strip().upper()
+    if len(upper) == 36 and upper.endswith(HAP_BASE_UUID_SUFFIX):
+        short = upper[:8]
+    elif 0 < len(upper) <= 8:
+        short = upper  # Short form as allowed by HAP, e.g. "4A"
+    else:
+        return upper
+    try:
+        return int(short, 16)
+    except ValueError:
+        return upper
+
+def normalize_uuid(uuid) -> Union[int, str]:
+    """
+    Convert a service or characteristic UUID to its canonical form.
 
-    # Check Tado custom first, then Apple standard
-    if uuid_upper in TADO_SERVICES:
-        return TADO_SERVICES[uuid_upper]
-    return HOMEKIT_SERVICES.get(uuid_upper, uuid)
+    Args:
+        uuid: Full or short-form UUID in any case, or an already canonical UUID
 
-def get_characteristic_name(uuid: str) -> str:
-    """Convert HomeKit characteristic UUID to human-readable name."""
-    # Normalize UUID to uppercase for lookup
-    uuid_upper = uuid.upper()
+    Returns:
+        Short-form int for Apple UUIDs (0x4A for Thermostat), else the upper-case UUID
+    """
+    if isinstance(uuid, int):
+        return uuid
+    return _normalize_uuid_str(uuid or "")
+
+def full_uuid(uuid) -> str:
+    """Full upper-case UUID string for a canonical (or any) UUID."""
+    uuid = normalize_uuid(uuid)
+    if isinstance(uuid, int):
+        return f"{uuid:08X}{HAP_BASE_UUID_SUFFIX}"
+    return uuid
+
+# Canonical UUIDs used to recognise devices
+SERVICE_ACCESSORY_INFORMATION = 0x3E
+SERVICE_THERMOSTAT = 0x4A
+SERVICE_HUMIDITY_SENSOR = 0x82
+SERVICE_TEMPERATURE_SENSOR = 0x8A
+
+CHAR_MANUFACTURER = 0x20
+CHAR_MODEL = 0x21
+CHAR_NAME = 0x23
+CHAR_SERIAL_NUMBER = 0x30
+
+# Frozen lookup tables keyed by canonical UUID (Tado names take precedence)
+SERVICE_NAMES = MappingProxyType({
+    normalize_uuid(uuid): name for uuid, name in {**HOMEKIT_SERVICES, **TADO_SERVICES}.items()
+})
+CHARACTERISTIC_NAMES = MappingProxyType({
+    normalize_uuid(uuid): name for uuid, name in {**HOMEKIT_CHARACTERISTICS, **TADO_CHARACTERISTICS}.items()
+})
+
+# Characteristics tracked in the device state, and their state field
+STATE_FIELDS = MappingProxyType({
+    0x11: "current_temperature",
+    0x35: "target_temperature",
+    0x0F: "current_heating_cooling_state",
+    0x33: "target_heating_cooling_state",
+    0x12: "heating_threshold_temperature",
+    0x0D: "cooling_threshold_temperature",
+    0x36: "temperature_display_units",
+    0x68: "battery_level",
+    0x79: "status_low_battery",
+    0x10: "humidity",
+    0x34: "target_humidity",
+    0xB0: "active_state",
+    0x4F: "valve_position",  # Tado radiator valves report their position here
+})
+
+# HAP value formats of the state characteristics, per the HomeKit specification
+# (used when an accessory does not report the format itself)
+CHARACTERISTIC_FORMATS = MappingProxyType({
+    0x11: "float",
+    0x35: "float",
+    0x0F: "uint8",
+    0x33: "uint8",
+    0x12: "float",
+    0x0D: "float",
+    0x36: "uint8",
+    0x68: "uint8",
+    0x79: "uint8",
+    0x10: "float",
+    0x34: "float",
+    0xB0: "uint8",
+})
+
+def get_service_name(uuid) -> str:
+    """Convert HomeKit service UUID to human-readable name."""
+    name = SERVICE_NAMES.get(normalize_uuid(uuid))
+    if name is None:
+        return uuid if isinstance(uuid, str) else full_uuid(uuid)
+    return name
 
-    # Check Tado custom first, then Apple standard
-    if uuid_upper in TADO_CHARACTERISTICS:
-        return TADO_CHARACTERISTICS[uuid_upper]
-    return HOMEKIT_CHARACTERISTICS.get(uuid_upper, uuid)
+def get_characteristic_name(uuid) -> str:
+    """Convert HomeKit characteristic UUID to human-readable name."""
+    name = CHARACTERISTIC_NAMES.get(normalize_uuid(uuid))
+    if name is None:
+        return uuid if isinstance(uuid, str) else full_uuid(uuid)
+    return name
 
 def get_characteristic_value_name(characteristic_name: str, value) -> str:
     """Convert HomeKit characteristic value to human-readable name."""
@@ -306,16 +403,33 @@ def get_characteristic_value_name(characteristic_name: str, value) -> str:
         return HOMEKIT_VALUES[characteristic_name][value]
     return str(value)
 
-def enhance_accessory_data(accessories):
+def enhance_accessory_data(accessories, live_values=None):
     """
     Enhance raw HomeKit accessories data with human-readable names.
 
     Args:
         accessories: List of accessories from HomeKit
+        live_values: Optional {(aid, iid): value} overriding the values in `accessories`
 
     Returns:
         Enhanced accessories with readable names and values
     """
+    return overlay_live_values(build_enhanced_structure(accessories), live_values or {})
+
+def build_enhanced_structure(accessories):
+    """
+    Build the value-independent part of the enhanced accessory data.
+
+    Names, permissions, formats and constraints only change with the accessory
+    configuration, so the result can be cached and combined with current values
+    by overlay_live_values().
+
+    Args:
+        accessories: List of accessories from HomeKit
+
+    Returns:
+        Enhanced accessories; characteristics still carry the raw 'value' (if any)
+    """
     enhanced = []
 
     for accessory in accessories:
@@ -350,15 +464,9 @@ def enhance_accessory_data(accessories):
                     "format": char.get("format"),
                     "unit": char.get("unit")
                 }
-
-                # Add human-readable value if available
-                if "value" in char:
-                    enhanced_char["value_name"] = get_characteristic_value_name(
-                        char_name, char["value"]
-                    )
-
-                # Add device-specific interpretations for Tado
-                enhanced_char = add_tado_specific_info(enhanced_char, char_name, char.get("value"))
+                if "value" not in char:
+                    # Marks characteristics without a value (no value_name or Tado info)
+                    del enhanced_char["value"]
 
                 # Add constraints if present
                 for key in ["minValue", "maxValue", "minStep", "validValues"]:
@@ -373,6 +481,43 @@ def enhance_accessory_data(accessories):
 
     return enhanced
 
+def overlay_live_values(structure, live_values):
+    """
+    Combine a cached enhanced structure with current values.
+
+    The structure is not modified; characteristics are copied with their value,
+    value_name and Tado-specific interpretations filled in.
+
+    Args:
+        structure: Result of build_enhanced_structure()
+        live_values: {(aid, iid): value}; characteristics not in it (or None) keep their raw value
+
+    Returns:
+        Enhanced accessories with readable names and values
+    """
+    result = []
+    for accessory in structure:
+        aid = accessory["aid"]
+        services = []
+        for service in accessory["services"]:
+            characteristics = []
+            for char in service["characteristics"]:
+                if "value" in char:
+                    value = live_values.get((aid, char["iid"]))
+                    if value is None:
+                        value = char["value"]
+                    char_name = char["type_name"]
+                    enhanced_char = {**char, "value": value,
+                                     "value_name": get_characteristic_value_name(char_name, value)}
+                    # Add device-specific interpretations for Tado
+                    enhanced_char = add_tado_specific_info(enhanced_char, char_name, value)
+                else:
+                    enhanced_char = {**char, "value": None}
+                characteristics.append(enhanced_char)
+            services.append({**service, "characteristics": characteristics})
+        result.append({**accessory, "services": services})
+    return result
+
 def add_tado_specific_info(enhanced_char, char_name, value):
     """Add Tado-specific interpretations for characteristics."""
 
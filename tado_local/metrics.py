@@ -0,0 +1,406 @@
+#
+# Copyright 2025 The TadoLocal and AmpScm contributors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Prometheus metrics for Tado Local hot paths.
+
+A small, dependency-free metrics registry that renders the Prometheus text
+exposition format served at ``/metrics``. The API mirrors prometheus_client
+(``Counter``, ``Gauge``, ``Histogram`` with ``.labels(...)``) so call sites
+read the same, but nothing beyond the standard library is needed.
+
+All metrics live in the module-level ``REGISTRY``; instrumented code imports
+the metric objects below and updates them inline. Updates are plain dict
+operations on the event loop thread, so no locking is needed.
+"""
+
+import abc
+import asyncio
+import logging
+import math
+import time
+import weakref
+from bisect import bisect_left
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds, from sub-millisecond handler work up to slow cloud calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if value == -math.inf:
+        return '-Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class _Timer:
+    """Context manager observing elapsed wall time into a histogram child."""
+
+    __slots__ = ('_child', '_start')
+
+    def __init__(self, child):
+        self._child = child
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._child.observe(time.perf_counter() - self._start)
+
+
+class _Metric(abc.ABC):
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), registry: 'Registry' = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        (registry if registry is not None else REGISTRY).register(self)
+        if not self.labelnames:
+            self._default = self._new_child()
+            self._children[()] = self._default
+
+    @abc.abstractmethod
+    def _new_child(self):
+        """Create the value holder for one set of label values."""
+
+    def labels(self, *values):
+        """Return the child for these label values (created on first use)."""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            child = self._children[key] = self._new_child()
+        return child
+
+    def remove(self, *values):
+        """Drop the child for these label values (e.g. a disconnected client)."""
+        self._children.pop(tuple(str(v) for v in values), None)
+
+    def clear(self):
+        """Drop all labelled children."""
+        if self.labelnames:
+            self._children.clear()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in sorted(self._children.items()):
+            lines.extend(self._render_child(key, child))
+        return lines
+
+
+class _CounterChild:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+
+    kind = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+    def _render_child(self, key, child):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"]
+
+
+class _GaugeChild:
+    __slots__ = ('value', 'function')
+
+    def __init__(self):
+        self.value = 0.0
+        self.function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+    def set_function(self, function: Callable[[], float]):
+        """Compute the value at scrape time."""
+        self.function = function
+
+    def get(self) -> float:
+        if self.function is not None:
+            try:
+                return float(self.function())
+            except Exception:
+                return math.nan
+        return self.value
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    kind = 'gauge'
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self._default.set(value)
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._default.dec(amount)
+
+    def set_function(self, function: Callable[[], float]):
+        self._default.set_function(function)
+
+    def _render_child(self, key, child):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.get())}"]
+
+
+class _HistogramChild:
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * len(bounds)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.sum += value
+        self.count += 1
+        self.counts[bisect_left(self.bounds, value)] += 1
+
+    def time(self) -> _Timer:
+        """Time a block: ``with HISTOGRAM.labels(...).time(): ...``"""
+        return _Timer(self)
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets."""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS, registry: 'Registry' = None):
+        bounds = sorted(float(b) for b in buckets)
+        if not bounds or bounds[-1] != math.inf:
+            bounds.append(math.inf)
+        self.bounds = tuple(bounds)
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.bounds)
+
+    def observe(self, value: float):
+        self._default.observe(value)
+
+    def time(self) -> _Timer:
+        return self._default.time()
+
+    def _render_child(self, key, child):
+        labels = _format_labels(self.labelnames, key)
+        lines = []
+        cumulative = 0
+        for bound, count in zip(child.bounds, child.counts):
+            cumulative += count
+            le = _format_labels(self.labelnames, key, ('le', _format_value(bound)))
+            lines.append(f"{self.name}_bucket{le} {cumulative}")
+        lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+        lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: _Metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Duplicate metric: {metric.name}")
+        self._metrics[metric.name] = metric
+
+    def add_collector(self, collector: Callable[[], None]):
+        """Register a callback that refreshes gauges right before each scrape."""
+        self._collectors.append(collector)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def generate_latest(self) -> str:
+        """Render all metrics in the Prometheus text exposition format (0.0.4)."""
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception as e:
+                logger.debug(f"Metrics collector failed: {e}")
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+CONTENT_TYPE_LATEST = 'text/plain; version=0.0.4; charset=utf-8'
+
+# ----------------------------------------------------------------------------
+# Metric definitions
+# ----------------------------------------------------------------------------
+
+EVENTS_RECEIVED = Counter('tado_local_events_received_total', 'HomeKit events received', ['aid', 'characteristic'])
+CHANGES = Counter('tado_local_changes_total', 'Characteristic value changes applied', ['source'])
+HANDLE_CHANGE_SECONDS = Histogram('tado_local_handle_change_seconds', 'Time spent in handle_change', ['result'])
+
+SSE_CLIENTS = Gauge('tado_local_sse_clients', 'Connected SSE clients')
+SSE_QUEUE_DEPTH = Gauge('tado_local_sse_queue_depth', 'Messages waiting in an SSE client queue', ['client'])
+SSE_CLIENT_LAG = Gauge('tado_local_sse_client_lag_seconds', 'Age of the oldest undelivered message per SSE client', ['client'])
+SSE_DELIVERY_SECONDS = Histogram('tado_local_sse_delivery_seconds', 'Time from broadcast to SSE delivery')
+SSE_EVENTS = Counter('tado_local_sse_events_total', 'Events broadcast to SSE clients', ['type'])
+HTTP_COMPRESSION_BYTES = Counter('tado_local_http_compression_bytes_total', 'Response bytes before (in) and after (out) compression',
+                                 ['encoding', 'stage'])
+WS_CLIENTS = Gauge('tado_local_ws_clients', 'Connected WebSocket clients')
+WS_COMMANDS = Counter('tado_local_ws_commands_total', 'WebSocket requests handled', ['op', 'result'])
+STALE_DEVICES = Gauge('tado_local_stale_devices', 'Devices announced as stale (no values within the stale threshold)')
+
+HISTORY_WRITE_SECONDS = Histogram('tado_local_history_write_seconds', 'Time to write a history batch to SQLite')
+HISTORY_BATCH_ROWS = Histogram('tado_local_history_batch_rows', 'Rows per history write', buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500))
+SQLITE_LOCK_WAIT_SECONDS = Histogram('tado_local_sqlite_lock_wait_seconds', 'Time waiting for the SQLite write lock', ['operation'])
+
+HOMEKIT_REQUEST_SECONDS = Histogram('tado_local_homekit_request_seconds', 'HomeKit request round-trip time', ['operation'])
+HOMEKIT_REQUEST_ERRORS = Counter('tado_local_homekit_request_errors_total', 'Failed HomeKit requests', ['operation'])
+WRITE_CONFIRM_SECONDS = Histogram('tado_local_write_confirm_seconds', 'Time from a HomeKit write to the bridge reporting the new value',
+                                  buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0))
+WRITE_OUTCOMES = Counter('tado_local_write_outcomes_total', 'Settled HomeKit writes', ['result'])
+WRITES_COALESCED = Counter('tado_local_writes_coalesced_total', 'Device writes merged into an already queued HomeKit write')
+
+CLOUD_REQUESTS = Counter('tado_local_cloud_requests_total', 'Tado Cloud API requests', ['endpoint', 'status'])
+CLOUD_RATE_LIMIT_REMAINING = Gauge('tado_local_cloud_rate_limit_remaining', 'Tado Cloud API calls remaining in the current window')
+CLOUD_RATE_LIMIT_GRANTED = Gauge('tado_local_cloud_rate_limit_granted', 'Tado Cloud API calls granted per window')
+
+EVENT_LOOP_LAG_SECONDS = Histogram('tado_local_event_loop_lag_seconds', 'Event loop scheduling lag',
+                                   buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+EVENT_LOOP_LAG_LAST = Gauge('tado_local_event_loop_lag_last_seconds', 'Most recent event loop lag sample')
+
+# ----------------------------------------------------------------------------
+# SSE client tracking
+# ----------------------------------------------------------------------------
+
+# queue -> (client id, deque of enqueue times); weak so dropped queues disappear
+_sse_clients: "weakref.WeakKeyDictionary[asyncio.Queue, Tuple[str, deque]]" = weakref.WeakKeyDictionary()
+_sse_next_id = 0
+
+
+def register_sse_client(queue: asyncio.Queue) -> str:
+    """Start tracking depth and lag for an SSE client queue; returns its client id."""
+    global _sse_next_id
+    _sse_next_id += 1
+    client_id = str(_sse_next_id)
+    _sse_clients[queue] = (client_id, deque())
+    return client_id
+
+
+def unregister_sse_client(queue: asyncio.Queue):
+    """Stop tracking an SSE client queue."""
+    entry = _sse_clients.pop(queue, None)
+    if entry:
+        SSE_QUEUE_DEPTH.remove(entry[0])
+        SSE_CLIENT_LAG.remove(entry[0])
+
+
+def sse_enqueued(queue: asyncio.Queue):
+    """Record that a message was put on an SSE client queue."""
+    entry = _sse_clients.get(queue)
+    if entry is not None:
+        entry[1].append(time.monotonic())
+
+
+def sse_dequeued(queue: asyncio.Queue):
+    """Record that an SSE client took a message off its queue."""
+    entry = _sse_clients.get(queue)
+    if entry is not None and entry[1]:
+        SSE_DELIVERY_SECONDS.observe(time.monotonic() - entry[1].popleft())
+
+
+def _collect_sse():
+    now = time.monotonic()
+    SSE_CLIENTS.set(len(_sse_clients))
+    for queue, (client_id, pending) in list(_sse_clients.items()):
+        SSE_QUEUE_DEPTH.labels(client_id).set(queue.qsize())
+        SSE_CLIENT_LAG.labels(client_id).set(now - pending[0] if pending else 0.0)
+
+
+REGISTRY.add_collector(_collect_sse)
+
+
+def generate_latest() -> str:
+    """Render the default registry."""
+    return REGISTRY.generate_latest()
+
+
+# ----------------------------------------------------------------------------
+# Event loop lag
+# ----------------------------------------------------------------------------
+
+async def monitor_event_loop_lag(interval: float = 0.5, on_sample: Optional[Callable[[float], None]] = None):
+    """Sample event loop lag forever: how late a sleep(interval) wakes up.
+
+    Args:
+        interval: Seconds between samples
+        on_sample: Also called with every lag sample (used by LoopDiagnostics)
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - expected)
+        EVENT_LOOP_LAG_SECONDS.observe(lag)
+        EVENT_LOOP_LAG_LAST.set(lag)
+        if on_sample is not None:
+            on_sample(lag)
@@ -0,0 +1,180 @@
+#
+# Copyright 2025 The TadoLocal and AmpScm contributors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Adaptive polling schedule for when HomeKit events are not available.
+
+Every characteristic has its own poll interval. It starts from an importance
+tier: setpoints and modes are polled more often than sensor readings, and static
+metadata such as the firmware revision is polled rarely. The interval halves when
+a poll finds a new value and grows while the value stays the same. Deadlines are
+jittered so characteristics do not all fall due together, and they are kept in a
+heap so the polling loop only wakes when something is due. The number of
+characteristics per request follows the measured bridge latency.
+"""
+
+import heapq
+import random
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple, Union
+
+from .homekit_uuids import normalize_uuid
+from .state import DeviceStateManager
+
+# (minimum, initial, maximum) poll interval in seconds per importance tier
+TIER_INTERVALS: Dict[str, Tuple[float, float, float]] = {
+    'control': (15.0, 30.0, 120.0),
+    'sensor': (30.0, 60.0, 300.0),
+    'static': (300.0, 900.0, 3600.0),
+}
+
+_CONTROL_TYPES = frozenset({
+    DeviceStateManager.CHAR_TARGET_TEMPERATURE,
+    DeviceStateManager.CHAR_TARGET_HEATING_COOLING,
+    DeviceStateManager.CHAR_HEATING_THRESHOLD,
+    DeviceStateManager.CHAR_COOLING_THRESHOLD,
+    DeviceStateManager.CHAR_TARGET_HUMIDITY,
+    DeviceStateManager.CHAR_ACTIVE,
+})
+
+_SENSOR_TYPES = frozenset({
+    DeviceStateManager.CHAR_CURRENT_TEMPERATURE,
+    DeviceStateManager.CHAR_CURRENT_HEATING_COOLING,
+    DeviceStateManager.CHAR_CURRENT_HUMIDITY,
+    DeviceStateManager.CHAR_VALVE_POSITION,
+    DeviceStateManager.CHAR_BATTERY_LEVEL,
+    DeviceStateManager.CHAR_STATUS_LOW_BATTERY,
+    DeviceStateManager.CHAR_TEMP_DISPLAY_UNITS,
+})
+
+
+def importance(char_type: Union[int, str]) -> str:
+    """Importance tier ('control', 'sensor' or 'static') of a characteristic UUID."""
+    char_type = normalize_uuid(char_type)
+    if char_type in _CONTROL_TYPES:
+        return 'control'
+    if char_type in _SENSOR_TYPES:
+        return 'sensor'
+    return 'static'
+
+
+class AdaptivePollScheduler:
+    """Per-characteristic poll deadlines in a priority queue."""
+
+    def __init__(self, keys: Iterable[Hashable], tier_of: Callable[[Hashable], str],
+                 jitter: float = 0.1, target_latency: float = 1.0,
+                 min_batch: int = 5, max_batch: int = 50,
+                 rng: Optional[random.Random] = None, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            keys: Characteristics to poll, e.g. (aid, iid) tuples
+            tier_of: Returns the importance tier of a key (see TIER_INTERVALS)
+            jitter: Relative random spread applied to each deadline
+            target_latency: Seconds one poll request should take; sizes the batches
+            min_batch: Smallest batch size
+            max_batch: Largest batch size
+            rng: Random source (for tests)
+            clock: Monotonic clock (for tests)
+        """
+        self.jitter = jitter
+        self.target_latency = target_latency
+        self.min_batch = min_batch
+        self.max_batch = max_batch
+        self.batch_size = 15  # until a latency has been measured
+        self._rng = rng or random.Random()
+        self._clock = clock
+        self._bounds: Dict[Hashable, Tuple[float, float]] = {}
+        self._intervals: Dict[Hashable, float] = {}
+        self._last_values: Dict[Hashable, Any] = {}
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._seq = 0
+        self._latency_per_char: Optional[float] = None
+
+        now = clock()
+        for key in keys:
+            low, initial, high = TIER_INTERVALS[tier_of(key)]
+            self._bounds[key] = (low, high)
+            self._intervals[key] = initial
+            # Spread the first round over the initial interval
+            self._push(key, now + self._rng.uniform(0, initial))
+
+    def __len__(self) -> int:
+        return len(self._intervals)
+
+    def _push(self, key: Hashable, deadline: float):
+        self._seq += 1
+        heapq.heappush(self._heap, (deadline, self._seq, key))
+
+    def interval(self, key: Hashable) -> float:
+        """Current poll interval of a key in seconds."""
+        return self._intervals[key]
+
+    def next_deadline(self) -> Optional[float]:
+        """Clock time at which the next characteristic is due, or None if empty."""
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: Optional[float] = None, limit: Optional[int] = None) -> List[Hashable]:
+        """Remove and return the keys that are due, most overdue first.
+
+        Args:
+            now: Current clock time (defaults to the scheduler's clock)
+            limit: Maximum number of keys (defaults to the current batch size)
+        """
+        now = self._clock() if now is None else now
+        limit = limit or self.batch_size
+        due = []
+        while self._heap and len(due) < limit and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap)[2])
+        return due
+
+    def record(self, key: Hashable, value: Any, now: Optional[float] = None) -> bool:
+        """Record a poll result and schedule the key's next poll.
+
+        Args:
+            key: The polled characteristic
+            value: Value read, or None if the read returned nothing
+            now: Current clock time
+
+        Returns:
+            True if the value differs from the previous poll
+        """
+        now = self._clock() if now is None else now
+        changed = False
+        if value is not None:
+            low, high = self._bounds[key]
+            if key in self._last_values:
+                changed = self._last_values[key] != value
+                interval = self._intervals[key]
+                self._intervals[key] = max(low, interval / 2) if changed else min(high, interval * 1.5)
+            self._last_values[key] = value
+
+        interval = self._intervals[key]
+        self._push(key, now + interval * (1 + self._rng.uniform(-self.jitter, self.jitter)))
+        return changed
+
+    def observe_latency(self, seconds: float, count: int):
+        """Feed the duration of a poll request to resize future batches."""
+        if count <= 0:
+            return
+        per_char = seconds / count
+        if self._latency_per_char is None:
+            self._latency_per_char = per_char
+        else:
+            self._latency_per_char = 0.7 * self._latency_per_char + 0.3 * per_char
+        if self._latency_per_char > 0:
+            size = int(self.target_latency / self._latency_per_char)
+        else:
+            size = self.max_batch
+        self.batch_size = max(self.min_batch, min(self.max_batch, size))
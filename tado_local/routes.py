@@ -23,15 +23,19 @@ import os
 import sqlite3
 import time
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple
 
-from fastapi import FastAPI, HTTPException, Depends, status
-from fastapi.responses import StreamingResponse, FileResponse
+from fastapi import Body, FastAPI, HTTPException, Depends, WebSocket, status
+from fastapi.responses import StreamingResponse, FileResponse, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.staticfiles import StaticFiles
 
+from . import metrics, tracing
+from .api import BridgeUnavailableError
+from .compression import CompressionMiddleware
+from .homekit_uuids import SERVICE_THERMOSTAT, normalize_uuid
 from .__version__ import __version__
-from .homekit_uuids import enhance_accessory_data
+from .websocket import CommandError, WebSocketSession
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -80,6 +84,66 @@ def get_api_key(credentials: Optional[HTTPAuthorizationCredentials] = Depends(se
     return credentials.credentials
 
 
+async def refresh_accessories(tado_api):
+    """Download the accessory list, reporting an unreachable bridge as HTTP 503."""
+    try:
+        return await tado_api.refresh_accessories()
+    except BridgeUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+def zone_control_updates(temperature: Optional[float], heating_enabled: Optional[bool],
+                         no_implicit_mode: Optional[bool] = False) -> Tuple[Dict[str, Any], Optional[float], Optional[bool]]:
+    """Apply the zone control smart defaults and validate the values.
+
+    Args:
+        temperature: Target temperature in °C (-1, 0, or 5-30)
+        heating_enabled: Heating mode override
+        no_implicit_mode: Don't enable heating implicitly for temperatures >= 5°C
+
+    Returns:
+        (characteristic updates, effective temperature, effective heating_enabled)
+
+    Raises:
+        HTTPException(400) for out-of-range values or when nothing is to be changed
+    """
+    if temperature is not None and heating_enabled is None:
+        if temperature == -1:
+            heating_enabled = True  # Resume schedule/enable without changing temp
+            temperature = None  # Don't set temperature
+        elif temperature == 0:
+            heating_enabled = False
+            temperature = None  # Don't set temperature
+        elif temperature >= 5.0 and no_implicit_mode is not True:
+            heating_enabled = True
+    elif temperature == -1:
+        # temperature=-1 always means "don't change temperature, just enable"
+        temperature = None
+        if heating_enabled is None:
+            heating_enabled = True
+
+    char_updates = {}
+
+    if temperature is not None:
+        # Validate temperature range (5-30°C is typical for Tado)
+        if temperature < 0.0 or temperature > 30.0:
+            raise HTTPException(status_code=400, detail="Temperature must be -1 (resume), 0 (off), or between 5 and 30°C")
+        if temperature > 0 and temperature < 5.0:
+            raise HTTPException(status_code=400, detail="Temperature must be -1, 0, or between 5 and 30°C")
+
+        if temperature > 0:  # Only set if not turning off
+            char_updates['target_temperature'] = temperature
+
+    if heating_enabled is not None:
+        # 0 = OFF, 1 = HEAT
+        char_updates['target_heating_cooling_state'] = 1 if heating_enabled else 0
+
+    if not char_updates:
+        raise HTTPException(status_code=400, detail="No control parameters provided")
+
+    return char_updates, temperature, heating_enabled
+
+
 def create_app():
     """Create and configure the FastAPI application."""
     app = FastAPI(
@@ -94,6 +158,12 @@ def create_app():
     else:
         logger.info("API authentication disabled (no TADO_API_KEYS configured)")
 
+    # Per-request spans (no-op unless tracing is configured)
+    app.add_middleware(tracing.TracingMiddleware)
+
+    # gzip/brotli for responses of 1 KB and more, and per-event flushed SSE streams
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
     # Mount static files
     static_dir = Path(__file__).parent / "static"
     if static_dir.exists():
@@ -171,40 +241,69 @@ def register_routes(app: FastAPI, get_tado_api):
                 "status": "/status",
                 "devices": "/devices",
                 "zones": "/zones",
+                "control": "/control",
                 "thermostats": "/thermostats",
                 "events": "/events",
+                "websocket": "/ws",
+                "metrics": "/metrics",
                 "accessories": "/accessories",
                 "refresh": "/refresh",
-                "refresh_cloud": "/refresh/cloud"
+                "refresh_cloud": "/refresh/cloud",
+                "diagnostics": "/diagnostics"
             }
         }
 
     @app.get("/status", tags=["Status"])
     async def get_status(api_key: Optional[str] = Depends(get_api_key)):
-        """Get overall system status."""
+        """
+        Get overall system status.
+
+        While the bridge is still connecting, status is "starting" and data endpoints
+        serve the last persisted state; `startup` shows each phase (bridge, accessories,
+        baseline poll, events, mDNS) and whether state is still stale.
+        """
         tado_api = get_tado_api()
-        if not tado_api or not tado_api.pairing:
-            raise HTTPException(status_code=503, detail="Bridge not connected")
+        if not tado_api:
+            raise HTTPException(status_code=503, detail="API not initialized")
+
+        if not tado_api.pairing:
+            return {
+                "status": "starting",
+                "version": __version__,
+                "bridge_connected": False,
+                "tracked_devices": len(tado_api.state_manager.get_all_devices()),
+                "active_listeners": len(tado_api.event_listeners),
+                "startup": tado_api.startup_status()
+            }
 
         try:
             # Test connection
             await tado_api.pairing.list_accessories_and_characteristics()
 
             devices = tado_api.state_manager.get_all_devices()
+            change_tracker = getattr(tado_api, 'change_tracker', {})
 
             status = {
-                "status": "connected",
+                "status": "connected" if tado_api.is_ready else "starting",
                 "version": __version__,
                 "bridge_connected": True,
                 "last_update": tado_api.last_update,
                 "cached_accessories": len(tado_api.accessories_cache),
                 "tracked_devices": len(devices),
                 "active_listeners": len(tado_api.event_listeners),
-                "events_received": tado_api.change_tracker.get('events_received', 0),
-                "polling_changes": tado_api.change_tracker.get('polling_changes', 0),
-                "uptime": time.time() - (tado_api.last_update or time.time())
+                "events_received": change_tracker.get('events_received', 0),
+                "polling_changes": change_tracker.get('polling_changes', 0),
+                "uptime": time.time() - (tado_api.last_update or time.time()),
+                "startup": tado_api.startup_status()
             }
 
+            if tado_api.event_watchdog:
+                status["event_watchdog"] = tado_api.event_watchdog.summary()
+            status["write_confirmations"] = tado_api.write_tracker.summary()
+            status["schedule"] = tado_api.schedule_engine.summary()
+            status["delta_events"] = tado_api.delta_encoder.summary()
+            status["freshness"] = tado_api.freshness.summary()
+
             # Add cloud API status if available
             if hasattr(tado_api, 'cloud_api') and tado_api.cloud_api:
                 cloud = tado_api.cloud_api
@@ -250,26 +349,42 @@ def register_routes(app: FastAPI, get_tado_api):
                 "error": str(e)
             }
 
+    @app.get("/metrics", tags=["Status"])
+    async def get_metrics(api_key: Optional[str] = Depends(get_api_key)):
+        """
+        Prometheus metrics in text exposition format.
+
+        Covers HomeKit events per accessory and characteristic, handle_change latency,
+        SSE queue depth and delivery lag per client, history write latency and SQLite
+        lock waits, HomeKit request round-trip times, cloud calls and remaining rate
+        budget, and event loop lag.
+        """
+        return Response(content=metrics.generate_latest(), media_type=metrics.CONTENT_TYPE_LATEST)
+
     @app.get("/accessories", tags=["HomeKit"])
-    async def get_accessories(enhanced: bool = True, api_key: Optional[str] = Depends(get_api_key)):
+    async def get_accessories(enhanced: bool = True, refresh: bool = False, api_key: Optional[str] = Depends(get_api_key)):
         """
         Get all HomeKit accessories and their characteristics.
 
         Args:
-            enhanced: If True, include human-readable names for UUIDs (default: True)
+            enhanced: If True, include human-readable names for UUIDs and the latest
+                      known values (default: True)
+            refresh: Download the accessory list from the bridge first (default: use
+                     the list loaded at startup or by /refresh)
         """
         tado_api = get_tado_api()
-        accessories = await tado_api.refresh_accessories()
+        if refresh or not tado_api.accessories_cache:
+            await refresh_accessories(tado_api)
 
         if enhanced:
             return {
-                "accessories": enhance_accessory_data(accessories),
+                "accessories": tado_api.enhanced_accessories(),
                 "enhanced": True,
                 "note": "UUIDs have been enhanced with human-readable names. Use ?enhanced=false for raw data."
             }
         else:
             return {
-                "accessories": accessories,
+                "accessories": tado_api.accessories_cache,
                 "enhanced": False
             }
 
@@ -284,18 +399,18 @@ def register_routes(app: FastAPI, get_tado_api):
         """
         tado_api = get_tado_api()
         if not tado_api.accessories_cache:
-            await tado_api.refresh_accessories()
+            await refresh_accessories(tado_api)
 
-        accessories = tado_api.accessories_cache
-        for accessory in accessories:
-            if accessory.get('id') == accessory_id:
-                if enhanced:
-                    enhanced_accessories = enhance_accessory_data([accessory])
-                    return {
-                        "accessory": enhanced_accessories[0] if enhanced_accessories else accessory,
-                        "enhanced": True
-                    }
-                else:
+        if enhanced:
+            enhanced_accessories = tado_api.enhanced_accessories(accessory_id)
+            if enhanced_accessories:
+                return {
+                    "accessory": enhanced_accessories[0],
+                    "enhanced": True
+                }
+        else:
+            for accessory in tado_api.accessories_cache:
+                if accessory.get('id') == accessory_id:
                     return {
                         "accessory": accessory,
                         "enhanced": False
@@ -315,7 +430,7 @@ def register_routes(app: FastAPI, get_tado_api):
             raise HTTPException(status_code=503, detail="API not initialized")
 
         if not tado_api.accessories_cache:
-            await tado_api.refresh_accessories()
+            await refresh_accessories(tado_api)
 
         thermostats = []
         accessories = tado_api.accessories_cache
@@ -323,7 +438,7 @@ def register_routes(app: FastAPI, get_tado_api):
         for accessory in accessories:
             services = accessory.get('services', [])
             for service in services:
-                if service.get('type') == '0000004A-0000-1000-8000-0026BB765291':  # Thermostat service
+                if normalize_uuid(service.get('type')) == SERVICE_THERMOSTAT:
 
                     device_id = accessory.get('id')
                     if not device_id:
@@ -374,7 +489,7 @@ def register_routes(app: FastAPI, get_tado_api):
             raise HTTPException(status_code=503, detail="API not initialized")
 
         if not tado_api.accessories_cache:
-            await tado_api.refresh_accessories()
+            await refresh_accessories(tado_api)
 
         # Find accessory by device ID
         accessory = None
@@ -389,7 +504,7 @@ def register_routes(app: FastAPI, get_tado_api):
         # Check if it's a thermostat
         is_thermostat = False
         for service in accessory.get('services', []):
-            if service.get('type') == '0000004A-0000-1000-8000-0026BB765291':
+            if normalize_uuid(service.get('type')) == SERVICE_THERMOSTAT:
                 is_thermostat = True
                 break
 
@@ -555,7 +670,8 @@ def register_routes(app: FastAPI, get_tado_api):
                 'is_circuit_driver': bool(is_circuit_driver),
                 'order_id': order_id,
                 'device_count': device_count,
-                'state': state_summary
+                'state': state_summary,
+                'freshness': tado_api.zone_freshness(zone_id),
             })
 
         # Get home info if cloud API is available and authenticated
@@ -579,7 +695,8 @@ def register_routes(app: FastAPI, get_tado_api):
         return {
             'homes': homes,
             'zones': zones,
-            'count': len(zones)
+            'count': len(zones),
+            'stale': tado_api.state_is_stale
         }
 
     @app.get("/zones/{zone_id}", tags=["Zones"])
@@ -709,7 +826,8 @@ def register_routes(app: FastAPI, get_tado_api):
             'is_circuit_driver': bool(is_circuit_driver),
             'order_id': order_id,
             'device_count': device_count,
-            'state': state_summary
+            'state': state_summary,
+            'freshness': tado_api.zone_freshness(zone_id),
         }
 
         # Get home info if cloud API is available and authenticated
@@ -751,8 +869,9 @@ def register_routes(app: FastAPI, get_tado_api):
         conn.commit()
         conn.close()
 
-        # Reload device cache to pick up zone info
+        # Reload device and zone caches to pick up zone info
         tado_api.state_manager._load_device_cache()
+        tado_api.state_manager._load_zone_cache()
 
         return {'zone_id': zone_id, 'name': name}
 
@@ -785,17 +904,76 @@ def register_routes(app: FastAPI, get_tado_api):
         conn.commit()
         conn.close()
 
-        # Reload device cache
+        # Reload device and zone caches
         tado_api.state_manager._load_device_cache()
+        tado_api.state_manager._load_zone_cache()
 
         return {'zone_id': zone_id, 'updated': True}
 
+    @app.get("/zones/{zone_id}/schedule", tags=["Zones"])
+    async def get_zone_schedule(zone_id: int, api_key: Optional[str] = Depends(get_api_key)):
+        """Get the local weekly program of a zone and the entry currently in effect."""
+        tado_api = get_tado_api()
+        if not tado_api:
+            raise HTTPException(status_code=503, detail="API not initialized")
+        if zone_id not in tado_api.state_manager.zone_cache:
+            raise HTTPException(status_code=404, detail=f"Zone {zone_id} not found")
+
+        engine = tado_api.schedule_engine
+        return {
+            'zone_id': zone_id,
+            'entries': engine.get_schedule(zone_id),
+            'active': engine.active_entry(zone_id),
+        }
+
+    @app.put("/zones/{zone_id}/schedule", tags=["Zones"])
+    async def set_zone_schedule(zone_id: int, schedule: Dict[str, Any] = Body(...),
+                                api_key: Optional[str] = Depends(get_api_key)):
+        """
+        Replace the local weekly program of a zone.
+
+        Body:
+            {"entries": [{"day": "mon", "time": "06:30", "temperature": 21},
+                         {"day": "mon", "time": "22:00", "temperature": 17},
+                         {"day": "sat", "time": "00:00", "temperature": 0}]}
+
+        Each entry applies from its start time (server local time) until the next entry
+        of the week; temperature 0 or null turns heating off. The setpoint is written to
+        the zone's leader when an entry starts, so manual changes last until the next
+        entry. An empty list removes the program.
+        """
+        tado_api = get_tado_api()
+        if not tado_api:
+            raise HTTPException(status_code=503, detail="API not initialized")
+        if zone_id not in tado_api.state_manager.zone_cache:
+            raise HTTPException(status_code=404, detail=f"Zone {zone_id} not found")
+        entries = schedule.get('entries')
+        if not isinstance(entries, list):
+            raise HTTPException(status_code=400, detail="Body must contain an 'entries' list")
+
+        engine = tado_api.schedule_engine
+        try:
+            entries = engine.set_schedule(zone_id, entries)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {'zone_id': zone_id, 'entries': entries, 'active': engine.active_entry(zone_id)}
+
+    @app.delete("/zones/{zone_id}/schedule", tags=["Zones"])
+    async def delete_zone_schedule(zone_id: int, api_key: Optional[str] = Depends(get_api_key)):
+        """Remove the local weekly program of a zone."""
+        tado_api = get_tado_api()
+        if not tado_api:
+            raise HTTPException(status_code=503, detail="API not initialized")
+        tado_api.schedule_engine.set_schedule(zone_id, [])
+        return {'zone_id': zone_id, 'deleted': True}
+
     @app.post("/zones/{zone_id}/set", tags=["Zones"])
     async def set_zone(
         zone_id: int,
         temperature: Optional[float] = None,
         heating_enabled: Optional[bool] = None,
         no_implicit_mode: Optional[bool] = False,
+        wait: Optional[bool] = True,
         api_key: Optional[str] = Depends(get_api_key)
         ):
         """
@@ -808,11 +986,16 @@ def register_routes(app: FastAPI, get_tado_api):
                         - 0 = disable heating (without changing target temp)
                         - >= 5 = set temperature and enable heating
             heating_enabled: Enable/disable heating mode (true/false)
+            wait: Wait until the change has been sent to the bridge (default). With
+                  wait=false the response returns as soon as the change is queued.
 
         Returns:
-            Success status and applied values
+            Success status and applied values; `written` holds the values sent to (or
+            queued for) the leader, which includes changes coalesced from other requests
 
         Notes:
+            - Changes arriving within a short window (e.g. while dragging a slider) are
+              merged into one write to the bridge; the latest value wins
             - Smart defaults:
               - temperature = -1 implies heating_enabled=true (resume schedule)
               - temperature = 0 implies heating_enabled=false (off)
@@ -837,31 +1020,19 @@ def register_routes(app: FastAPI, get_tado_api):
             raise HTTPException(status_code=503, detail="Bridge not connected")
 
         # Apply smart defaults
-        if temperature is not None and heating_enabled is None:
-            if temperature == -1:
-                heating_enabled = True  # Resume schedule/enable without changing temp
-                temperature = None  # Don't set temperature
-            elif temperature == 0:
-                heating_enabled = False
-                temperature = None  # Don't set temperature
-            elif temperature >= 5.0 and no_implicit_mode is not True:
-                heating_enabled = True
-        elif temperature == -1:
-            # temperature=-1 always means "don't change temperature, just enable"
-            temperature = None
-            if heating_enabled is None:
-                heating_enabled = True
+        char_updates, temperature, heating_enabled = zone_control_updates(temperature, heating_enabled, no_implicit_mode)
 
         # Get zone info
-        conn = sqlite3.connect(tado_api.state_manager.db_path)
-        cursor = conn.execute("""
-            SELECT z.name, z.leader_device_id, d.serial_number
-            FROM zones z
-            LEFT JOIN devices d ON z.leader_device_id = d.device_id
-            WHERE z.zone_id = ?
-        """, (zone_id,))
-        row = cursor.fetchone()
-        conn.close()
+        with tracing.span('sqlite.zone_lookup', zone_id=zone_id):
+            conn = sqlite3.connect(tado_api.state_manager.db_path)
+            cursor = conn.execute("""
+                SELECT z.name, z.leader_device_id, d.serial_number
+                FROM zones z
+                LEFT JOIN devices d ON z.leader_device_id = d.device_id
+                WHERE z.zone_id = ?
+            """, (zone_id,))
+            row = cursor.fetchone()
+            conn.close()
 
         if not row:
             raise HTTPException(status_code=404, detail=f"Zone {zone_id} not found")
@@ -894,26 +1065,6 @@ def register_routes(app: FastAPI, get_tado_api):
             else:
                 raise HTTPException(status_code=400, detail=f"Zone '{zone_name}' has no leader device assigned")
 
-        # Build characteristic updates
-        char_updates = {}
-
-        if temperature is not None:
-            # Validate temperature range (5-30°C is typical for Tado)
-            if temperature < 0.0 or temperature > 30.0:
-                raise HTTPException(status_code=400, detail="Temperature must be -1 (resume), 0 (off), or between 5 and 30°C")
-            if temperature > 0 and temperature < 5.0:
-                raise HTTPException(status_code=400, detail="Temperature must be -1, 0, or between 5 and 30°C")
-
-            if temperature > 0:  # Only set if not turning off
-                char_updates['target_temperature'] = temperature
-
-        if heating_enabled is not None:
-            # 0 = OFF, 1 = HEAT
-            char_updates['target_heating_cooling_state'] = 1 if heating_enabled else 0
-
-        if not char_updates:
-            raise HTTPException(status_code=400, detail="No control parameters provided")
-
         # Log what we're changing (single summary line)
         changes = []
         if 'target_temperature' in char_updates:
@@ -923,23 +1074,10 @@ def register_routes(app: FastAPI, get_tado_api):
             changes.append(f"heating={mode}")
         logger.info(f"Zone {zone_id} ({zone_name}): {', '.join(changes)}")
 
-        # Apply optimistic state prediction for immediate UI feedback
-        optimistic_state = {}
-        if 'target_temperature' in char_updates:
-            optimistic_state['target_temperature'] = char_updates['target_temperature']
-        if 'target_heating_cooling_state' in char_updates:
-            optimistic_state['target_heating_cooling_state'] = char_updates['target_heating_cooling_state']
-
-        if optimistic_state:
-            tado_api.state_manager.set_optimistic_state(leader_device_id, optimistic_state)
-            logger.debug(
-                "Zone %s: Applied optimistic state prediction: %s",
-                zone_id, optimistic_state
-            )
-
-        # Set the characteristics on the leader device
+        # Set the characteristics on the leader device (also applies the optimistic state prediction)
         try:
-            await tado_api.set_device_characteristics(leader_device_id, char_updates)
+            with tracing.span('tado.set_device_characteristics', device_id=leader_device_id):
+                written = await tado_api.set_device_characteristics(leader_device_id, char_updates, wait=wait is not False)
 
             return {
                 'success': True,
@@ -950,13 +1088,117 @@ def register_routes(app: FastAPI, get_tado_api):
                 'applied': {
                     'target_temperature': temperature,
                     'heating_enabled': heating_enabled
-                }
+                },
+                'written': written,
+                'pending': wait is False
             }
 
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         except Exception as e:
             logger.error(f"Failed to control zone {zone_id}: {e}")
             raise HTTPException(status_code=500, detail=f"Failed to set zone control: {str(e)}")
 
+    @app.post("/control", tags=["Zones"])
+    async def bulk_control(changes: Dict[str, Any] = Body(...), api_key: Optional[str] = Depends(get_api_key)):
+        """
+        Apply many zone and device changes with a single HomeKit write.
+
+        Body:
+            {"zones": [{"zone_id": 1, "temperature": 21}, {"zone_id": 2, "temperature": 0}],
+             "devices": [{"device_id": 7, "heating_enabled": true}]}
+
+        Entries take the same `temperature`, `heating_enabled` and `no_implicit_mode`
+        values (and smart defaults) as POST /zones/{zone_id}/set. Device entries control
+        the device's zone, like POST /devices/{device_id}/set. Zones and leaders are
+        resolved from memory, all writes go to the bridge in one request, and optimistic
+        state is applied to every leader at once. When several entries hit the same
+        zone, later values win.
+
+        Returns:
+            Per-zone results; `success` is false for zones whose write the bridge rejected
+        """
+        tado_api = get_tado_api()
+        if not tado_api:
+            raise HTTPException(status_code=503, detail="API not initialized")
+
+        if not tado_api.pairing:
+            raise HTTPException(status_code=503, detail="Bridge not connected")
+
+        zone_entries = changes.get('zones') or []
+        device_entries = changes.get('devices') or []
+        if not isinstance(zone_entries, list) or not isinstance(device_entries, list):
+            raise HTTPException(status_code=400, detail="'zones' and 'devices' must be lists")
+
+        requested = []  # (zone_id, entry)
+        for entry in zone_entries:
+            if not isinstance(entry, dict) or not isinstance(entry.get('zone_id'), int):
+                raise HTTPException(status_code=400, detail="Each zone entry needs an integer zone_id")
+            requested.append((entry['zone_id'], entry))
+        for entry in device_entries:
+            if not isinstance(entry, dict) or not isinstance(entry.get('device_id'), int):
+                raise HTTPException(status_code=400, detail="Each device entry needs an integer device_id")
+            device_info = tado_api.state_manager.get_device_info(entry['device_id'])
+            if not device_info:
+                raise HTTPException(status_code=404, detail=f"Device {entry['device_id']} not found")
+            if not device_info.get('zone_id'):
+                raise HTTPException(status_code=400, detail=f"Device {entry['device_id']} is not assigned to a zone. Assign it to a zone first.")
+            requested.append((device_info['zone_id'], entry))
+
+        if not requested:
+            raise HTTPException(status_code=400, detail="No zone or device changes provided")
+
+        targets: Dict[int, Dict[str, Any]] = {}  # leader device_id -> zone result
+        for zone_id, entry in requested:
+            zone_info = tado_api.state_manager.zone_cache.get(zone_id)
+            if not zone_info:
+                raise HTTPException(status_code=404, detail=f"Zone {zone_id} not found")
+            leader_device_id = tado_api.state_manager.get_zone_leader(zone_id)
+            if not leader_device_id:
+                raise HTTPException(status_code=400, detail=f"Zone '{zone_info['name']}' has no leader device assigned")
+
+            temperature = entry.get('temperature')
+            heating_enabled = entry.get('heating_enabled')
+            if temperature is not None and not isinstance(temperature, (int, float)):
+                raise HTTPException(status_code=400, detail=f"Zone {zone_id}: temperature must be a number")
+            if heating_enabled is not None and not isinstance(heating_enabled, bool):
+                raise HTTPException(status_code=400, detail=f"Zone {zone_id}: heating_enabled must be true or false")
+            char_updates, _, _ = zone_control_updates(temperature, heating_enabled, entry.get('no_implicit_mode', False))
+
+            target = targets.setdefault(leader_device_id, {
+                'zone_id': zone_id,
+                'zone_name': zone_info['name'],
+                'leader_device_id': leader_device_id,
+                'applied': {},
+            })
+            target['applied'].update(char_updates)
+
+        logger.info(f"Bulk control: {len(targets)} zone(s) from {len(requested)} change(s)")
+
+        try:
+            with tracing.span('tado.set_characteristics_bulk', zones=len(targets)):
+                errors = await tado_api.set_characteristics_bulk(
+                    {leader_device_id: target['applied'] for leader_device_id, target in targets.items()}
+                )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.error(f"Bulk control failed: {e}")
+            raise HTTPException(status_code=500, detail=f"Failed to apply changes: {str(e)}")
+
+        zones = []
+        for leader_device_id, target in targets.items():
+            target['success'] = not errors.get(leader_device_id)
+            if errors.get(leader_device_id):
+                target['errors'] = errors[leader_device_id]
+            zones.append(target)
+
+        return {
+            'success': all(zone['success'] for zone in zones),
+            'zones': zones,
+            'count': len(zones),
+        }
+
     @app.get("/devices", tags=["Devices"])
     async def get_devices(api_key: Optional[str] = Depends(get_api_key)):
         """
@@ -966,6 +1208,8 @@ def register_routes(app: FastAPI, get_tado_api):
         - Device metadata (serial, type, zone)
         - Standardized state format
         - Battery status (for battery-powered devices)
+        - Freshness: when the bridge last confirmed the values and whether they are stale
+          (per-characteristic recency is only on /devices/{device_id})
         """
         tado_api = get_tado_api()
         if not tado_api:
@@ -1007,14 +1251,16 @@ def register_routes(app: FastAPI, get_tado_api):
                     'cur_heating': 1 if state.get('current_heating_cooling_state') == 1 else 0,
                     'valve_position': state.get('valve_position'),
                     'battery_low': battery_low,
-                }
+                },
+                'freshness': tado_api.device_freshness(device_id, characteristics=False),
             }
 
             devices.append(device)
 
         return {
             "devices": devices,
-            "count": len(devices)
+            "count": len(devices),
+            "stale": tado_api.state_is_stale
         }
 
     @app.get("/devices/{device_id}", tags=["Devices"])
@@ -1066,7 +1312,8 @@ def register_routes(app: FastAPI, get_tado_api):
                 'cur_heating': 1 if state.get('current_heating_cooling_state') == 1 else 0,
                 'valve_position': state.get('valve_position'),
                 'battery_low': battery_low,
-            }
+            },
+            'freshness': tado_api.device_freshness(device_id),
         }
 
         return device
@@ -1338,7 +1585,8 @@ def register_routes(app: FastAPI, get_tado_api):
         return result
 
     @app.get("/events", tags=["Events"])
-    async def get_events(refresh_interval: Optional[int] = None, types: Optional[str] = None, api_key: Optional[str] = Depends(get_api_key)):
+    async def get_events(refresh_interval: Optional[int] = None, types: Optional[str] = None, format: Optional[str] = None,
+                         api_key: Optional[str] = Depends(get_api_key)):
         """
         Server-Sent Events (SSE) endpoint for real-time updates.
 
@@ -1349,6 +1597,7 @@ def register_routes(app: FastAPI, get_tado_api):
                             Recommended: 300 (5 minutes). Default: None (only send on changes).
             types: Optional comma-separated list of event types to filter (e.g., "zone,device" or "zone").
                    If not specified, all event types are sent.
+            format: "delta" to receive only changed state fields (see Delta Format below).
 
         Clients can maintain a persistent connection to receive live updates without polling.
 
@@ -1391,7 +1640,19 @@ def register_routes(app: FastAPI, get_tado_api):
                "timestamp": 1730477890.123
            }
 
-        3. Keepalive (every 90 seconds for connections without refresh_interval):
+        3. Freshness (a device stopped reporting for the stale threshold, or reports again):
+           {
+               "type": "freshness",
+               "device_id": 4,
+               "serial": "VA1234567890",
+               "zone_id": 2,
+               "zone_name": "Studeerkamer",
+               "freshness": {"last_seen": 1730476939.8, "last_event": 1730476939.8, "last_changed": 1730476300.2,
+                             "age_seconds": 950.3, "stale": true},
+               "timestamp": 1730477890.123
+           }
+
+        4. Keepalive (every 90 seconds for connections without refresh_interval):
            {
                "type": "keepalive",
                "timestamp": 1730477890.123
@@ -1400,6 +1661,14 @@ def register_routes(app: FastAPI, get_tado_api):
         Note: Connections with refresh_interval don't receive keepalives - refresh events
         act as keepalives. This reduces unnecessary traffic for clients like Domoticz.
 
+        Delta Format (format=delta):
+            The stream starts with a full event ("keyframe": true) per zone and device,
+            followed by events carrying only the changed fields:
+            {"type": "device", "device_id": 4, "seq": 812, "delta": {"valve_position": 45}, "timestamp": ...}
+            seq increases by one per event of the same type, so a types filter leaves
+            no gaps; on a gap, reconnect. Full keyframes are repeated periodically
+            and replace refresh events when refresh_interval is set.
+
         State Field Reference:
             mode: 0=Off, 1=Heat, 2=Cool, 3=Auto (TargetHeatingCoolingState)
             cur_heating: 0=not heating, 1=actively heating (CurrentHeatingCoolingState)
@@ -1427,10 +1696,24 @@ def register_routes(app: FastAPI, get_tado_api):
         if types:
             allowed_types = set(t.strip().lower() for t in types.split(','))
 
+        delta = format == 'delta'
+        listeners = tado_api.delta_listeners if delta else tado_api.event_listeners
+
+        def delta_keyframes():
+            for event_obj in tado_api.delta_encoder.snapshot():
+                if not allowed_types or event_obj['type'] in allowed_types:
+                    yield f"data: {json.dumps(event_obj)}\n\n"
+
         async def event_publisher():
             # Create a queue for this client
             client_queue = asyncio.Queue()
-            tado_api.event_listeners.append(client_queue)
+            listeners.append(client_queue)
+            metrics.register_sse_client(client_queue)
+
+            # Delta clients start from the state the next deltas are relative to
+            if delta:
+                for message in delta_keyframes():
+                    yield message
 
             last_refresh = time.time() if refresh_interval else None
             last_keepalive = time.time()
@@ -1450,6 +1733,7 @@ def register_routes(app: FastAPI, get_tado_api):
                     # Wait for events
                     try:
                         event_data = await asyncio.wait_for(client_queue.get(), timeout=timeout)
+                        metrics.sse_dequeued(client_queue)
 
                         # Check for shutdown signal
                         if event_data is None:
@@ -1479,7 +1763,11 @@ def register_routes(app: FastAPI, get_tado_api):
                     except asyncio.TimeoutError:
                         # Check if we should send a refresh update
                         # When refresh_interval is set, timeout aligns with it, so we always refresh on timeout
-                        if refresh_interval:
+                        if refresh_interval and delta:
+                            for message in delta_keyframes():
+                                yield message
+                            last_refresh = time.time()
+                        elif refresh_interval:
                             # Send refresh updates for all zones (if zone type is allowed or no filter)
                             if not allowed_types or 'zone' in allowed_types:
                                 conn = sqlite3.connect(tado_api.state_manager.db_path)
@@ -1585,8 +1873,9 @@ def register_routes(app: FastAPI, get_tado_api):
                 pass
             finally:
                 # Remove this client's queue
-                if client_queue in tado_api.event_listeners:
-                    tado_api.event_listeners.remove(client_queue)
+                if client_queue in listeners:
+                    listeners.remove(client_queue)
+                metrics.unregister_sse_client(client_queue)
 
         return StreamingResponse(
             event_publisher(),
@@ -1598,11 +1887,67 @@ def register_routes(app: FastAPI, get_tado_api):
             }
         )
 
+    @app.websocket("/ws")
+    async def websocket_endpoint(websocket: WebSocket, format: Optional[str] = None, api_key: Optional[str] = None):
+        """
+        WebSocket API: event subscriptions, state snapshots and control over one connection.
+
+        Requests are {"id": ..., "op": ..., ...}; the response carries the same id.
+        Operations: subscribe (types, format=delta, snapshot), unsubscribe, snapshot (types), ping,
+        set_zone (zone_id + the POST /zones/{zone_id}/set parameters), set_device
+        (device_id, temperature, heating_enabled) and control (the POST /control body).
+        Events are the /events objects. Use ?format=msgpack for MessagePack events
+        (requires the msgpack package). Browsers cannot set headers, so the API key may
+        also be passed as ?api_key=.
+        """
+        if API_KEYS:
+            header = websocket.headers.get('authorization', '')
+            token = header[7:] if header.lower().startswith('bearer ') else api_key
+            if token not in API_KEYS:
+                await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+                return
+
+        tado_api = get_tado_api()
+        if not tado_api:
+            await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+            return
+
+        def require(request: Dict[str, Any], name: str) -> int:
+            if not isinstance(request.get(name), int):
+                raise CommandError(400, f"'{name}' (integer) is required")
+            return request[name]
+
+        async def ws_set_zone(request):
+            return await set_zone(zone_id=require(request, 'zone_id'), temperature=request.get('temperature'),
+                                  heating_enabled=request.get('heating_enabled'),
+                                  no_implicit_mode=request.get('no_implicit_mode', False),
+                                  wait=request.get('wait', True), api_key=None)
+
+        async def ws_set_device(request):
+            return await set_device(device_id=require(request, 'device_id'), temperature=request.get('temperature'),
+                                    heating_enabled=request.get('heating_enabled'), api_key=None)
+
+        async def ws_control(request):
+            return await bulk_control(changes={key: request[key] for key in ('zones', 'devices') if key in request},
+                                      api_key=None)
+
+        await websocket.accept()
+        try:
+            session = WebSocketSession(websocket, tado_api, binary=format == 'msgpack', commands={
+                'set_zone': ws_set_zone,
+                'set_device': ws_set_device,
+                'control': ws_control,
+            })
+        except CommandError as e:
+            await websocket.close(code=status.WS_1003_UNSUPPORTED_DATA, reason=e.detail)
+            return
+        await session.run()
+
     @app.post("/refresh", tags=["Admin"])
     async def refresh_data(api_key: Optional[str] = Depends(get_api_key)):
         """Manually refresh accessories data from HomeKit bridge."""
         tado_api = get_tado_api()
-        return await tado_api.refresh_accessories()
+        return await refresh_accessories(tado_api)
 
     @app.post("/refresh/cloud", tags=["Admin"])
     async def refresh_cloud_data(battery_only: bool = False, api_key: Optional[str] = Depends(get_api_key)):
@@ -1633,7 +1978,7 @@ def register_routes(app: FastAPI, get_tado_api):
         try:
             # Import sync module
             from .sync import TadoCloudSync
-            sync = TadoCloudSync(tado_api.state_manager.db_path)
+            sync = TadoCloudSync(tado_api.state_manager.db_path, tado_api.state_manager)
 
             result = {}
 
@@ -1679,9 +2024,7 @@ def register_routes(app: FastAPI, get_tado_api):
 
                 result['refreshed'] = ['home_info', 'zones', 'battery_status', 'device_status']
 
-            # Reload both device and zone caches to pick up changes
-            tado_api.state_manager._load_device_cache()
-            tado_api.state_manager._load_zone_cache()
+            # Device and zone caches are patched in place by the delta sync
 
             result['success'] = True
             result['timestamp'] = time.time()
@@ -1691,4 +2034,53 @@ def register_routes(app: FastAPI, get_tado_api):
             logger.error(f"Error refreshing cloud data: {e}")
             raise HTTPException(status_code=500, detail=f"Failed to refresh cloud data: {str(e)}")
 
+    def get_diagnostics():
+        tado_api = get_tado_api()
+        if not tado_api or not tado_api.diagnostics:
+            raise HTTPException(status_code=404, detail="Diagnostics not enabled (start with --diagnostics)")
+        return tado_api.diagnostics
+
+    @app.get("/diagnostics", tags=["Admin"])
+    async def get_diagnostics_summary(api_key: Optional[str] = Depends(get_api_key)):
+        """
+        Rolling event loop lag summary and the most recent stalls.
+
+        Each stall lists how long the loop was blocked and the stack of the
+        callback or coroutine that was running at the time.
+        """
+        return get_diagnostics().summary()
+
+    @app.get("/diagnostics/profile", tags=["Admin"])
+    async def get_diagnostics_profile(seconds: float = 10, format: str = "prof",
+                                      api_key: Optional[str] = Depends(get_api_key)):
+        """
+        Profile the running server for a number of seconds and download the result.
+
+        Args:
+            seconds: Capture duration (1-300)
+            format: 'prof' for a cProfile/pstats file (snakeviz, pstats), 'text' for
+                    the top functions by cumulative time
+
+        Only one capture can run at a time.
+        """
+        from .diagnostics import stats_to_bytes, stats_to_text
+
+        if format not in ("prof", "text"):
+            raise HTTPException(status_code=400, detail="format must be 'prof' or 'text'")
+        if not 1 <= seconds <= 300:
+            raise HTTPException(status_code=400, detail="seconds must be between 1 and 300")
+
+        diagnostics = get_diagnostics()
+        try:
+            stats = await diagnostics.capture_profile(seconds)
+        except RuntimeError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+
+        if format == "text":
+            return Response(content=stats_to_text(stats), media_type="text/plain")
+
+        filename = f"tado-local-{time.strftime('%Y%m%d-%H%M%S')}.prof"
+        return Response(content=stats_to_bytes(stats), media_type="application/octet-stream",
+                        headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
     return app
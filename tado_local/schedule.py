@@ -0,0 +1,315 @@
+#
+# Copyright 2025 The TadoLocal and AmpScm contributors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Local weekly schedules for zones.
+
+Each zone can have a weekly program stored in the ``zone_schedules`` table: a list
+of (day of week, start time, temperature) entries. An entry is active from its start
+time until the next entry; a temperature of NULL or 0 turns heating off.
+
+The engine keeps the next transition of every zone in a heap and sleeps until the
+earliest one is due. Transitions that are due at the same moment are written with a
+single ``put_characteristics`` request. Times are the server's local time.
+
+Transitions that were due while the server was down are not replayed, so a restart
+does not undo manual changes made since the last transition.
+"""
+
+import asyncio
+import heapq
+import logging
+import re
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .api import TadoLocalAPI
+
+logger = logging.getLogger(__name__)
+
+DAYS = ('mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun')
+
+_TIME_PATTERN = re.compile(r'^([01]?\d|2[0-3]):([0-5]\d)$')
+
+
+def parse_entries(entries: List[Dict[str, Any]]) -> List[Tuple[int, str, Optional[float]]]:
+    """Validate schedule entries from the API.
+
+    Args:
+        entries: [{"day": "mon" or 0-6, "time": "HH:MM", "temperature": 21.0 or 0/None for off}]
+
+    Returns:
+        Sorted (day_of_week, 'HH:MM', temperature) tuples; day 0 is Monday
+
+    Raises:
+        ValueError for invalid days, times, temperatures or duplicate start times
+    """
+    parsed = {}
+    for entry in entries:
+        day = entry.get('day')
+        if isinstance(day, str) and day[:3].lower() in DAYS:
+            day = DAYS.index(day[:3].lower())
+        if isinstance(day, bool) or not isinstance(day, int) or not 0 <= day <= 6:
+            raise ValueError(f"Invalid day {entry.get('day')!r}: use 0-6 (Monday is 0) or mon..sun")
+
+        match = _TIME_PATTERN.match(str(entry.get('time', '')))
+        if not match:
+            raise ValueError(f"Invalid time {entry.get('time')!r}: use HH:MM")
+        start = f"{int(match.group(1)):02d}:{match.group(2)}"
+
+        temperature = entry.get('temperature')
+        if temperature is not None:
+            if isinstance(temperature, bool) or not isinstance(temperature, (int, float)):
+                raise ValueError(f"Invalid temperature {temperature!r}")
+            if temperature == 0:
+                temperature = None
+            elif not 5.0 <= temperature <= 30.0:
+                raise ValueError("Temperature must be 0 (off) or between 5 and 30°C")
+            else:
+                temperature = float(temperature)
+
+        if (day, start) in parsed:
+            raise ValueError(f"Duplicate entry for {DAYS[day]} {start}")
+        parsed[(day, start)] = temperature
+
+    return sorted((day, start, temperature) for (day, start), temperature in parsed.items())
+
+
+def _minute_of_week(day: int, start: str) -> int:
+    hours, minutes = start.split(':')
+    return day * 1440 + int(hours) * 60 + int(minutes)
+
+
+class ScheduleEngine:
+    """Applies the weekly zone programs stored in SQLite."""
+
+    def __init__(self, tado_api: 'TadoLocalAPI', clock: Callable[[], float] = time.time):
+        """
+        Args:
+            tado_api: API used to write setpoints (and whose database holds the schedules)
+            clock: Returns the current epoch time (for tests)
+        """
+        self.tado_api = tado_api
+        self.db_path = tado_api.state_manager.db_path
+        self.clock = clock
+        self.programs: Dict[int, List[Tuple[int, Optional[float]]]] = {}  # zone_id -> [(minute_of_week, temperature)]
+        self.heap: List[Tuple[float, int, int]] = []  # (due epoch, zone_id, generation)
+        self.generation: Dict[int, int] = {}  # zone_id -> program version; stale heap entries are skipped
+        self.changed = asyncio.Event()
+
+        self.applied = 0
+        self.failed = 0
+        self.last_applied: Dict[int, Dict[str, Any]] = {}  # zone_id -> {'at', 'temperature', 'error'?}
+
+    def load(self):
+        """Load all zone programs from the database and schedule their next transitions."""
+        conn = sqlite3.connect(self.db_path)
+        rows = conn.execute(
+            "SELECT zone_id, day_of_week, start_time, temperature FROM zone_schedules"
+        ).fetchall()
+        conn.close()
+
+        programs: Dict[int, List[Tuple[int, str, Optional[float]]]] = {}
+        for zone_id, day, start, temperature in rows:
+            programs.setdefault(zone_id, []).append((day, start, temperature))
+        for zone_id in set(self.programs) - set(programs):
+            self._set_program(zone_id, [])
+        for zone_id, entries in programs.items():
+            self._set_program(zone_id, entries)
+        logger.info(f"Loaded schedules for {len(self.programs)} zone(s)")
+
+    def get_schedule(self, zone_id: int) -> List[Dict[str, Any]]:
+        """Program of a zone as API entries (empty when the zone has no schedule)."""
+        return [
+            {'day': DAYS[minute // 1440], 'time': f"{minute % 1440 // 60:02d}:{minute % 60:02d}", 'temperature': temperature}
+            for minute, temperature in self.programs.get(zone_id, [])
+        ]
+
+    def set_schedule(self, zone_id: int, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Replace the program of a zone (an empty list removes it).
+
+        Setpoints are also checked against the write plan of the zone's leader
+        (e.g. a thermostat that only accepts up to 25°C), so a stored program does
+        not fail every time it runs.
+
+        Raises:
+            ValueError for invalid entries
+        """
+        parsed = parse_entries(entries)
+        leader_device_id = self.tado_api.state_manager.get_zone_leader(zone_id)
+        if leader_device_id is not None:
+            for day, start, temperature in parsed:
+                if temperature is None:
+                    char_updates = {'target_heating_cooling_state': 0}
+                else:
+                    char_updates = {'target_temperature': temperature, 'target_heating_cooling_state': 1}
+                try:
+                    self.tado_api._resolve_writes(leader_device_id, char_updates, quiet=True)
+                except ValueError as e:
+                    raise ValueError(f"{DAYS[day]} {start}: {e}") from e
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute("DELETE FROM zone_schedules WHERE zone_id = ?", (zone_id,))
+            conn.executemany(
+                "INSERT INTO zone_schedules (zone_id, day_of_week, start_time, temperature) VALUES (?, ?, ?, ?)",
+                [(zone_id, day, start, temperature) for day, start, temperature in parsed],
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+        self._set_program(zone_id, parsed)
+        logger.info(f"Zone {zone_id} schedule updated ({len(parsed)} entries)")
+        return self.get_schedule(zone_id)
+
+    def _set_program(self, zone_id: int, entries: List[Tuple[int, str, Optional[float]]]):
+        self.generation[zone_id] = self.generation.get(zone_id, 0) + 1
+        if entries:
+            self.programs[zone_id] = sorted((_minute_of_week(day, start), temperature) for day, start, temperature in entries)
+            heapq.heappush(self.heap, (self._next_due(zone_id, self.clock()), zone_id, self.generation[zone_id]))
+        else:
+            self.programs.pop(zone_id, None)
+        self.changed.set()
+
+    def _next_due(self, zone_id: int, after: float) -> float:
+        """Epoch time of the first transition of a zone strictly after `after`."""
+        now = datetime.fromtimestamp(after)
+        week_start = (now - timedelta(days=now.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+        for weeks in (0, 1):
+            for minute, _ in self.programs[zone_id]:
+                # Build the local wall-clock time (not an offset from week_start) so DST is respected
+                day = week_start + timedelta(weeks=weeks, days=minute // 1440)
+                due = day.replace(hour=minute % 1440 // 60, minute=minute % 60).timestamp()
+                if due > after:
+                    return due
+        raise AssertionError("a non-empty weekly program always has a transition within two weeks")
+
+    def active_entry(self, zone_id: int, at: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Program entry in effect for a zone at a given time (default: now)."""
+        program = self.programs.get(zone_id)
+        if not program:
+            return None
+        moment = datetime.fromtimestamp(self.clock() if at is None else at)
+        minute_now = moment.weekday() * 1440 + moment.hour * 60 + moment.minute
+        current = program[-1]  # Wraps around from the end of the previous week
+        for entry in program:
+            if entry[0] <= minute_now:
+                current = entry
+        minute, temperature = current
+        return {'day': DAYS[minute // 1440], 'time': f"{minute % 1440 // 60:02d}:{minute % 60:02d}", 'temperature': temperature}
+
+    def next_due(self) -> Optional[float]:
+        """Epoch time of the earliest pending transition."""
+        while self.heap and self.heap[0][2] != self.generation.get(self.heap[0][1]):
+            heapq.heappop(self.heap)
+        return self.heap[0][0] if self.heap else None
+
+    async def apply_due(self) -> Dict[int, Optional[float]]:
+        """Apply all transitions that are due, in one write.
+
+        Returns:
+            Dict mapping zone_id to the temperature applied (None for off)
+        """
+        now = self.clock()
+        due_zones = []
+        while self.next_due() is not None and self.heap[0][0] <= now:
+            due, zone_id, generation = heapq.heappop(self.heap)
+            due_zones.append((zone_id, due))
+            heapq.heappush(self.heap, (self._next_due(zone_id, now), zone_id, generation))
+        if not due_zones:
+            return {}
+
+        tado_api = self.tado_api
+        updates: Dict[int, Dict[str, Any]] = {}
+        applied: Dict[int, Optional[float]] = {}
+        leaders: Dict[int, int] = {}
+        for zone_id, due in due_zones:
+            temperature = self.active_entry(zone_id, at=due)['temperature']
+            leader_device_id = tado_api.state_manager.get_zone_leader(zone_id)
+            if temperature is None:
+                char_updates = {'target_heating_cooling_state': 0}
+            else:
+                char_updates = {'target_temperature': temperature, 'target_heating_cooling_state': 1}
+            try:
+                if leader_device_id is None:
+                    raise ValueError(f"Zone {zone_id} has no devices")
+                # Validate per zone so one bad entry does not block the other zones' write
+                tado_api._resolve_writes(leader_device_id, char_updates, quiet=True)
+            except ValueError as e:
+                self._record(zone_id, temperature, str(e))
+                continue
+            updates[leader_device_id] = char_updates
+            applied[zone_id] = temperature
+            leaders[zone_id] = leader_device_id
+
+        if not updates:
+            return {}
+        logger.info(f"Applying scheduled setpoints: {applied}")
+        try:
+            errors = await tado_api.set_characteristics_bulk(updates)
+        except Exception as e:
+            for zone_id, temperature in applied.items():
+                self._record(zone_id, temperature, str(e))
+            return {}
+
+        for zone_id, temperature in list(applied.items()):
+            device_errors = errors.get(leaders[zone_id])
+            self._record(zone_id, temperature, str(device_errors) if device_errors else None)
+            if device_errors:
+                del applied[zone_id]
+        return applied
+
+    def _record(self, zone_id: int, temperature: Optional[float], error: Optional[str] = None):
+        entry = {'at': self.clock(), 'temperature': temperature}
+        if error:
+            self.failed += 1
+            entry['error'] = error
+            logger.warning(f"Scheduled setpoint for zone {zone_id} failed: {error}")
+        else:
+            self.applied += 1
+        self.last_applied[zone_id] = entry
+
+    async def run(self):
+        """Apply transitions as they become due until the API shuts down."""
+        logger.info("Schedule engine started")
+        while not self.tado_api.is_shutting_down:
+            self.changed.clear()
+            due = self.next_due()
+            timeout = None if due is None else max(0.0, due - self.clock())
+            try:
+                # Wake up early when a program changes (its next transition may be sooner)
+                await asyncio.wait_for(self.changed.wait(), timeout=timeout)
+                continue
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.apply_due()
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Schedule engine failed to apply transitions: {e}")
+
+    def summary(self) -> Dict[str, Any]:
+        """Counters and the next transition for /status."""
+        due = self.next_due()
+        return {
+            'zones': sorted(self.programs),
+            'next_transition': due,
+            'applied': self.applied,
+            'failed': self.failed,
+        }
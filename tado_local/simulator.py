@@ -0,0 +1,337 @@
+#
+# Copyright 2025 The TadoLocal and AmpScm contributors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Simulated Tado HomeKit bridge for tests and benchmarks.
+
+`SimulatedPairing` stands in for an aiohomekit `IpPairing`, implementing the
+surface `TadoLocalAPI` uses:
+
+- ``list_accessories_and_characteristics()``
+- ``get_characteristics()`` / ``put_characteristics()``
+- ``subscribe()`` / ``unsubscribe()`` / ``dispatcher_connect()``
+
+Accessory trees mimic a Tado bridge: an IB01 internet bridge plus one RU02
+thermostat and N VA02 radiator valves per zone, using the service and
+characteristic UUIDs from `homekit_uuids`. Serial numbers follow the same scheme
+as `FakeTadoCloud.generate()`, so the two fakes describe the same home.
+
+Usage::
+
+    pairing = SimulatedPairing.generate(num_zones=50, valves_per_zone=3, latency=0.005)
+    await tado_api.initialize(pairing)
+    pairing.start_events(rate=200)  # random sensor changes per second
+"""
+
+import asyncio
+import copy
+import logging
+import random
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .homekit_uuids import (
+    CHARACTERISTIC_NAMES, HOMEKIT_CHARACTERISTICS, HOMEKIT_SERVICES, TADO_CHARACTERISTICS, TADO_SERVICES,
+    normalize_uuid,
+)
+
+logger = logging.getLogger(__name__)
+
+# Reverse lookups: name -> UUID, so the simulator always uses the registry UUIDs
+_SERVICE_UUIDS = {name: uuid for uuid, name in {**HOMEKIT_SERVICES, **TADO_SERVICES}.items()}
+_CHARACTERISTIC_UUIDS = {name: uuid for uuid, name in {**HOMEKIT_CHARACTERISTICS, **TADO_CHARACTERISTICS}.items()}
+
+# Characteristics that drift on their own when events are generated: name -> (min, max, step)
+SENSOR_DRIFT = {
+    'CurrentTemperature': (15.0, 25.0, 0.1),
+    'CurrentRelativeHumidity': (30.0, 70.0, 1.0),
+    'CurrentHeatingCoolingState': (0, 1, 1),
+}
+
+
+class SimulatedPairing:
+    """In-memory HomeKit pairing that behaves like a Tado bridge."""
+
+    def __init__(
+        self,
+        accessories: List[Dict[str, Any]],
+        latency: float = 0.0,
+        latency_jitter: float = 0.0,
+        echo_writes: bool = True,
+        config_num: int = 1,
+        pairing_id: str = "5e:1a:00:00:00:01",
+        seed: Optional[int] = None,
+    ):
+        """Initialize the simulated pairing.
+
+        Args:
+            accessories: HomeKit accessory list (as returned by list_accessories_and_characteristics)
+            latency: Seconds added to every request
+            latency_jitter: Extra random latency (0..jitter seconds)
+            echo_writes: Dispatch an event for subscribed characteristics after a write,
+                like the real bridge does
+            config_num: HomeKit configuration number (c#) advertised by the bridge
+            pairing_id: Accessory pairing id (IpPairing.id), keys the persisted accessory cache
+            seed: Seed for latency jitter and generated events
+        """
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.echo_writes = echo_writes
+        self.config_num = config_num
+        self.id = pairing_id
+        self._random = random.Random(seed)
+
+        self._accessories = accessories
+        self._chars: Dict[Tuple[int, int], Dict[str, Any]] = {}  # (aid, iid) -> characteristic dict
+        self._drifting: Dict[Tuple[int, int], str] = {}  # (aid, iid) -> SENSOR_DRIFT name
+        for accessory in accessories:
+            for service in accessory['services']:
+                for char in service['characteristics']:
+                    key = (accessory['aid'], char['iid'])
+                    self._chars[key] = char
+                    name = CHARACTERISTIC_NAMES.get(normalize_uuid(char['type']))
+                    if name in SENSOR_DRIFT:
+                        self._drifting[key] = name
+
+        self._callbacks: List[Callable[[Dict[Tuple[int, int], Dict[str, Any]]], None]] = []
+        self.subscriptions: set = set()
+        self.calls: Counter = Counter()  # method name -> count
+        self.events_sent = 0
+        self._event_task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def generate(cls, num_zones: int = 5, valves_per_zone: int = 2, **kwargs) -> 'SimulatedPairing':
+        """Create a bridge with num_zones zones (one RU02 + valves_per_zone VA02 each)."""
+        rnd = random.Random(kwargs.get('seed'))
+        accessories = [build_accessory(1, 'IB0000000001', 'IB01', rnd)]
+        aid = 1
+        serial = 1
+        for _ in range(num_zones):
+            for index in range(valves_per_zone + 1):
+                aid += 1
+                serial += 1
+                leader = index == 0
+                prefix, model = ('RU', 'RU02') if leader else ('VA', 'VA02')
+                accessories.append(build_accessory(aid, f"{prefix}{serial:010d}", model, rnd))
+        return cls(accessories, **kwargs)
+
+    # ------------------------------------------------------------------------
+    # IpPairing surface
+    # ------------------------------------------------------------------------
+
+    async def _delay(self):
+        delay = self.latency
+        if self.latency_jitter:
+            delay += self._random.uniform(0, self.latency_jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        else:
+            await asyncio.sleep(0)
+
+    async def _ensure_connected(self):
+        """Connection is always up."""
+
+    async def close(self):
+        """Stop generated events."""
+        await self.stop_events()
+
+    async def list_accessories_and_characteristics(self) -> List[Dict[str, Any]]:
+        """Return a copy of the accessory tree with current values."""
+        self.calls['list_accessories_and_characteristics'] += 1
+        await self._delay()
+        return copy.deepcopy(self._accessories)
+
+    async def get_characteristics(self, characteristics: Iterable[Tuple[int, int]], **kwargs) -> Dict[Tuple[int, int], Dict[str, Any]]:
+        """Read characteristic values; unknown ones get HAP status -70409."""
+        self.calls['get_characteristics'] += 1
+        await self._delay()
+        results = {}
+        for key in characteristics:
+            char = self._chars.get(tuple(key))
+            if char is None:
+                results[tuple(key)] = {'status': -70409}
+            else:
+                results[tuple(key)] = {'value': char.get('value')}
+        return results
+
+    async def put_characteristics(self, characteristics: Iterable[Tuple[int, int, Any]]) -> Dict[Tuple[int, int], Dict[str, Any]]:
+        """Write values; returns per-characteristic errors like aiohomekit (empty on success)."""
+        self.calls['put_characteristics'] += 1
+        await self._delay()
+        errors = {}
+        changed = {}
+        for aid, iid, value in characteristics:
+            char = self._chars.get((aid, iid))
+            if char is None:
+                errors[(aid, iid)] = {'status': -70409, 'description': 'Resource does not exist'}
+            elif 'pw' not in char.get('perms', []):
+                errors[(aid, iid)] = {'status': -70404, 'description': 'Characteristic is read-only'}
+            else:
+                char['value'] = value
+                changed[(aid, iid)] = {'value': value}
+
+        if self.echo_writes:
+            self._dispatch({key: val for key, val in changed.items() if key in self.subscriptions})
+        return errors
+
+    async def subscribe(self, characteristics: Iterable[Tuple[int, int]]):
+        """Enable events for characteristics."""
+        self.calls['subscribe'] += 1
+        await self._delay()
+        self.subscriptions.update(tuple(key) for key in characteristics)
+
+    async def unsubscribe(self, characteristics: Iterable[Tuple[int, int]]):
+        """Disable events for characteristics."""
+        self.calls['unsubscribe'] += 1
+        await self._delay()
+        self.subscriptions.difference_update(tuple(key) for key in characteristics)
+
+    def dispatcher_connect(self, callback: Callable[[Dict[Tuple[int, int], Dict[str, Any]]], None]) -> Callable[[], None]:
+        """Register an event callback; returns a function that removes it."""
+        self._callbacks.append(callback)
+
+        def disconnect():
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+        return disconnect
+
+    # ------------------------------------------------------------------------
+    # Simulation controls
+    # ------------------------------------------------------------------------
+
+    def _dispatch(self, update: Dict[Tuple[int, int], Dict[str, Any]]):
+        if not update:
+            return
+        self.events_sent += len(update)
+        for callback in list(self._callbacks):
+            callback(update)
+
+    def find_iid(self, aid: int, char_name: str) -> Optional[int]:
+        """Find the iid of a characteristic by name on an accessory."""
+        char_uuid = _CHARACTERISTIC_UUIDS.get(char_name)
+        if char_uuid is None:
+            return None
+        char_uuid = normalize_uuid(char_uuid)
+        for (char_aid, iid), char in self._chars.items():
+            if char_aid == aid and normalize_uuid(char['type']) == char_uuid:
+                return iid
+        return None
+
+    def emit(self, aid: int, iid: int, value: Any):
+        """Change a value on the device side and send an event if subscribed."""
+        self._chars[(aid, iid)]['value'] = value
+        if (aid, iid) in self.subscriptions:
+            self._dispatch({(aid, iid): {'value': value}})
+
+    def random_change(self) -> Optional[Tuple[int, int, Any]]:
+        """Drift one random sensor characteristic and send its event."""
+        candidates = [key for key in self.subscriptions if key in self._drifting]
+        if not candidates:
+            return None
+        aid, iid = self._random.choice(candidates)
+        low, high, step = SENSOR_DRIFT[self._drifting[(aid, iid)]]
+        value = self._chars[(aid, iid)]['value'] + self._random.choice((-step, step))
+        value = min(high, max(low, value))
+        if isinstance(step, float):
+            value = round(value, 1)
+        self.emit(aid, iid, value)
+        return aid, iid, value
+
+    def start_events(self, rate: float):
+        """Generate rate random sensor events per second in the background."""
+        if self._event_task and not self._event_task.done():
+            self._event_task.cancel()
+        self._event_task = asyncio.create_task(self._event_loop(rate))
+
+    async def stop_events(self):
+        """Stop generated events."""
+        if self._event_task and not self._event_task.done():
+            self._event_task.cancel()
+            try:
+                await self._event_task
+            except asyncio.CancelledError:
+                pass
+        self._event_task = None
+
+    async def _event_loop(self, rate: float):
+        # Emit in small bursts so high rates are not bounded by timer resolution
+        tick = 0.01
+        budget = 0.0
+        loop = asyncio.get_running_loop()
+        last = loop.time()
+        while True:
+            await asyncio.sleep(tick)
+            now = loop.time()
+            budget += (now - last) * rate
+            last = now
+            while budget >= 1:
+                budget -= 1
+                self.random_change()
+
+
+def _char(iid: int, name: str, value: Any, fmt: str, perms: List[str], **extra) -> Dict[str, Any]:
+    char = {'iid': iid, 'type': _CHARACTERISTIC_UUIDS[name], 'perms': perms, 'format': fmt, **extra}
+    if value is not None:
+        char['value'] = value
+    return char
+
+
+def build_accessory(aid: int, serial: str, model: str, rnd: Optional[random.Random] = None) -> Dict[str, Any]:
+    """Build a Tado-like HomeKit accessory tree for an IB01, RU02 or VA02 device."""
+    rnd = rnd or random.Random()
+    info = {
+        'iid': 1,
+        'type': _SERVICE_UUIDS['AccessoryInformation'],
+        'characteristics': [
+            _char(2, 'Identify', None, 'bool', ['pw']),
+            _char(3, 'Manufacturer', 'tado', 'string', ['pr']),
+            _char(4, 'Model', model, 'string', ['pr']),
+            _char(5, 'Name', f"{model} {serial[-4:]}", 'string', ['pr']),
+            _char(6, 'SerialNumber', serial, 'string', ['pr']),
+            _char(7, 'FirmwareRevision', '54.8', 'string', ['pr']),
+        ],
+    }
+    services = [info]
+
+    if model == 'IB01':
+        services.append({
+            'iid': 20,
+            'type': _SERVICE_UUIDS['TadoProprietaryService'],
+            'characteristics': [_char(21, 'TadoProprietaryControl', '', 'data', ['pr', 'pw'])],
+        })
+        return {'aid': aid, 'services': services}
+
+    current = round(rnd.uniform(17.0, 22.0), 1)
+    thermostat_chars = [
+        _char(10, 'CurrentHeatingCoolingState', 0, 'uint8', ['pr', 'ev'], minValue=0, maxValue=2, minStep=1),
+        _char(11, 'TargetHeatingCoolingState', 1, 'uint8', ['pr', 'pw', 'ev'], minValue=0, maxValue=3, minStep=1, **{'valid-values': [0, 1, 3]}),
+        _char(12, 'CurrentTemperature', current, 'float', ['pr', 'ev'], minValue=0, maxValue=100, minStep=0.1, unit='celsius'),
+        _char(13, 'TargetTemperature', 20.0, 'float', ['pr', 'pw', 'ev'], minValue=5, maxValue=25, minStep=0.1, unit='celsius'),
+        _char(14, 'TemperatureDisplayUnits', 0, 'uint8', ['pr', 'pw', 'ev'], minValue=0, maxValue=1, minStep=1),
+        _char(15, 'Name', f"{model} {serial[-4:]}", 'string', ['pr']),
+        _char(16, 'CurrentRelativeHumidity', round(rnd.uniform(35.0, 65.0)), 'float', ['pr', 'ev'], minValue=0, maxValue=100, minStep=1, unit='percentage'),
+    ]
+    services.append({'iid': 9, 'type': _SERVICE_UUIDS['Thermostat'], 'characteristics': thermostat_chars})
+    services.append({
+        'iid': 30,
+        'type': _SERVICE_UUIDS['Battery'],
+        'characteristics': [
+            _char(31, 'StatusLowBattery', 0, 'uint8', ['pr', 'ev'], minValue=0, maxValue=1),
+            _char(32, 'BatteryLevel', 100, 'uint8', ['pr', 'ev'], minValue=0, maxValue=100, unit='percentage'),
+            _char(33, 'ChargingState', 2, 'uint8', ['pr', 'ev'], minValue=0, maxValue=2),
+        ],
+    })
+    return {'aid': aid, 'services': services}
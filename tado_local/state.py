@@ -20,40 +20,46 @@ import datetime
 import logging
 import sqlite3
 import time
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Union
+
+from . import metrics, tracing
+from .homekit_uuids import (
+    CHAR_MANUFACTURER, CHAR_MODEL, CHAR_NAME, SERVICE_ACCESSORY_INFORMATION, SERVICE_HUMIDITY_SENSOR,
+    SERVICE_TEMPERATURE_SENSOR, SERVICE_THERMOSTAT, STATE_FIELDS, normalize_uuid,
+)
 
 logger = logging.getLogger(__name__)
 
 class DeviceStateManager:
     """Manages device state tracking, history, and change detection."""
 
-    # HomeKit characteristic UUIDs we care about
+    # HomeKit characteristic UUIDs we care about (canonical short form, see homekit_uuids.normalize_uuid)
     # Temperature & HVAC
-    CHAR_CURRENT_TEMPERATURE = '00000011-0000-1000-8000-0026bb765291'
-    CHAR_TARGET_TEMPERATURE = '00000035-0000-1000-8000-0026bb765291'
-    CHAR_CURRENT_HEATING_COOLING = '0000000f-0000-1000-8000-0026bb765291'
-    CHAR_TARGET_HEATING_COOLING = '00000033-0000-1000-8000-0026bb765291'
-    CHAR_HEATING_THRESHOLD = '00000012-0000-1000-8000-0026bb765291'
-    CHAR_COOLING_THRESHOLD = '0000000d-0000-1000-8000-0026bb765291'
-    CHAR_TEMP_DISPLAY_UNITS = '00000036-0000-1000-8000-0026bb765291'
+    CHAR_CURRENT_TEMPERATURE = 0x11
+    CHAR_TARGET_TEMPERATURE = 0x35
+    CHAR_CURRENT_HEATING_COOLING = 0x0F
+    CHAR_TARGET_HEATING_COOLING = 0x33
+    CHAR_HEATING_THRESHOLD = 0x12
+    CHAR_COOLING_THRESHOLD = 0x0D
+    CHAR_TEMP_DISPLAY_UNITS = 0x36
 
     # Humidity
-    CHAR_CURRENT_HUMIDITY = '00000010-0000-1000-8000-0026bb765291'
-    CHAR_TARGET_HUMIDITY = '00000034-0000-1000-8000-0026bb765291'
+    CHAR_CURRENT_HUMIDITY = 0x10
+    CHAR_TARGET_HUMIDITY = 0x34
 
     # Battery
-    CHAR_BATTERY_LEVEL = '00000068-0000-1000-8000-0026bb765291'
-    CHAR_STATUS_LOW_BATTERY = '00000079-0000-1000-8000-0026bb765291'
+    CHAR_BATTERY_LEVEL = 0x68
+    CHAR_STATUS_LOW_BATTERY = 0x79
 
     # Active state (for heaters, coolers, etc.)
-    CHAR_ACTIVE = '000000b0-0000-1000-8000-0026bb765291'
+    CHAR_ACTIVE = 0xB0
 
     # Valve position (for radiator controls)
-    CHAR_VALVE_POSITION = '0000004f-0000-1000-8000-0026bb765291'
+    CHAR_VALVE_POSITION = 0x4F
 
     # Water heater specific
-    CHAR_CURRENT_WATER_TEMPERATURE = '00000011-0000-1000-8000-0026bb765291'  # Same as current temp
-    CHAR_TARGET_WATER_TEMPERATURE = '00000035-0000-1000-8000-0026bb765291'  # Same as target temp
+    CHAR_CURRENT_WATER_TEMPERATURE = 0x11  # Same as current temp
+    CHAR_TARGET_WATER_TEMPERATURE = 0x35  # Same as target temp
 
     def __init__(self, db_path: str):
         self.db_path = db_path
@@ -61,6 +67,7 @@ class DeviceStateManager:
         self.aid_to_device_id: Dict[int, int] = {}  # aid -> device_id (bidirectional mapping)
         self.device_info_cache: Dict[int, Dict[str, Any]] = {}  # device_id -> {name, zone_name, serial, aid, etc}
         self.zone_cache: Dict[int, Dict[str, Any]] = {}  # zone_id -> {name, leader_device_id, etc}
+        self.tado_zone_index: Dict[int, List[int]] = {}  # tado_zone_id -> [device_id]
         self.current_state: Dict[int, Dict[str, Any]] = {}  # device_id -> current state
         self.last_saved_bucket: Dict[int, str] = {}  # device_id -> last saved bucket
         self.bucket_state_snapshot: Dict[int, Dict[str, Any]] = {}  # device_id -> state when bucket was saved
@@ -88,11 +95,13 @@ class DeviceStateManager:
         cursor = conn.execute("""
          SELECT d.device_id, d.serial_number, d.aid, d.name, d.device_type,
              d.zone_id, z.name as zone_name, d.is_zone_leader, d.is_circuit_driver, d.battery_state,
-             z.tado_zone_id
+             COALESCE(d.tado_zone_id, z.tado_zone_id), d.model, d.firmware_version,
+             d.is_zone_driver, d.duties
          FROM devices d
          LEFT JOIN zones z ON d.zone_id = z.zone_id
         """)
-        for device_id, serial_number, aid, name, device_type, zone_id, zone_name, is_zone_leader, is_circuit_driver, battery_state, tado_zone_id in cursor.fetchall():
+        for (device_id, serial_number, aid, name, device_type, zone_id, zone_name, is_zone_leader, is_circuit_driver,
+             battery_state, tado_zone_id, model, firmware_version, is_zone_driver, duties) in cursor.fetchall():
             self.device_id_cache[serial_number] = device_id
             if aid:
                 self.aid_to_device_id[aid] = device_id
@@ -106,9 +115,15 @@ class DeviceStateManager:
                 'tado_zone_id': tado_zone_id,
                 'is_zone_leader': bool(is_zone_leader),
                 'is_circuit_driver': bool(is_circuit_driver),
-                'battery_state': battery_state  # From Cloud API: "NORMAL", "LOW", etc.
+                'battery_state': battery_state,  # From Cloud API: "NORMAL", "LOW", etc.
+                # Cloud-synced metadata, kept so cloud sync can diff without a SELECT
+                'model': model,
+                'firmware_version': firmware_version,
+                'is_zone_driver': bool(is_zone_driver),
+                'duties': duties,
             }
         conn.close()
+        self._rebuild_tado_zone_index()
         logger.info(f"Loaded {len(self.device_id_cache)} devices from cache")
 
     def _load_zone_cache(self):
@@ -118,13 +133,14 @@ class DeviceStateManager:
             SELECT z.zone_id, z.name, z.leader_device_id, z.order_id,
                    d.serial_number as leader_serial, d.device_type as leader_type,
                    z.tado_zone_id, 
-                   d.is_circuit_driver, z.uuid
+                   d.is_circuit_driver, z.uuid, z.tado_home_id, z.zone_type
             FROM zones z
             LEFT JOIN devices d ON z.leader_device_id = d.device_id
             ORDER BY z.order_id, z.name
         """)
 
-        for zone_id, name, leader_device_id, order_id, leader_serial, leader_type, tado_zone_id, is_circuit_driver, uuid_val in cursor.fetchall():
+        for (zone_id, name, leader_device_id, order_id, leader_serial, leader_type, tado_zone_id, is_circuit_driver, uuid_val,
+             tado_home_id, zone_type) in cursor.fetchall():
             self.zone_cache[zone_id] = {
                 'zone_id': zone_id,
                 'name': name,
@@ -134,7 +150,9 @@ class DeviceStateManager:
                 'leader_serial': leader_serial,
                 'leader_type': leader_type,
                 'is_circuit_driver': bool(is_circuit_driver),
-                'uuid': uuid_val
+                'uuid': uuid_val,
+                'tado_home_id': tado_home_id,
+                'zone_type': zone_type,
             }
 
         conn.close()
@@ -190,10 +208,56 @@ class DeviceStateManager:
         conn.close()
         logger.info(f"Loaded latest state for {len(self.current_state)} devices from database")
 
+    def relink_catalog(self):
+        """Recompute derived zone/device cache fields after in-memory edits.
+
+        Cloud sync patches zone_cache and device_info_cache in place instead of
+        reloading them from SQLite. This refreshes the fields that come from the
+        zone <-> device joins (zone_name, leader_serial, leader_type,
+        is_circuit_driver) so the caches look exactly like a fresh load.
+        """
+        for device_info in self.device_info_cache.values():
+            zone_info = self.zone_cache.get(device_info.get('zone_id'))
+            device_info['zone_name'] = zone_info['name'] if zone_info else None
+
+        for zone_info in self.zone_cache.values():
+            leader = self.device_info_cache.get(zone_info.get('leader_device_id'), {})
+            zone_info['leader_serial'] = leader.get('serial_number')
+            zone_info['leader_type'] = leader.get('device_type')
+            zone_info['is_circuit_driver'] = bool(leader.get('is_circuit_driver'))
+
+        self._rebuild_tado_zone_index()
+
+    def _rebuild_tado_zone_index(self):
+        """Rebuild the tado_zone_id -> device_ids index from device_info_cache."""
+        index: Dict[int, List[int]] = {}
+        for device_id, device_info in self.device_info_cache.items():
+            tado_zone_id = device_info.get('tado_zone_id')
+            if tado_zone_id is not None:
+                index.setdefault(int(tado_zone_id), []).append(device_id)
+        self.tado_zone_index = index
+
+    def get_devices_by_tado_zone(self, tado_zone_id: int) -> List[int]:
+        """Get device_ids assigned to a Tado Cloud zone ID (no DB query)."""
+        return self.tado_zone_index.get(int(tado_zone_id), [])
+
     def get_device_info(self, device_id: int) -> Dict[str, Any]:
         """Get cached device info including zone name, aid, etc."""
         return self.device_info_cache.get(device_id, {})
 
+    def get_zone_leader(self, zone_id: int) -> Optional[int]:
+        """Leader device of a zone, from the in-memory caches.
+
+        Falls back to the zone's lowest device id when no leader is assigned.
+        """
+        zone_info = self.zone_cache.get(zone_id)
+        if not zone_info:
+            return None
+        if zone_info.get('leader_device_id'):
+            return zone_info['leader_device_id']
+        members = [device_id for device_id, info in self.device_info_cache.items() if info.get('zone_id') == zone_id]
+        return min(members) if members else None
+
     def get_device_id_by_aid(self, aid: int) -> Optional[int]:
         """Get device_id from HomeKit accessory ID (aid)."""
         return self.aid_to_device_id.get(aid)
@@ -231,25 +295,26 @@ class DeviceStateManager:
         manufacturer = None
 
         for service in accessory_data.get('services', []):
+            service_type = normalize_uuid(service.get('type'))
+
             # AccessoryInformation service
-            if service.get('type') == '0000003e-0000-1000-8000-0026bb765291':
+            if service_type == SERVICE_ACCESSORY_INFORMATION:
                 for char in service.get('characteristics', []):
-                    char_type = char.get('type', '').lower()
+                    char_type = normalize_uuid(char.get('type'))
                     value = char.get('value')
-                    if char_type == '00000023-0000-1000-8000-0026bb765291':  # Name
+                    if char_type == CHAR_NAME:
                         name = value
-                    elif char_type == '00000021-0000-1000-8000-0026bb765291':  # Model
+                    elif char_type == CHAR_MODEL:
                         model = value
-                    elif char_type == '00000020-0000-1000-8000-0026bb765291':  # Manufacturer
+                    elif char_type == CHAR_MANUFACTURER:
                         manufacturer = value
 
             # Determine device type from services
-            service_type = service.get('type', '').lower()
-            if service_type == '0000004a-0000-1000-8000-0026bb765291':
+            if service_type == SERVICE_THERMOSTAT:
                 device_type = "thermostat"
-            elif service_type == '0000008a-0000-1000-8000-0026bb765291':
+            elif service_type == SERVICE_TEMPERATURE_SENSOR:
                 device_type = "temperature_sensor"
-            elif service_type == '00000082-0000-1000-8000-0026bb765291':
+            elif service_type == SERVICE_HUMIDITY_SENSOR:
                 device_type = "humidity_sensor"
 
         # If device type still unknown, detect from serial number prefix
@@ -303,29 +368,34 @@ class DeviceStateManager:
 
         return device_id
 
-    def update_device_characteristic(self, device_id: int, char_type: str, value: Any, timestamp: float):
-        """Update a single characteristic for a device."""
+    # State fields written to device_state_history (column order of the history row)
+    HISTORY_FIELDS = (
+        'current_temperature', 'target_temperature',
+        'current_heating_cooling_state', 'target_heating_cooling_state',
+        'heating_threshold_temperature', 'cooling_threshold_temperature',
+        'temperature_display_units', 'battery_level', 'status_low_battery',
+        'humidity', 'target_humidity', 'active_state', 'valve_position',
+    )
+
+    def update_device_characteristic(self, device_id: int, char_type: Union[int, str], value: Any, timestamp: float,
+                                     save_history: bool = True):
+        """Update a single characteristic for a device.
+
+        Args:
+            device_id: Device to update
+            char_type: HomeKit characteristic UUID (canonical or string form)
+            value: New value
+            timestamp: Time of the reading
+            save_history: Write the history row now (batch callers save once per device afterwards)
+
+        Returns:
+            (field_name, old_value, new_value), or (None, None, None) when nothing changed
+        """
         if device_id not in self.current_state:
             self.current_state[device_id] = {}
 
-        # Map characteristic to state field
-        char_mapping = {
-            self.CHAR_CURRENT_TEMPERATURE: 'current_temperature',
-            self.CHAR_TARGET_TEMPERATURE: 'target_temperature',
-            self.CHAR_CURRENT_HEATING_COOLING: 'current_heating_cooling_state',
-            self.CHAR_TARGET_HEATING_COOLING: 'target_heating_cooling_state',
-            self.CHAR_HEATING_THRESHOLD: 'heating_threshold_temperature',
-            self.CHAR_COOLING_THRESHOLD: 'cooling_threshold_temperature',
-            self.CHAR_TEMP_DISPLAY_UNITS: 'temperature_display_units',
-            self.CHAR_BATTERY_LEVEL: 'battery_level',
-            self.CHAR_STATUS_LOW_BATTERY: 'status_low_battery',
-            self.CHAR_CURRENT_HUMIDITY: 'humidity',
-            self.CHAR_TARGET_HUMIDITY: 'target_humidity',
-            self.CHAR_ACTIVE: 'active_state',
-            self.CHAR_VALVE_POSITION: 'valve_position',
-        }
-
-        field_name = char_mapping.get(char_type.lower())
+        # Map characteristic to state field (callers pass canonical UUIDs; normalizing those is a no-op)
+        field_name = STATE_FIELDS.get(normalize_uuid(char_type))
         if field_name:
             old_value = self.current_state[device_id].get(field_name)
 
@@ -336,18 +406,49 @@ class DeviceStateManager:
             self.current_state[device_id][field_name] = value
             self.current_state[device_id]['last_update'] = timestamp
 
-            # Check if we need to save to history
-            current_bucket = self._get_timestamp_bucket(timestamp)
-            last_bucket = self.last_saved_bucket.get(device_id)
-
-            # Save if: new bucket OR state changed within same bucket
-            if last_bucket != current_bucket or self._has_state_changed(device_id):
-                self._save_to_history(device_id, timestamp)
+            if save_history and self._needs_history_save(device_id, timestamp):
+                with tracing.span('sqlite.history_write', device_id=device_id):
+                    self._save_to_history(device_id, timestamp)
 
             return field_name, old_value, value
 
         return None, None, None
 
+    def update_device_characteristics(self, updates: List[tuple], timestamp: float) -> List[tuple]:
+        """Apply a batch of characteristic values and write history once per device.
+
+        All values are applied in memory first; every device that needs a history
+        row then gets exactly one, written in a single transaction.
+
+        Args:
+            updates: (device_id, char_type, value) tuples
+            timestamp: Time the values were read
+
+        Returns:
+            (device_id, field_name, old_value, new_value) for every field that changed
+        """
+        changes = []
+        changed_devices = {}  # dict keeps first-seen order
+        for device_id, char_type, value in updates:
+            field_name, old_value, new_value = self.update_device_characteristic(
+                device_id, char_type, value, timestamp, save_history=False
+            )
+            if field_name:
+                changes.append((device_id, field_name, old_value, new_value))
+                changed_devices[device_id] = None
+
+        to_save = [device_id for device_id in changed_devices if self._needs_history_save(device_id, timestamp)]
+        if to_save:
+            with tracing.span('sqlite.history_write', devices=len(to_save)):
+                self._save_history_batch(to_save, timestamp)
+
+        return changes
+
+    def _needs_history_save(self, device_id: int, timestamp: float) -> bool:
+        """Save if: new bucket OR state changed within same bucket."""
+        current_bucket = self._get_timestamp_bucket(timestamp)
+        return self.last_saved_bucket.get(device_id) != current_bucket or self._has_state_changed(device_id)
+
     def _has_state_changed(self, device_id: int) -> bool:
         """Check if current state differs from last saved snapshot."""
         if device_id not in self.bucket_state_snapshot:
@@ -357,15 +458,7 @@ class DeviceStateManager:
         snapshot = self.bucket_state_snapshot.get(device_id, {})
 
         # Compare only the data fields, not metadata like 'last_update'
-        data_fields = [
-            'current_temperature', 'target_temperature',
-            'current_heating_cooling_state', 'target_heating_cooling_state',
-            'heating_threshold_temperature', 'cooling_threshold_temperature',
-            'temperature_display_units', 'battery_level', 'status_low_battery',
-            'humidity', 'target_humidity', 'active_state', 'valve_position'
-        ]
-
-        for field in data_fields:
+        for field in self.HISTORY_FIELDS:
             if current.get(field) != snapshot.get(field):
                 return True
 
@@ -380,14 +473,25 @@ class DeviceStateManager:
 
     def _save_to_history(self, device_id: int, timestamp: float):
         """Save current state to history table using 10-second bucket."""
-        if device_id not in self.current_state:
+        self._save_history_batch([device_id], timestamp)
+
+    def _save_history_batch(self, device_ids: List[int], timestamp: float):
+        """Save the current state of several devices to history in one transaction."""
+        device_ids = [device_id for device_id in device_ids if device_id in self.current_state]
+        if not device_ids:
             return
 
-        state = self.current_state[device_id]
         bucket = self._get_timestamp_bucket(timestamp)
+        rows = [
+            (device_id, bucket, *(self.current_state[device_id].get(field) for field in self.HISTORY_FIELDS))
+            for device_id in device_ids
+        ]
 
+        started = time.perf_counter()
         conn = sqlite3.connect(self.db_path)
-        conn.execute("""
+        with metrics.SQLITE_LOCK_WAIT_SECONDS.labels('history').time():
+            conn.execute("BEGIN IMMEDIATE")
+        conn.executemany("""
             INSERT INTO device_state_history (
                 device_id, timestamp_bucket,
                 current_temperature, target_temperature,
@@ -411,44 +515,19 @@ class DeviceStateManager:
                 active_state = COALESCE(excluded.active_state, active_state),
                 valve_position = COALESCE(excluded.valve_position, valve_position),
                 updated_at = CURRENT_TIMESTAMP
-        """, (
-            device_id, bucket,
-            state.get('current_temperature'),
-            state.get('target_temperature'),
-            state.get('current_heating_cooling_state'),
-            state.get('target_heating_cooling_state'),
-            state.get('heating_threshold_temperature'),
-            state.get('cooling_threshold_temperature'),
-            state.get('temperature_display_units'),
-            state.get('battery_level'),
-            state.get('status_low_battery'),
-            state.get('humidity'),
-            state.get('target_humidity'),
-            state.get('active_state'),
-            state.get('valve_position')
-        ))
+        """, rows)
         conn.commit()
         conn.close()
+        metrics.HISTORY_WRITE_SECONDS.observe(time.perf_counter() - started)
+        metrics.HISTORY_BATCH_ROWS.observe(len(rows))
 
         # Update tracking: remember this bucket and state snapshot
-        self.last_saved_bucket[device_id] = bucket
-        self.bucket_state_snapshot[device_id] = {
-            'current_temperature': state.get('current_temperature'),
-            'target_temperature': state.get('target_temperature'),
-            'current_heating_cooling_state': state.get('current_heating_cooling_state'),
-            'target_heating_cooling_state': state.get('target_heating_cooling_state'),
-            'heating_threshold_temperature': state.get('heating_threshold_temperature'),
-            'cooling_threshold_temperature': state.get('cooling_threshold_temperature'),
-            'temperature_display_units': state.get('temperature_display_units'),
-            'battery_level': state.get('battery_level'),
-            'status_low_battery': state.get('status_low_battery'),
-            'humidity': state.get('humidity'),
-            'target_humidity': state.get('target_humidity'),
-            'active_state': state.get('active_state'),
-            'valve_position': state.get('valve_position'),
-        }
+        for device_id in device_ids:
+            state = self.current_state[device_id]
+            self.last_saved_bucket[device_id] = bucket
+            self.bucket_state_snapshot[device_id] = {field: state.get(field) for field in self.HISTORY_FIELDS}
 
-        logger.debug(f"Saved device {device_id} state to history bucket {bucket}")
+        logger.debug(f"Saved {len(device_ids)} device state(s) to history bucket {bucket}")
 
     def get_device_history(self, device_id: int, start_time: float = None, end_time: float = None, limit: int = 100, offset: int = 0) -> List[Dict]:
         """Get device state history with standardized format."""
@@ -511,7 +590,7 @@ class DeviceStateManager:
             return self.current_state.get(device_id, {})
         return self.current_state
 
-    def set_optimistic_state(self, device_id: int, state_changes: Dict[str, Any]):
+    def set_optimistic_state(self, device_id: int, state_changes: Dict[str, Any], merge: bool = False):
         """
         Set optimistic state prediction for a device.
         
@@ -521,7 +600,10 @@ class DeviceStateManager:
         Args:
             device_id: Device to update
             state_changes: Dict of state keys to predicted values
+            merge: Add to the device's pending predictions instead of replacing them
         """
+        if merge and device_id in self.optimistic_state:
+            state_changes = {**self.optimistic_state[device_id], **state_changes}
         self.optimistic_state[device_id] = state_changes.copy()
         self.optimistic_timestamps[device_id] = time.time()
         logger.debug(f"Set optimistic state for device {device_id}: {state_changes}")
@@ -19,7 +19,6 @@
 import logging
 import sqlite3
 from typing import Dict, List, Any
-import asyncio
 from .api import TadoLocalAPI
 
 logger = logging.getLogger(__name__)
@@ -54,16 +53,76 @@ def normalize_device_type(tado_device_type: str) -> str:
 
 
 class TadoCloudSync:
-    """Syncs Tado Cloud API data to local database."""
+    """Syncs Tado Cloud API data to local database.
 
-    def __init__(self, db_path: str):
+    Zone and device syncs are delta-based: the incoming payload is diffed
+    against the in-memory catalog (the DeviceStateManager zone/device caches),
+    only changed rows are written (in a single transaction), and the caches are
+    patched in place. A sync with unchanged data performs no database writes.
+    """
+
+    # Zone / device columns owned by the cloud sync (compared when diffing)
+    ZONE_SYNC_FIELDS = ('name', 'zone_type', 'order_id')
+    DEVICE_ZONE_SYNC_FIELDS = ('tado_zone_id', 'zone_id', 'device_type', 'model', 'battery_state', 'firmware_version',
+                               'is_zone_leader', 'is_circuit_driver', 'is_zone_driver', 'duties')
+    DEVICE_LIST_SYNC_FIELDS = ('battery_state', 'firmware_version', 'device_type', 'tado_zone_id', 'model')
+
+    def __init__(self, db_path: str, state_manager=None):
         """
         Initialize sync manager.
 
         Args:
             db_path: Path to SQLite database
+            state_manager: Optional DeviceStateManager whose zone/device caches are
+                           used as the catalog to diff against (and patched in place).
+                           Without it, a catalog snapshot is read from the database.
         """
         self.db_path = db_path
+        self.state_manager = state_manager
+
+    def _get_catalog(self):
+        """
+        Get the zone and device catalog to diff incoming cloud data against.
+
+        Returns:
+            Tuple of (zone_cache, device_info_cache, device_id_cache) dicts in the
+            DeviceStateManager cache format.
+        """
+        if self.state_manager is not None:
+            return self.state_manager.zone_cache, self.state_manager.device_info_cache, self.state_manager.device_id_cache
+
+        zones = {}
+        devices = {}
+        serials = {}
+        conn = sqlite3.connect(self.db_path)
+        for zone_id, tado_home_id, tado_zone_id, name, zone_type, order_id, leader_device_id in conn.execute("""
+            SELECT zone_id, tado_home_id, tado_zone_id, name, zone_type, order_id, leader_device_id FROM zones
+        """):
+            zones[zone_id] = {
+                'zone_id': zone_id, 'tado_home_id': tado_home_id, 'tado_zone_id': tado_zone_id, 'name': name,
+                'zone_type': zone_type, 'order_id': order_id, 'leader_device_id': leader_device_id,
+            }
+        for row in conn.execute("""
+            SELECT device_id, serial_number, zone_id, tado_zone_id, device_type, model, battery_state,
+                   firmware_version, is_zone_leader, is_circuit_driver, is_zone_driver, duties
+            FROM devices
+        """):
+            (device_id, serial, zone_id, tado_zone_id, device_type, model, battery_state,
+             firmware, is_leader, is_circuit_driver, is_zone_driver, duties) = row
+            serials[serial] = device_id
+            devices[device_id] = {
+                'serial_number': serial, 'zone_id': zone_id, 'tado_zone_id': tado_zone_id,
+                'device_type': device_type, 'model': model, 'battery_state': battery_state,
+                'firmware_version': firmware, 'is_zone_leader': bool(is_leader),
+                'is_circuit_driver': bool(is_circuit_driver), 'is_zone_driver': bool(is_zone_driver), 'duties': duties,
+            }
+        conn.close()
+        return zones, devices, serials
+
+    @staticmethod
+    def _diff(current: Dict[str, Any], wanted: Dict[str, Any], fields) -> Dict[str, Any]:
+        """Return the subset of wanted fields whose value differs from current."""
+        return {f: wanted[f] for f in fields if f in wanted and current.get(f) != wanted[f]}
 
     def sync_home(self, home_data: Dict[str, Any]) -> bool:
         """
@@ -107,6 +166,9 @@ class TadoCloudSync:
         Maintains separate internal zone_id while tracking tado_zone_id for mapping.
         Preserves the zone order from the API (user-configured order in Tado app).
 
+        Only zones and devices whose data differs from the in-memory catalog are
+        written, all in one transaction; the catalog is patched in place afterwards.
+
         Args:
             zones_data: List of zone dicts from Tado Cloud API
             home_id: Tado home ID
@@ -115,8 +177,15 @@ class TadoCloudSync:
             True if successful
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            zone_cache, device_cache, serial_index = self._get_catalog()
+            zones_by_tado_id = {z.get('tado_zone_id'): zid for zid, z in zone_cache.items()
+                                if z.get('tado_home_id') == home_id}
+
+            zone_updates: Dict[int, Dict[str, Any]] = {}   # zone_id -> changed fields
+            zone_inserts: List[Dict[str, Any]] = []        # new zone rows (zone_id assigned on insert)
+            device_updates: Dict[int, Dict[str, Any]] = {}  # device_id -> changed fields
+            device_inserts: List[Dict[str, Any]] = []      # new device rows
+            leader_updates: Dict[Any, int] = {}            # zone_id (or pending zone row) -> leader serial
 
             synced_zones = 0
             synced_devices = 0
@@ -132,170 +201,231 @@ class TadoCloudSync:
                     logger.debug(f"Skipping hot water zone {zone_name} (Tado ID: {tado_zone_id})")
                     continue
 
-                # Check if zone already exists
-                cursor.execute("""
-                    SELECT zone_id FROM zones
-                    WHERE tado_home_id = ? AND tado_zone_id = ?
-                """, (home_id, tado_zone_id))
-                existing = cursor.fetchone()
-
-                if existing:
-                    # Update existing zone
-                    zone_id = existing[0]
-                    cursor.execute("""
-                        UPDATE zones
-                        SET name = ?, zone_type = ?, order_id = ?, updated_at = CURRENT_TIMESTAMP
-                        WHERE zone_id = ?
-                    """, (zone_name, zone_type, order_index, zone_id))
-                    logger.debug(f"Updated zone {zone_id}: {zone_name} (Tado ID: {tado_zone_id}, order: {order_index})")
+                wanted_zone = {'name': zone_name, 'zone_type': zone_type, 'order_id': order_index}
+                zone_id = zones_by_tado_id.get(tado_zone_id)
+                if zone_id is not None:
+                    changed = self._diff(zone_cache[zone_id], wanted_zone, self.ZONE_SYNC_FIELDS)
+                    if changed:
+                        zone_updates[zone_id] = changed
+                        logger.debug(f"Zone {zone_id} changed: {zone_name} (Tado ID: {tado_zone_id}): {changed}")
+                    zone_ref = zone_id
                 else:
-                    # Insert new zone with stable uuid
-                    import uuid as _uuid
-                    new_uuid = str(_uuid.uuid4())
-                    cursor.execute("""
-                        INSERT INTO zones
-                        (tado_zone_id, tado_home_id, name, zone_type, order_id, uuid, created_at, updated_at)
-                        VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-                    """, (tado_zone_id, home_id, zone_name, zone_type, order_index, new_uuid))
-                    zone_id = cursor.lastrowid
-                    logger.info(f"Created zone {zone_id}: {zone_name} (Tado ID: {tado_zone_id}, order: {order_index})")
+                    zone_ref = dict(wanted_zone, tado_zone_id=tado_zone_id, tado_home_id=home_id, zone_id=None,
+                                    ref_key=('new', len(zone_inserts)))
+                    zone_inserts.append(zone_ref)
 
                 synced_zones += 1
 
                 # Process devices in this zone
                 for device in zone.get('devices', []):
                     serial = device['serialNo']
-                    device_type = device['deviceType']
-                    firmware = device.get('currentFwVersion')
-                    battery_state = device.get('batteryState')
+                    raw_device_type = device['deviceType']
                     duties = device.get('duties', [])
 
                     # Parse duties
                     is_leader = 'ZONE_LEADER' in duties
-                    is_circuit_driver = 'CIRCUIT_DRIVER' in duties
-                    is_zone_driver = 'ZONE_DRIVER' in duties
-                    duties_str = ','.join(duties) if duties else None
-
-                    # Check if device exists
-                    cursor.execute("""
-                        SELECT device_id FROM devices WHERE serial_number = ?
-                    """, (serial,))
-                    existing_device = cursor.fetchone()
-
-                    if existing_device:
-                        # Update existing device - don't overwrite name (comes from HomeKit)
-                        device_id = existing_device[0]
-                        cursor.execute("""
-                            UPDATE devices
-                            SET tado_zone_id = ?, zone_id = ?, device_type = ?,
-                                battery_state = ?, firmware_version = ?,
-                                is_zone_leader = ?, is_circuit_driver = ?, is_zone_driver = ?,
-                                duties = ?, last_seen = CURRENT_TIMESTAMP
-                            WHERE device_id = ?
-                        """, (tado_zone_id, zone_id, device_type, battery_state,
-                              firmware, is_leader, is_circuit_driver, is_zone_driver,
-                              duties_str, device_id))
-                        logger.debug(f"Updated device {serial} in zone {zone_name}")
+                    wanted_device = {
+                        'tado_zone_id': tado_zone_id,
+                        'device_type': normalize_device_type(raw_device_type),
+                        'model': raw_device_type,
+                        'battery_state': device.get('batteryState'),
+                        'firmware_version': device.get('currentFwVersion'),
+                        'is_zone_leader': is_leader,
+                        'is_circuit_driver': 'CIRCUIT_DRIVER' in duties,
+                        'is_zone_driver': 'ZONE_DRIVER' in duties,
+                        'duties': ','.join(duties) if duties else None,
+                    }
+
+                    device_id = serial_index.get(serial)
+                    if device_id is not None and isinstance(zone_ref, int):
+                        wanted_device['zone_id'] = zone_ref
+                        changed = self._diff(device_cache.get(device_id, {}), wanted_device, self.DEVICE_ZONE_SYNC_FIELDS)
+                        if changed:
+                            device_updates[device_id] = changed
+                            logger.debug(f"Device {serial} in zone {zone_name} changed: {changed}")
+                    elif device_id is not None:
+                        # Existing device moved into a zone that is about to be created
+                        device_updates[device_id] = dict(wanted_device, zone_ref=zone_ref)
                     else:
-                        # Insert new device - use device type + serial as placeholder name
+                        # New device - use device type + serial as placeholder name
                         # (will be updated with proper name from HomeKit later)
-                        device_name = f"{device_type}_{serial[-6:]}"
-                        cursor.execute("""
-                            INSERT INTO devices
-                            (serial_number, tado_zone_id, zone_id, device_type, name,
-                             battery_state, firmware_version, is_zone_leader,
-                             is_circuit_driver, is_zone_driver, duties,
-                             first_seen, last_seen)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-                        """, (serial, tado_zone_id, zone_id, device_type, device_name,
-                              battery_state, firmware, is_leader, is_circuit_driver,
-                              is_zone_driver, duties_str))
-                        device_id = cursor.lastrowid
-                        logger.info(f"Created device {serial} ({device_type}) in zone {zone_name}")
+                        device_inserts.append(dict(wanted_device, serial_number=serial, zone_ref=zone_ref,
+                                                   name=f"{raw_device_type}_{serial[-6:]}"))
 
                     synced_devices += 1
 
-                    # Update zone leader if this device is the leader
-                    # Update zone leader if this device is the leader
                     if is_leader:
-                        try:
-                            cursor.execute("""
-                                UPDATE zones SET leader_device_id = ? WHERE zone_id = ?
-                            """, (device_id, zone_id))
-                            logger.debug(f"Set leader device {device_id} for zone {zone_name}")
-                        except Exception as e:
-                            logger.debug(f"Failed to set leader device for zone {zone_name}: {e}")
-
-                # Remove any zones from this home that are no longer present in cloud data
-                try:
-                    cloud_tado_ids = set(z['id'] for z in zones_data)
-                    cursor.execute("SELECT zone_id, tado_zone_id FROM zones WHERE tado_home_id = ?", (home_id,))
-                    for zone_id, tado_zone_id in cursor.fetchall():
-                        if tado_zone_id not in cloud_tado_ids:
-                            logger.info(f"Removing zone {zone_id} (Tado ID: {tado_zone_id}) - no longer present in cloud")
-                            cursor.execute("DELETE FROM zones WHERE zone_id = ?", (zone_id,))
-                except Exception as e:
-                    logger.debug(f"Error removing stale zones: {e}")
+                        ref_key = zone_ref if isinstance(zone_ref, int) else zone_ref['ref_key']
+                        leader_updates[ref_key] = serial
+
+            # Zones from this home that are no longer present in cloud data
+            cloud_tado_ids = set(z['id'] for z in zones_data)
+            removed_zones = [zid for tid, zid in zones_by_tado_id.items() if tid not in cloud_tado_ids]
+
+            # Leader changes are diffed once all device ids are known; a leader that is
+            # inserted by this sync has no id yet and is always written
+            pending_leaders = {}
+            for ref_key, serial in leader_updates.items():
+                if (isinstance(ref_key, int) and serial in serial_index
+                        and zone_cache.get(ref_key, {}).get('leader_device_id') == serial_index[serial]):
+                    continue
+                pending_leaders[ref_key] = serial
 
-            conn.commit()
-            conn.close()
+            if not (zone_updates or zone_inserts or device_updates or device_inserts or removed_zones or pending_leaders):
+                logger.info(f"Synced {synced_zones} zones and {synced_devices} device assignments from Tado Cloud (no changes)")
+                return True
+
+            self._apply_zone_changes((zone_cache, device_cache, serial_index), home_id, zone_updates, zone_inserts,
+                                     device_updates, device_inserts, removed_zones, pending_leaders)
 
-            logger.info(f"Synced {synced_zones} zones and {synced_devices} device assignments from Tado Cloud")
+            logger.info(f"Synced {synced_zones} zones and {synced_devices} device assignments from Tado Cloud "
+                        f"({len(zone_updates) + len(zone_inserts)} zone and {len(device_updates) + len(device_inserts)} "
+                        f"device rows written, {len(removed_zones)} zones removed)")
             return True
 
         except Exception as e:
             logger.error(f"Failed to sync zones: {e}", exc_info=True)
             return False
 
-    def sync_zone_states_data(self, zone_states_data: List[Dict[str, Any]], home_id: int, tado_api: TadoLocalAPI) -> bool:
+    def _apply_zone_changes(self, catalog, home_id, zone_updates, zone_inserts, device_updates, device_inserts,
+                            removed_zones, pending_leaders):
+        """Write the zone sync delta in a single transaction, then patch the catalog."""
+        import uuid as _uuid
+        zone_cache, device_cache, serial_index = catalog
+        new_serials: Dict[str, int] = {}
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                cursor = conn.cursor()
+
+                for zone_row in zone_inserts:
+                    # Insert new zone with stable uuid
+                    zone_row['uuid'] = str(_uuid.uuid4())
+                    cursor.execute("""
+                        INSERT INTO zones
+                        (tado_zone_id, tado_home_id, name, zone_type, order_id, uuid, created_at, updated_at)
+                        VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                    """, (zone_row['tado_zone_id'], home_id, zone_row['name'], zone_row['zone_type'],
+                          zone_row['order_id'], zone_row['uuid']))
+                    zone_row['zone_id'] = cursor.lastrowid
+                    logger.info(f"Created zone {zone_row['zone_id']}: {zone_row['name']} "
+                                f"(Tado ID: {zone_row['tado_zone_id']}, order: {zone_row['order_id']})")
+
+                for zone_id, changed in zone_updates.items():
+                    assignments = ', '.join(f"{col} = ?" for col in changed)
+                    cursor.execute(f"UPDATE zones SET {assignments}, updated_at = CURRENT_TIMESTAMP WHERE zone_id = ?",
+                                   (*changed.values(), zone_id))
+
+                for device_id, changed in device_updates.items():
+                    zone_ref = changed.pop('zone_ref', None)
+                    if zone_ref is not None:
+                        changed['zone_id'] = zone_ref['zone_id']
+                    assignments = ', '.join(f"{col} = ?" for col in changed)
+                    cursor.execute(f"UPDATE devices SET {assignments}, last_seen = CURRENT_TIMESTAMP WHERE device_id = ?",
+                                   (*changed.values(), device_id))
+
+                for device_row in device_inserts:
+                    zone_ref = device_row.pop('zone_ref')
+                    device_row['zone_id'] = zone_ref if isinstance(zone_ref, int) else zone_ref['zone_id']
+                    cursor.execute("""
+                        INSERT INTO devices
+                        (serial_number, tado_zone_id, zone_id, device_type, model, name,
+                         battery_state, firmware_version, is_zone_leader,
+                         is_circuit_driver, is_zone_driver, duties,
+                         first_seen, last_seen)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                    """, (device_row['serial_number'], device_row['tado_zone_id'], device_row['zone_id'],
+                          device_row['device_type'], device_row['model'], device_row['name'],
+                          device_row['battery_state'], device_row['firmware_version'], device_row['is_zone_leader'],
+                          device_row['is_circuit_driver'], device_row['is_zone_driver'], device_row['duties']))
+                    device_row['device_id'] = cursor.lastrowid
+                    new_serials[device_row['serial_number']] = device_row['device_id']
+                    logger.info(f"Created device {device_row['serial_number']} ({device_row['model']}) in zone {device_row['zone_id']}")
+
+                zone_by_ref = {z['ref_key']: z['zone_id'] for z in zone_inserts}
+                resolved_leaders = {}
+                for ref_key, serial in pending_leaders.items():
+                    zone_id = zone_by_ref.get(ref_key, ref_key)
+                    device_id = serial_index.get(serial, new_serials.get(serial))
+                    cursor.execute("UPDATE zones SET leader_device_id = ? WHERE zone_id = ?", (device_id, zone_id))
+                    resolved_leaders[zone_id] = device_id
+
+                for zone_id in removed_zones:
+                    logger.info(f"Removing zone {zone_id} (Tado ID: {zone_cache[zone_id].get('tado_zone_id')}) - no longer present in cloud")
+                    cursor.execute("DELETE FROM zones WHERE zone_id = ?", (zone_id,))
+        finally:
+            conn.close()
+
+        # Patch the in-memory catalog to match what was just written
+        for zone_row in zone_inserts:
+            zone_cache[zone_row['zone_id']] = {
+                'zone_id': zone_row['zone_id'],
+                'name': zone_row['name'],
+                'leader_device_id': None,
+                'order_id': zone_row['order_id'],
+                'tado_zone_id': zone_row['tado_zone_id'],
+                'uuid': zone_row['uuid'],
+                'tado_home_id': home_id,
+                'zone_type': zone_row['zone_type'],
+            }
+        for zone_id, changed in zone_updates.items():
+            zone_cache[zone_id].update(changed)
+        for device_id, changed in device_updates.items():
+            device_cache.setdefault(device_id, {}).update(changed)
+        for device_row in device_inserts:
+            serial_index[device_row['serial_number']] = device_row['device_id']
+            device_cache[device_row['device_id']] = {
+                'serial_number': device_row['serial_number'],
+                'aid': None,
+                'name': device_row['name'],
+                **{f: device_row[f] for f in self.DEVICE_ZONE_SYNC_FIELDS},
+            }
+        for zone_id, device_id in resolved_leaders.items():
+            if zone_id in zone_cache:
+                zone_cache[zone_id]['leader_device_id'] = device_id
+        for zone_id in removed_zones:
+            zone_cache.pop(zone_id, None)
+
+        if self.state_manager is not None:
+            self.state_manager.relink_catalog()
+
+    async def sync_zone_states_data(self, zone_states_data: Dict[str, Any], home_id: int, tado_api: TadoLocalAPI) -> bool:
         """
         Sync zone states from Tado Cloud API to update humidity.
 
         The zoneStates_data endpoint provides additional device information including
         link status, schedule information, geolocation that may not be available via HomeKit.
+        Devices are resolved from the in-memory tado_zone_id index and all values are
+        applied as a single batch, so each zone is broadcast at most once.
 
         Args:
             zone_states_data: Zone state response from Tado Cloud API
             home_id: Tado home ID
-            tado_api: TadoLocalAPI instance to retrieve iids and handle events
+            tado_api: TadoLocalAPI instance to apply the state batch
 
         Returns:
             True if successful
         """
-       
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            updates = []
 
-            humidity_updates = 0
-            
             zones = zone_states_data.get('zoneStates', {})
             for zone_id, zone_state in zones.items():
                 settings = zone_state.get('setting', {})
 
                 if not settings or settings.get('type') == 'HOT_WATER':
                     continue  # Do not process HOT_WATER zones for now
-            
-                sensoDataPoints = zone_state.get('sensorDataPoints', {})
-                humidity = str(sensoDataPoints.get('humidity', {}).get('percentage'))
-                
-                if humidity != "None":
-                    logger.debug(f"Get all aids for zone: {zone_id}")
-                    # Get all devices of this zone to generate update humidity
-                    cursor.execute(f"SELECT aid FROM devices WHERE tado_zone_id = '{zone_id}'")
-
-                    for device in cursor.fetchall():
-                        # Get iid for this specific device(may be multiple devices in one zone with different iids)
-                        iid = tado_api.get_iid_from_characteristics(device[0], "CurrentRelativeHumidity") if device else None
-
-                        if device and iid:
-                            # Create an update event for humidity
-                            asyncio.create_task(tado_api.handle_change(device[0], iid, {'value': humidity}, source="POLLING"))
-                            logger.debug(f"Humidity change, generate event: ({device[0]}, {iid}) >> value = {humidity}")
-                            humidity_updates += 1
 
-            conn.commit()
-            conn.close()
+                sensor_data_points = zone_state.get('sensorDataPoints', {})
+                humidity = sensor_data_points.get('humidity', {}).get('percentage')
+                if humidity is None:
+                    continue
+
+                for device_id in tado_api.state_manager.get_devices_by_tado_zone(zone_id):
+                    updates.append((device_id, 'CurrentRelativeHumidity', float(humidity)))
+
+            humidity_updates = await tado_api.apply_state_batch(updates, source="CLOUD")
 
             logger.info(f"Updated {humidity_updates} devices from zone states data")
             return True
@@ -309,7 +439,8 @@ class TadoCloudSync:
         Sync device list from Tado Cloud API to update battery states and metadata.
 
         The deviceList endpoint provides additional device information including
-        battery states that may not be available via HomeKit.
+        battery states that may not be available via HomeKit. Only devices whose
+        data differs from the in-memory catalog are written.
 
         Args:
             device_list_data: Device list response from Tado Cloud API
@@ -319,10 +450,9 @@ class TadoCloudSync:
             True if successful
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            updated_count = 0
+            _, device_cache, serial_index = self._get_catalog()
+            device_updates: Dict[int, Dict[str, Any]] = {}
+            seen_count = 0
 
             entries = device_list_data.get('entries', [])
             for entry in entries:
@@ -334,37 +464,44 @@ class TadoCloudSync:
                 if not serial:
                     continue
 
-                battery_state = device.get('batteryState')
-                firmware = device.get('currentFwVersion')
                 raw_device_type = device.get('deviceType')
-                device_type = normalize_device_type(raw_device_type) if raw_device_type else None
                 zone_info = entry.get('zone', {})
-                tado_zone_id = zone_info.get('discriminator')
-
-                # Check if device exists
-                cursor.execute("""
-                    SELECT device_id FROM devices WHERE serial_number = ?
-                """, (serial,))
-                existing = cursor.fetchone()
-
-                if existing:
-                    # Update existing device
-                    cursor.execute("""
-                        UPDATE devices
-                        SET battery_state = ?, firmware_version = ?,
-                            device_type = ?, tado_zone_id = ?, model = ?,
-                            last_seen = CURRENT_TIMESTAMP
-                        WHERE serial_number = ?
-                    """, (battery_state, firmware, device_type, tado_zone_id, raw_device_type, serial))
-                    updated_count += 1
-                else:
+                wanted = {
+                    'battery_state': device.get('batteryState'),
+                    'firmware_version': device.get('currentFwVersion'),
+                    'device_type': normalize_device_type(raw_device_type) if raw_device_type else None,
+                    'tado_zone_id': zone_info.get('discriminator'),
+                    'model': raw_device_type,
+                }
+
+                device_id = serial_index.get(serial)
+                if device_id is None:
                     # Device not yet in database - will be added during zone sync
                     logger.debug(f"Device {serial} not in database yet (will be added during zone sync)")
+                    continue
 
-            conn.commit()
-            conn.close()
+                seen_count += 1
+                changed = self._diff(device_cache.get(device_id, {}), wanted, self.DEVICE_LIST_SYNC_FIELDS)
+                if changed:
+                    device_updates[device_id] = changed
 
-            logger.info(f"Updated {updated_count} devices from device list")
+            if device_updates:
+                conn = sqlite3.connect(self.db_path)
+                try:
+                    with conn:
+                        for device_id, changed in device_updates.items():
+                            assignments = ', '.join(f"{col} = ?" for col in changed)
+                            conn.execute(f"UPDATE devices SET {assignments}, last_seen = CURRENT_TIMESTAMP WHERE device_id = ?",
+                                         (*changed.values(), device_id))
+                finally:
+                    conn.close()
+
+                for device_id, changed in device_updates.items():
+                    device_cache.setdefault(device_id, {}).update(changed)
+                if self.state_manager is not None:
+                    self.state_manager.relink_catalog()
+
+            logger.info(f"Updated {len(device_updates)} of {seen_count} devices from device list")
             return True
 
         except Exception as e:
@@ -467,7 +604,7 @@ class TadoCloudSync:
 
         # 4. Sync zone_states_data (if provided, no fetching)
         if zone_states_data is not None:
-            if not self.sync_zone_states_data(zone_states_data=zone_states_data, home_id=home_id, tado_api=cloud_api.tado_api):
+            if not await self.sync_zone_states_data(zone_states_data=zone_states_data, home_id=home_id, tado_api=cloud_api.tado_api):
                 success = False
             else:
                 synced_any = True
@@ -0,0 +1,331 @@
+#
+# Copyright 2025 The TadoLocal and AmpScm contributors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Lightweight request tracing with optional OpenTelemetry export.
+
+Spans are opened with ``tracing.span(name, **attributes)`` around route handlers,
+SQLite access, HAP operations, cloud fetches and SSE broadcasts. Parent/child
+relations follow the asyncio task context (contextvars), so a route handler and
+everything it awaits share one trace.
+
+Tracing is off by default and ``span()`` then returns a shared no-op context.
+``configure()`` selects the exporter:
+
+- ``console``: one JSON line per finished span on stderr
+- ``file``: JSON lines appended to a file
+- ``otlp``: spans are created with the OpenTelemetry SDK and sent with its OTLP
+  exporter (configured through the standard ``OTEL_EXPORTER_OTLP_*`` variables).
+  Requires ``opentelemetry-sdk`` and ``opentelemetry-exporter-otlp-proto-http``.
+
+HAP writes are echoed back by the bridge as events that arrive outside the
+request. ``expect_echo()``/``resume_echo()`` carry the writing span's context over
+to the event handler so the echo shows up in the same trace.
+"""
+
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import secrets
+import sys
+import time
+from typing import Any, Dict, Hashable, Optional, TextIO
+
+logger = logging.getLogger(__name__)
+
+# How long a write waits for its echoed event to join the trace
+ECHO_TTL = 30.0
+
+
+class Span:
+    """A finished or in-progress span of the built-in tracer."""
+
+    __slots__ = ('name', 'trace_id', 'span_id', 'parent_id', 'start', 'duration', 'attributes', 'error', '_started')
+
+    def __init__(self, name: str, parent: Optional['Span'], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.start = time.time()
+        self.duration: Optional[float] = None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        self._started = time.perf_counter()
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def update_name(self, name: str):
+        self.name = name
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start': self.start,
+            'duration_ms': round(self.duration * 1000, 3) if self.duration is not None else None,
+            'status': 'error' if self.error else 'ok',
+            'error': self.error,
+            'attributes': self.attributes,
+        }
+
+
+class _NoopSpan:
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def update_name(self, name: str):
+        pass
+
+
+_NOOP = contextlib.nullcontext(_NoopSpan())
+
+_current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar('tado_local_span', default=None)
+_exporter: Optional['JsonLinesExporter'] = None
+_otel_tracer = None
+_otel_provider = None
+_pending_echo: Dict[Hashable, tuple] = {}
+
+
+class JsonLinesExporter:
+    """Writes each finished span as one JSON line."""
+
+    def __init__(self, stream: TextIO, close_stream: bool = False):
+        self.stream = stream
+        self.close_stream = close_stream
+
+    def export(self, span: Span):
+        try:
+            self.stream.write(json.dumps(span.to_dict(), default=str) + "\n")
+            self.stream.flush()
+        except Exception as e:
+            logger.debug(f"Failed to export span {span.name}: {e}")
+
+    def shutdown(self):
+        if self.close_stream:
+            self.stream.close()
+
+
+@contextlib.contextmanager
+def _builtin_span(name: str, parent: Optional[Span], attributes: Dict[str, Any]):
+    span = Span(name, parent if parent is not None else _current.get(), attributes)
+    token = _current.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        span.duration = time.perf_counter() - span._started
+        _current.reset(token)
+        if _exporter:
+            _exporter.export(span)
+
+
+def enabled() -> bool:
+    """True when spans are being recorded."""
+    return _exporter is not None or _otel_tracer is not None
+
+
+def span(name: str, parent: Any = None, **attributes):
+    """Open a span as a context manager (usable in sync and async code).
+
+    Args:
+        name: Span name, e.g. 'homekit.put_characteristics'
+        parent: Explicit parent context from current_context()/resume_echo();
+                defaults to the span active in the current task
+        **attributes: Span attributes (None values are dropped)
+
+    Returns:
+        Context manager yielding an object with set_attribute()/update_name()
+    """
+    if _exporter is None and _otel_tracer is None:
+        return _NOOP
+    attributes = {k: v for k, v in attributes.items() if v is not None}
+    if _otel_tracer is not None:
+        return _otel_tracer.start_as_current_span(name, context=parent, attributes=attributes)
+    return _builtin_span(name, parent, attributes)
+
+
+def current_context() -> Any:
+    """Opaque handle to the active span, usable as ``parent=`` later."""
+    if _otel_tracer is not None:
+        from opentelemetry import context as otel_context
+        return otel_context.get_current()
+    return _current.get()
+
+
+def current_ids() -> Optional[tuple]:
+    """(trace_id, span_id) of the active span as hex strings, or None."""
+    if _otel_tracer is not None:
+        from opentelemetry import trace as otel_trace
+        ctx = otel_trace.get_current_span().get_span_context()
+        if not ctx.is_valid:
+            return None
+        return format(ctx.trace_id, '032x'), format(ctx.span_id, '016x')
+    current = _current.get()
+    if current is None:
+        return None
+    return current.trace_id, current.span_id
+
+
+def expect_echo(key: Hashable):
+    """Remember the active span so the event echoing a write can join its trace."""
+    if not enabled():
+        return
+    context = current_context()
+    if context is None:
+        return
+    now = time.monotonic()
+    if len(_pending_echo) > 256:
+        for stale in [k for k, (_, deadline) in _pending_echo.items() if deadline < now]:
+            del _pending_echo[stale]
+    _pending_echo[key] = (context, now + ECHO_TTL)
+
+
+def resume_echo(key: Hashable) -> Any:
+    """Return the context stored by expect_echo() for this key, if still fresh."""
+    if not _pending_echo:
+        return None
+    entry = _pending_echo.pop(key, None)
+    if entry is None or entry[1] < time.monotonic():
+        return None
+    return entry[0]
+
+
+class TraceLogFormatter(logging.Formatter):
+    """Wraps a formatter and appends the active trace/span id to each line."""
+
+    def __init__(self, inner: Optional[logging.Formatter]):
+        super().__init__()
+        self.inner = inner or logging.Formatter()
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = self.inner.format(record)
+        ids = current_ids()
+        if ids:
+            message += f" trace_id={ids[0]} span_id={ids[1]}"
+        return message
+
+
+def install_log_correlation():
+    """Append trace ids to every line written by the root logger's handlers."""
+    for handler in logging.getLogger().handlers:
+        if not isinstance(handler.formatter, TraceLogFormatter):
+            handler.setFormatter(TraceLogFormatter(handler.formatter))
+
+
+def _configure_otlp() -> bool:
+    global _otel_tracer, _otel_provider
+    try:
+        from opentelemetry import trace as otel_trace
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    except ImportError as e:
+        logger.warning(f"OTLP trace export needs opentelemetry-sdk and opentelemetry-exporter-otlp-proto-http ({e})")
+        return False
+
+    from .__version__ import __version__
+    _otel_provider = TracerProvider(resource=Resource.create({
+        'service.name': os.environ.get('OTEL_SERVICE_NAME', 'tado-local'),
+        'service.version': __version__,
+    }))
+    _otel_provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    otel_trace.set_tracer_provider(_otel_provider)
+    _otel_tracer = _otel_provider.get_tracer('tado_local', __version__)
+    return True
+
+
+def configure(exporter: str, path: Optional[str] = None):
+    """Enable tracing.
+
+    Args:
+        exporter: 'console', 'file' or 'otlp' ('otlp' falls back to console
+                  output when the OpenTelemetry SDK is not installed)
+        path: Output file for the 'file' exporter
+    """
+    global _exporter
+    shutdown()
+
+    if exporter == 'otlp':
+        if _configure_otlp():
+            logger.info("Tracing enabled (OTLP export)")
+            return
+        logger.warning("Falling back to console span output")
+        exporter = 'console'
+
+    if exporter == 'file':
+        if not path:
+            raise ValueError("The file trace exporter needs a path")
+        _exporter = JsonLinesExporter(open(os.path.expanduser(path), 'a', encoding='utf-8'), close_stream=True)
+        logger.info(f"Tracing enabled (spans written to {path})")
+    elif exporter == 'console':
+        _exporter = JsonLinesExporter(sys.stderr)
+        logger.info("Tracing enabled (spans written to stderr)")
+    else:
+        raise ValueError(f"Unknown trace exporter: {exporter}")
+
+
+def shutdown():
+    """Flush and disable tracing."""
+    global _exporter, _otel_tracer, _otel_provider
+    if _exporter:
+        _exporter.shutdown()
+    if _otel_provider:
+        _otel_provider.shutdown()
+    _exporter = None
+    _otel_tracer = None
+    _otel_provider = None
+    _pending_echo.clear()
+
+
+class TracingMiddleware:
+    """ASGI middleware opening one span per HTTP request.
+
+    The span is renamed to the matched route template (e.g. 'POST /zones/{zone_id}/set')
+    and the trace id is returned in the X-Trace-Id response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not enabled():
+            await self.app(scope, receive, send)
+            return
+
+        method = scope['method']
+        with span(f"{method} {scope['path']}", **{'http.method': method, 'http.target': scope['path']}) as request_span:
+            async def send_with_trace_id(message):
+                if message['type'] == 'http.response.start':
+                    request_span.set_attribute('http.status_code', message['status'])
+                    ids = current_ids()
+                    if ids:
+                        message['headers'] = list(message.get('headers', [])) + [(b'x-trace-id', ids[0].encode())]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_trace_id)
+            finally:
+                route = scope.get('route')
+                if route is not None and hasattr(route, 'path'):
+                    request_span.update_name(f"{method} {route.path}")
@@ -0,0 +1,218 @@
+#
+# Copyright 2025 The TadoLocal and AmpScm contributors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Watchdog that detects silently lost HomeKit events.
+
+Once the event subscription succeeds, polling is switched off. If the bridge then
+stops pushing events (for example after a network blip it does not report), state
+would go stale without anyone noticing. The watchdog checks for that:
+
+- Every ``interval`` seconds it reads one characteristic from each of the
+  accessories confirmed longest ago. All reads go in a single request.
+- If a value differs from the last known value and no event for that accessory
+  just arrived, an event was missed. The watchdog then re-subscribes to events
+  and polls all characteristics of that accessory on each check. This stops once
+  events arrive for the accessory again, or after ``targeted_poll_for`` seconds.
+
+Values read by the watchdog go through the normal change handler (source
+``WATCHDOG``). Each successful read also refreshes the accessory's
+last-confirmed time, which is what the per-device staleness in the API is based on.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from . import metrics, tracing
+from .state import DeviceStateManager
+
+if TYPE_CHECKING:
+    from .api import TadoLocalAPI
+
+logger = logging.getLogger(__name__)
+
+# Characteristics preferred for verification reads (they change most often)
+_VERIFY_PREFERENCE = (
+    DeviceStateManager.CHAR_CURRENT_TEMPERATURE,
+    DeviceStateManager.CHAR_CURRENT_HUMIDITY,
+    DeviceStateManager.CHAR_VALVE_POSITION,
+    DeviceStateManager.CHAR_TARGET_TEMPERATURE,
+)
+
+
+class EventWatchdog:
+    """Verifies that the event stream still matches the bridge's state."""
+
+    def __init__(self, tado_api: 'TadoLocalAPI', interval: float = 60.0, sample_size: int = 5,
+                 event_grace: float = 5.0, targeted_poll_for: float = 600.0):
+        """
+        Args:
+            tado_api: API whose pairing, change tracker and recency data are checked
+            interval: Seconds between checks
+            sample_size: Minimum accessories verified per check (raised so every
+                         accessory is verified within half the stale threshold)
+            event_grace: Skip accessories that sent an event this recently
+            targeted_poll_for: Seconds to poll an accessory after a missed event
+        """
+        self.tado_api = tado_api
+        self.interval = interval
+        self.event_grace = event_grace
+        self.targeted_poll_for = targeted_poll_for
+
+        self.checks = 0
+        self.verifications = 0
+        self.divergences = 0
+        self.resubscriptions = 0
+        self.errors = 0
+        self.last_check: Optional[float] = None
+        self.targeted: Dict[int, Tuple[float, float]] = {}  # aid -> (since, until)
+        self.min_sample_size = sample_size
+        self.verify_chars: Dict[int, Tuple[int, int]] = {}
+        self.accessory_chars: Dict[int, List[Tuple[int, int]]] = {}
+        self.sample_size = sample_size
+        self.rebuild()
+
+    def rebuild(self):
+        """Pick the verification reads from the current subscriptions.
+
+        Called again when the accessory configuration (c#) changes, since iids may
+        have been added or renumbered. Targeted polling is reset.
+        """
+        tado_api = self.tado_api
+        subscribed = set(tado_api.subscribed_characteristics)
+        rank = {char_type: i for i, char_type in enumerate(_VERIFY_PREFERENCE)}
+        verify_chars: Dict[int, Tuple[int, int]] = {}
+        accessory_chars: Dict[int, List[Tuple[int, int]]] = {}
+
+        # One representative characteristic per accessory for verification reads
+        for char_list in tado_api.device_to_characteristics.values():
+            candidates = [(aid, iid, char_type) for aid, iid, char_type in char_list if (aid, iid) in subscribed]
+            if not candidates:
+                continue
+            aid = candidates[0][0]
+            accessory_chars[aid] = [(aid, iid) for aid, iid, _ in candidates]
+            best = min(candidates, key=lambda c: rank.get(c[2], len(rank)))
+            verify_chars[aid] = (best[0], best[1])
+
+        self.verify_chars = verify_chars
+        self.accessory_chars = accessory_chars
+        self.targeted = {}
+        stale_after = tado_api.STALE_AFTER
+        per_check = math.ceil(len(verify_chars) * self.interval / (stale_after / 2)) if stale_after else 0
+        self.sample_size = max(self.min_sample_size, per_check)
+
+    async def run(self):
+        """Check periodically until the API shuts down."""
+        logger.info(f"Event watchdog started ({len(self.verify_chars)} accessories, "
+                    f"{self.sample_size} verified every {self.interval:.0f}s)")
+        while not self.tado_api.is_shutting_down:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check_once()
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Event watchdog check failed: {e}")
+
+    def _select(self, now: float) -> List[Tuple[int, int]]:
+        last_seen = self.tado_api.accessory_last_seen
+        last_event = self.tado_api.accessory_last_event
+
+        # Targeted polling ends when events come back for the accessory or the period expires
+        for aid, (since, until) in list(self.targeted.items()):
+            if last_event.get(aid, 0) > since or now > until:
+                del self.targeted[aid]
+                logger.info(f"Stopped targeted polling for accessory {aid}")
+
+        keys = [key for aid in self.targeted for key in self.accessory_chars.get(aid, [])]
+        candidates = [aid for aid in self.verify_chars
+                      if aid not in self.targeted and now - last_event.get(aid, 0) >= self.event_grace]
+        candidates.sort(key=lambda aid: last_seen.get(aid, 0))
+        keys.extend(self.verify_chars[aid] for aid in candidates[:self.sample_size])
+        return keys
+
+    async def check_once(self) -> List[int]:
+        """Run one verification round.
+
+        Returns:
+            Accessory ids for which a missed event was detected
+        """
+        tado_api = self.tado_api
+        if not tado_api.pairing:
+            return []
+
+        now = time.time()
+        keys = self._select(now)
+        self.checks += 1
+        self.last_check = now
+        if not keys:
+            return []
+
+        with tracing.span('homekit.get_characteristics', count=len(keys), source='watchdog'), \
+                metrics.HOMEKIT_REQUEST_SECONDS.labels('get_characteristics').time():
+            try:
+                results = await tado_api.pairing.get_characteristics(keys)
+            except Exception:
+                metrics.HOMEKIT_REQUEST_ERRORS.labels('get_characteristics').inc()
+                raise
+
+        diverged = []
+        last_values = tado_api.change_tracker['last_values']
+        for aid, iid in keys:
+            value = results.get((aid, iid), {}).get('value')
+            if value is None:
+                continue
+            self.verifications += 1
+            known = last_values.get((aid, iid))
+            if known is not None and known != value and aid not in self.targeted and aid not in diverged:
+                diverged.append(aid)
+            await tado_api.handle_change(aid, iid, {'value': value}, source="WATCHDOG")
+
+        if diverged:
+            self.divergences += len(diverged)
+            logger.warning(f"Missed events detected for accessories {diverged}; re-subscribing and polling them")
+            for aid in diverged:
+                self.targeted[aid] = (now, now + self.targeted_poll_for)
+            await self._resubscribe()
+
+        return diverged
+
+    async def _resubscribe(self):
+        tado_api = self.tado_api
+        if not tado_api.subscribed_characteristics:
+            return
+        try:
+            await tado_api.pairing.subscribe(tado_api.subscribed_characteristics)
+            self.resubscriptions += 1
+            logger.info(f"Re-subscribed to {len(tado_api.subscribed_characteristics)} event characteristics")
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Event re-subscription failed: {e}")
+
+    def summary(self) -> Dict[str, Any]:
+        """Counters for /status."""
+        return {
+            'interval_seconds': self.interval,
+            'sample_size': self.sample_size,
+            'last_check': self.last_check,
+            'checks': self.checks,
+            'verifications': self.verifications,
+            'divergences': self.divergences,
+            'resubscriptions': self.resubscriptions,
+            'errors': self.errors,
+            'targeted_polling': sorted(self.targeted),
+        }
@@ -0,0 +1,259 @@
+#
+# Copyright 2025 The TadoLocal and AmpScm contributors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""WebSocket sessions: events, state snapshots and commands over one connection.
+
+Clients send requests and get responses carrying the same ``id``::
+
+    -> {"id": 1, "op": "subscribe", "types": ["zone"], "snapshot": true}
+    <- {"id": 1, "ok": true, "result": {"types": ["zone"], "snapshot": {...}}}
+    -> {"id": 2, "op": "set_zone", "zone_id": 3, "temperature": 21}
+    <- {"id": 2, "ok": true, "result": {...same as POST /zones/3/set...}}
+    -> {"id": 3, "op": "set_zone", "zone_id": 99}
+    <- {"id": 3, "ok": false, "error": {"status": 404, "detail": "Zone 99 not found"}}
+
+Events are sent as they are on ``/events`` (objects with a ``type`` and no ``id``),
+filtered by the subscribed types. Subscribing with ``"format": "delta"`` selects the
+delta-encoded stream; the result then includes its current keyframes. Built-in operations are ``subscribe``,
+``unsubscribe``, ``snapshot`` and ``ping``; others are supplied by the caller.
+
+Frames are JSON text. Binary frames are MessagePack (requires the optional
+``msgpack`` package); a request sent as binary gets a binary response, and sessions
+opened in binary mode also receive events as MessagePack.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Optional, Set
+
+from . import metrics
+
+if TYPE_CHECKING:
+    from .api import TadoLocalAPI
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPES = ('zone', 'device', 'freshness', 'keepalive')
+
+# msgpack is optional and imported on first use (see _load_msgpack)
+msgpack = None
+
+
+def _load_msgpack():
+    """Import msgpack on first use.
+
+    Returns:
+        The msgpack module, or None if it is not installed
+    """
+    global msgpack
+    if msgpack is None:
+        try:
+            import msgpack as _msgpack
+        except ImportError:
+            return None
+        msgpack = _msgpack
+    return msgpack
+
+
+class CommandError(Exception):
+    """A request failed; reported to the client with an HTTP-like status."""
+
+    def __init__(self, status: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status
+        self.detail = detail
+
+
+class WebSocketSession:
+    """One WebSocket connection: a receive loop for requests and a send loop for events."""
+
+    def __init__(self, websocket, tado_api: 'TadoLocalAPI',
+                 commands: Optional[Dict[str, Callable[[Dict[str, Any]], Awaitable[Any]]]] = None,
+                 binary: bool = False, keepalive: float = 90.0):
+        """
+        Args:
+            websocket: Accepted Starlette/FastAPI WebSocket
+            tado_api: API whose events and state are served
+            commands: Extra operations, op name -> coroutine taking the request dict.
+                      Exceptions with a `status_code` (HTTPException, CommandError) are
+                      reported with that status, ValueError as 400, others as 500.
+            binary: Send events as MessagePack binary frames instead of JSON text
+            keepalive: Seconds without traffic after which a keepalive event is sent
+        """
+        if binary and _load_msgpack() is None:
+            raise CommandError(400, "MessagePack requires the 'msgpack' package")
+        self.websocket = websocket
+        self.tado_api = tado_api
+        self.commands = commands or {}
+        self.binary = binary
+        self.keepalive = keepalive
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.types: Set[str] = set()
+        self.subscribed = False
+        self.delta = False
+        self.delta_seq: Dict[str, int] = {}  # Per type: delta events up to this seq are covered by the keyframes
+        self.send_lock = asyncio.Lock()
+        self.tasks: Set[asyncio.Task] = set()
+
+    async def run(self):
+        """Serve the connection until the client disconnects or the API shuts down."""
+        # Registered for the whole session so shutdown reaches it; events are only sent once subscribed
+        self.tado_api.ws_listeners.append(self.queue)
+        sender = asyncio.create_task(self._send_events())
+        metrics.WS_CLIENTS.inc()
+        try:
+            while True:
+                message = await self.websocket.receive()
+                if message.get('type') == 'websocket.disconnect':
+                    break
+                if message.get('bytes') is not None:
+                    task = asyncio.create_task(self._handle_frame(message['bytes'], binary=True))
+                else:
+                    task = asyncio.create_task(self._handle_frame(message.get('text') or '', binary=False))
+                # Commands run concurrently; keep a reference until they finish
+                self.tasks.add(task)
+                task.add_done_callback(self.tasks.discard)
+                if sender.done():
+                    break
+        finally:
+            metrics.WS_CLIENTS.dec()
+            if self.queue in self.tado_api.ws_listeners:
+                self.tado_api.ws_listeners.remove(self.queue)
+            sender.cancel()
+            for task in list(self.tasks):
+                task.cancel()
+            await asyncio.gather(sender, *self.tasks, return_exceptions=True)
+
+    async def _handle_frame(self, data, binary: bool):
+        request_id = None
+        op = 'invalid'
+        try:
+            if binary:
+                if _load_msgpack() is None:
+                    raise CommandError(400, "MessagePack requires the 'msgpack' package")
+                request = msgpack.unpackb(data)
+            else:
+                request = json.loads(data)
+            if not isinstance(request, dict):
+                raise CommandError(400, "Request must be an object")
+            request_id = request.get('id')
+            op = str(request.get('op', ''))
+            result = await self._dispatch(op, request)
+            response = {'id': request_id, 'ok': True, 'result': result}
+            outcome = 'ok'
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if isinstance(e, ValueError) and not hasattr(e, 'status_code'):
+                status, detail = 400, str(e)  # Includes JSON decode errors
+            else:
+                status, detail = getattr(e, 'status_code', 500), getattr(e, 'detail', str(e))
+            if status >= 500:
+                logger.error(f"WebSocket command {op} failed: {e}")
+            response = {'id': request_id, 'ok': False, 'error': {'status': status, 'detail': detail}}
+            outcome = 'error'
+        metrics.WS_COMMANDS.labels(op if op in self._known_ops() else 'unknown', outcome).inc()
+        # Without msgpack a binary request can only be answered (with the error) as text
+        await self._send(response, binary=binary and msgpack is not None)
+
+    def _known_ops(self) -> Set[str]:
+        return {'subscribe', 'unsubscribe', 'snapshot', 'ping'} | set(self.commands)
+
+    async def _dispatch(self, op: str, request: Dict[str, Any]) -> Any:
+        if op == 'ping':
+            return 'pong'
+        if op == 'subscribe':
+            types = request.get('types') or []
+            if isinstance(types, str):
+                types = types.split(',')
+            self.types = {str(t).strip().lower() for t in types if str(t).strip()}
+            self.subscribed = True
+            self.delta = request.get('format') == 'delta'
+            result = {'types': sorted(self.types) or list(EVENT_TYPES)}
+            if self.delta:
+                encoder = self.tado_api.delta_encoder
+                self.delta_seq = dict(encoder.seq)
+                result['keyframes'] = [event for event in encoder.snapshot()
+                                       if not self.types or event['type'] in self.types]
+            if request.get('snapshot'):
+                result['snapshot'] = self.snapshot(self.types)
+            return result
+        if op == 'unsubscribe':
+            self.subscribed = False
+            return {'subscribed': False}
+        if op == 'snapshot':
+            types = request.get('types') or []
+            return self.snapshot({str(t).lower() for t in types})
+        handler = self.commands.get(op)
+        if handler is None:
+            raise CommandError(400, f"Unknown op {op!r}")
+        return await handler(request)
+
+    def snapshot(self, types: Set[str]) -> Dict[str, Any]:
+        """Current zone and device states, in the same shape as the events."""
+        tado_api = self.tado_api
+        state_manager = tado_api.state_manager
+        snapshot: Dict[str, Any] = {}
+        if not types or 'zone' in types:
+            snapshot['zones'] = []
+            for zone_id, zone_info in sorted(state_manager.zone_cache.items()):
+                zone_state = tado_api._build_zone_state(zone_id)
+                if zone_state is not None:
+                    snapshot['zones'].append({'zone_id': zone_id, 'zone_name': zone_info.get('name'), 'state': zone_state})
+        if not types or 'device' in types:
+            snapshot['devices'] = []
+            for device_id, device_info in sorted(state_manager.device_info_cache.items()):
+                snapshot['devices'].append({
+                    'device_id': device_id,
+                    'serial': device_info.get('serial_number'),
+                    'zone_name': device_info.get('zone_name'),
+                    'state': tado_api._build_device_state(device_id),
+                })
+        return snapshot
+
+    async def _send_events(self):
+        loop = asyncio.get_running_loop()
+        last_sent = loop.time()
+        while True:
+            try:
+                event = await asyncio.wait_for(self.queue.get(), timeout=max(1.0, self.keepalive - (loop.time() - last_sent)))
+            except asyncio.TimeoutError:
+                if self.subscribed and (not self.types or 'keepalive' in self.types):
+                    await self._send({'type': 'keepalive', 'timestamp': time.time()}, binary=self.binary)
+                last_sent = loop.time()
+                continue
+            if event is None:
+                # API shutdown: close the connection
+                await self.websocket.close()
+                return
+            event, delta_event = event
+            if self.delta:
+                if delta_event is None or delta_event['seq'] <= self.delta_seq.get(delta_event['type'], 0):
+                    continue
+                event = delta_event
+            if not self.subscribed or (self.types and event.get('type') not in self.types):
+                continue
+            await self._send(event, binary=self.binary)
+            last_sent = loop.time()
+
+    async def _send(self, message: Dict[str, Any], binary: bool):
+        async with self.send_lock:
+            if binary:
+                await self.websocket.send_bytes(msgpack.packb(message))
+            else:
+                await self.websocket.send_text(json.dumps(message))
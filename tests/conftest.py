@@ -0,0 +1,64 @@
+import sqlite3
+
+import pytest
+import pytest_asyncio
+
+from tado_local.api import TadoLocalAPI
+from tado_local.simulator import SimulatedPairing
+
+
+@pytest_asyncio.fixture
+async def start_api(tmp_path):
+    """Factory for a TadoLocalAPI running against a simulated bridge.
+
+    ``await start_api(num_zones, valves_per_zone, seed=..., WRITE_DEBOUNCE=0.0)``
+    generates the bridge, applies the remaining keyword arguments as API
+    settings, initializes the API and returns ``(tado_api, pairing)``. Pass
+    ``pairing`` to use a prepared bridge, ``db_path`` to reuse a database and
+    ``initialize=False`` to call ``initialize`` from the test. Every API the
+    test started is cleaned up afterwards, unless the test already did, and
+    its bridge is closed.
+    """
+    started = []
+
+    async def start(num_zones=1, valves_per_zone=0, seed=None, echo_writes=True, *,
+                    pairing=None, config_num=None, db_path=None, initialize=True, **settings):
+        if pairing is None:
+            pairing = SimulatedPairing.generate(num_zones=num_zones, valves_per_zone=valves_per_zone,
+                                                seed=seed, echo_writes=echo_writes)
+        tado_api = TadoLocalAPI(db_path or str(tmp_path / f"tado{len(started)}.db"))
+        for name, value in settings.items():
+            setattr(tado_api, name, value)
+        started.append((tado_api, pairing))
+        if initialize:
+            await tado_api.initialize(pairing, config_num=config_num)
+        return tado_api, pairing
+
+    yield start
+    for tado_api, pairing in started:
+        if not tado_api.is_shutting_down:
+            await tado_api.cleanup()
+        await pairing.close()
+
+
+@pytest.fixture
+def assign_zones():
+    """Create zones and move devices into them: ``{zone_id: (name, leader_device_id, device_ids)}``."""
+    def assign(tado_api, zones):
+        with sqlite3.connect(tado_api.state_manager.db_path) as conn:
+            for zone_id, (name, leader_device_id, device_ids) in zones.items():
+                conn.execute("INSERT INTO zones (zone_id, name, leader_device_id) VALUES (?, ?, ?)",
+                             (zone_id, name, leader_device_id))
+                conn.executemany("UPDATE devices SET zone_id = ? WHERE device_id = ?",
+                                 [(zone_id, device_id) for device_id in device_ids])
+        tado_api.state_manager._load_device_cache()
+        tado_api.state_manager._load_zone_cache()
+    return assign
+
+
+@pytest_asyncio.fixture
+async def zoned_api(start_api, assign_zones):
+    """Zone 1: thermostat 2 (leader) + valve 3; zone 2: no leader, devices 4 and 5."""
+    tado_api, pairing = await start_api(num_zones=2, valves_per_zone=1, seed=1)
+    assign_zones(tado_api, {1: ('Living', 2, (2, 3)), 2: ('Bedroom', None, (4, 5))})
+    return tado_api, pairing
@@ -0,0 +1,43 @@
+import sqlite3
+
+import pytest
+
+from tado_local.simulator import SimulatedPairing
+
+
+async def start_and_stop(start_api, db_path, config_num, advertise=True):
+    pairing = SimulatedPairing.generate(num_zones=2, valves_per_zone=1, seed=4, config_num=config_num)
+    tado_api, _ = await start_api(pairing=pairing, db_path=db_path,
+                                        config_num=pairing.config_num if advertise else None)
+    await tado_api.cleanup()
+    return tado_api, pairing
+
+
+@pytest.mark.asyncio
+async def test_restart_uses_accessory_cache_while_config_num_matches(tmp_path, start_api):
+    db_path = str(tmp_path / "cache.db")
+
+    first, pairing = await start_and_stop(start_api, db_path, config_num=3)
+    assert pairing.calls['list_accessories_and_characteristics'] == 1
+
+    # Same c#: accessory maps are built from the persisted list
+    second, pairing = await start_and_stop(start_api, db_path, config_num=3)
+    assert pairing.calls['list_accessories_and_characteristics'] == 0
+    assert second.accessories_cache == first.accessories_cache
+    assert second.device_to_characteristics == first.device_to_characteristics
+
+    # Bridge configuration changed: download again and remember the new c#
+    _, pairing = await start_and_stop(start_api, db_path, config_num=4)
+    assert pairing.calls['list_accessories_and_characteristics'] == 1
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT config_num FROM homekit_cache").fetchone() == (4,)
+    conn.close()
+
+
+@pytest.mark.asyncio
+async def test_unknown_config_num_always_downloads(tmp_path, start_api):
+    db_path = str(tmp_path / "nocnum.db")
+    await start_and_stop(start_api, db_path, config_num=3)
+
+    _, pairing = await start_and_stop(start_api, db_path, config_num=3, advertise=False)
+    assert pairing.calls['list_accessories_and_characteristics'] == 1
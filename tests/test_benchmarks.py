@@ -0,0 +1,23 @@
+import pytest
+
+from benchmarks import run as bench
+
+
+TINY = dict(bench.QUICK, zones=2, valves_per_zone=1, events=50, sse_clients=3, sse_events=5,
+            http_requests=5, history_rows=2000, history_devices=4, history_queries=5)
+
+
+@pytest.mark.asyncio
+async def test_benchmark_scenarios_run(tmp_path):
+    results = await bench.run(['handle_change', 'sse_fanout', 'http', 'history'], TINY, tmp_path)
+    assert results['handle_change']['events_per_sec'] > 0
+    assert results['sse_fanout']['p99_ms'] >= results['sse_fanout']['p50_ms']
+    assert results['http']['zones'] == 2
+    assert results['history']['rows'] == 2000
+
+
+def test_compare_flags_regressions_by_direction():
+    baseline = {'results': {'x': {'events_per_sec': 1000, 'p99_ms': 10.0, 'rows': 5}}}
+    current = {'results': {'x': {'events_per_sec': 700, 'p99_ms': 11.0, 'rows': 50}}}
+    regressions = bench.compare(current, baseline, threshold=0.2)
+    assert len(regressions) == 1 and regressions[0].startswith('x.events_per_sec')
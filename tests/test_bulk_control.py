@@ -0,0 +1,78 @@
+import pytest
+from fastapi import FastAPI, HTTPException
+
+from tado_local.routes import register_routes
+
+
+def endpoint(app, path, method='POST'):
+    return next(r.endpoint for r in app.routes if getattr(r, 'path', None) == path and method in r.methods)
+
+
+@pytest.mark.asyncio
+async def test_bulk_control_sends_one_write(zoned_api):
+    tado_api, pairing = zoned_api
+    app = FastAPI()
+    register_routes(app, lambda: tado_api)
+    bulk_control = endpoint(app, '/control')
+
+    writes = pairing.calls['put_characteristics']
+    result = await bulk_control(changes={
+        'zones': [{'zone_id': 1, 'temperature': 21.5}, {'zone_id': 2, 'temperature': 0}],
+        'devices': [{'device_id': 3, 'heating_enabled': False}],
+    }, api_key=None)
+
+    assert pairing.calls['put_characteristics'] == writes + 1
+    assert result['success'] and result['count'] == 2
+    zones = {zone['zone_id']: zone for zone in result['zones']}
+    # The device entry targets zone 1 and is merged into its leader's write
+    assert zones[1]['applied'] == {'target_temperature': 21.5, 'target_heating_cooling_state': 0}
+    assert zones[2]['leader_device_id'] == 4
+    assert zones[2]['applied'] == {'target_heating_cooling_state': 0}
+
+    assert pairing._chars[(2, pairing.find_iid(2, 'TargetTemperature'))]['value'] == 21.5
+    assert pairing._chars[(4, pairing.find_iid(4, 'TargetHeatingCoolingState'))]['value'] == 0
+    assert tado_api.state_manager.get_state_with_optimistic(4)['target_heating_cooling_state'] == 0
+
+
+@pytest.mark.asyncio
+async def test_bulk_control_validates_before_writing(zoned_api):
+    tado_api, pairing = zoned_api
+    app = FastAPI()
+    register_routes(app, lambda: tado_api)
+    bulk_control = endpoint(app, '/control')
+
+    writes = pairing.calls['put_characteristics']
+    with pytest.raises(HTTPException) as exc:
+        await bulk_control(changes={'zones': [{'zone_id': 1, 'temperature': 21}, {'zone_id': 99, 'temperature': 20}]},
+                           api_key=None)
+    assert exc.value.status_code == 404
+
+    with pytest.raises(HTTPException) as exc:
+        await bulk_control(changes={'zones': [{'zone_id': 1, 'temperature': 3}]}, api_key=None)
+    assert exc.value.status_code == 400
+    assert pairing.calls['put_characteristics'] == writes
+
+
+@pytest.mark.asyncio
+async def test_bulk_control_rejects_non_boolean_heating_enabled(zoned_api):
+    tado_api, pairing = zoned_api
+    app = FastAPI()
+    register_routes(app, lambda: tado_api)
+    bulk_control = endpoint(app, '/control')
+
+    writes = pairing.calls['put_characteristics']
+    with pytest.raises(HTTPException) as exc:
+        await bulk_control(changes={'zones': [{'zone_id': 1, 'heating_enabled': 'false'}]}, api_key=None)
+    assert exc.value.status_code == 400
+    assert pairing.calls['put_characteristics'] == writes
+
+
+@pytest.mark.asyncio
+async def test_bulk_write_is_not_overwritten_by_queued_write(zoned_api):
+    tado_api, pairing = zoned_api
+    tado_api.WRITE_DEBOUNCE = 10.0
+    await tado_api.set_device_characteristics(2, {'target_temperature': 18.0}, wait=False)
+
+    assert await tado_api.set_characteristics_bulk({2: {'target_temperature': 21.0}}) == {2: {}}
+    assert not tado_api.pending_writes
+    assert pairing._chars[(2, pairing.find_iid(2, 'TargetTemperature'))]['value'] == 21.0
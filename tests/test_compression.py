@@ -0,0 +1,105 @@
+import asyncio
+import gzip
+import json
+import zlib
+
+import pytest
+
+from tado_local.compression import CompressionMiddleware, choose_encoding
+
+
+def json_app(payload: bytes, content_type: bytes = b'application/json'):
+    async def app(scope, receive, send):
+        await send({'type': 'http.response.start', 'status': 200,
+                    'headers': [(b'content-type', content_type), (b'content-length', str(len(payload)).encode())]})
+        await send({'type': 'http.response.body', 'body': payload})
+    return app
+
+
+async def call(app, accept_encoding=None):
+    headers = [(b'accept-encoding', accept_encoding.encode())] if accept_encoding else []
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    await app({'type': 'http', 'method': 'GET', 'path': '/', 'headers': headers}, None, send)
+    return messages
+
+
+def test_choose_encoding():
+    assert choose_encoding('gzip, deflate') == 'gzip'
+    assert choose_encoding('gzip;q=0, identity') is None
+    assert choose_encoding('*') in ('br', 'gzip')
+    assert choose_encoding('deflate') is None
+
+
+@pytest.mark.asyncio
+async def test_large_responses_are_compressed_and_small_ones_are_not():
+    large = json.dumps([{'aid': i, 'name': 'Thermostat', 'value': 21.5} for i in range(200)]).encode()
+    start, body = await call(CompressionMiddleware(json_app(large)), 'gzip, deflate')
+    headers = dict(start['headers'])
+    assert headers[b'content-encoding'] == b'gzip' and headers[b'vary'] == b'Accept-Encoding'
+    assert int(headers[b'content-length']) == len(body['body']) < len(large) / 4
+    assert gzip.decompress(body['body']) == large
+
+    small = b'{"ok": true}'
+    start, body = await call(CompressionMiddleware(json_app(small)), 'gzip')
+    assert b'content-encoding' not in dict(start['headers']) and body['body'] == small
+
+    start, body = await call(CompressionMiddleware(json_app(large)))
+    assert b'content-encoding' not in dict(start['headers']) and body['body'] == large
+
+    start, body = await call(CompressionMiddleware(json_app(large, b'image/png')), 'gzip')
+    assert b'content-encoding' not in dict(start['headers'])
+
+
+@pytest.mark.asyncio
+async def test_event_stream_is_flushed_per_event():
+    events = [f'data: {{"type": "zone", "zone_id": {i}}}\n\n'.encode() for i in range(3)]
+
+    async def sse_app(scope, receive, send):
+        await send({'type': 'http.response.start', 'status': 200, 'headers': [(b'content-type', b'text/event-stream')]})
+        for event in events:
+            await send({'type': 'http.response.body', 'body': event, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+
+    start, *chunks = await call(CompressionMiddleware(sse_app), 'gzip')
+    assert dict(start['headers'])[b'content-encoding'] == b'gzip'
+    assert b'content-length' not in dict(start['headers'])
+
+    # Each chunk decodes to exactly its event without waiting for the rest of the stream
+    decoder = zlib.decompressobj(31)
+    for event, chunk in zip(events, chunks):
+        assert decoder.decompress(chunk['body']) == event
+    assert not chunks[-1]['more_body']
+
+
+@pytest.mark.asyncio
+async def test_event_stream_headers_are_sent_before_the_first_event():
+    first_event = asyncio.Event()
+
+    async def sse_app(scope, receive, send):
+        await send({'type': 'http.response.start', 'status': 200, 'headers': [(b'content-type', b'text/event-stream')]})
+        await first_event.wait()
+        await send({'type': 'http.response.body', 'body': b'data: {"type": "keepalive"}\n\n', 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {'type': 'http', 'method': 'GET', 'path': '/events', 'headers': [(b'accept-encoding', b'gzip')]}
+    task = asyncio.create_task(CompressionMiddleware(sse_app)(scope, None, send))
+    await asyncio.sleep(0)
+
+    # No event yet, but the client already has the response headers
+    assert [message['type'] for message in messages] == ['http.response.start']
+    headers = dict(messages[0]['headers'])
+    assert headers[b'content-encoding'] == b'gzip' and b'content-length' not in headers
+
+    first_event.set()
+    await task
+    body = b''.join(message['body'] for message in messages[1:])
+    assert gzip.decompress(body) == b'data: {"type": "keepalive"}\n\n'
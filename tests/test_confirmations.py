@@ -0,0 +1,70 @@
+import asyncio
+import time
+
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_echoed_write_is_confirmed_and_clears_optimistic_state(start_api):
+    tado_api, pairing = await start_api(seed=8, echo_writes=True, WRITE_DEBOUNCE=0.0)
+    device_id = tado_api.state_manager.device_id_cache['RU0000000002']
+    await tado_api.set_device_characteristics(device_id, {'target_temperature': 22.0})
+
+    tracker = tado_api.write_tracker
+    assert not tracker.pending
+    summary = tracker.summary()
+    assert summary['confirmed'] == 1 and summary['devices'][device_id]['latency_ms']['p50'] is not None
+    assert device_id not in tado_api.state_manager.optimistic_state
+    assert tado_api.state_manager.get_current_state(device_id)['target_temperature'] == 22.0
+
+
+@pytest.mark.asyncio
+async def test_overridden_and_timed_out_writes(start_api):
+    tado_api, pairing = await start_api(seed=8, echo_writes=False, WRITE_DEBOUNCE=0.0)
+    device_id = tado_api.state_manager.device_id_cache['RU0000000002']
+    tracker = tado_api.write_tracker
+    await tado_api.set_device_characteristics(device_id, {'target_temperature': 24.0,
+                                                          'target_heating_cooling_state': 1})
+    assert len(tracker.pending) == 2
+
+    # The setpoint is changed on the device: the write is settled as overridden
+    iid = pairing.find_iid(2, 'TargetTemperature')
+    await tado_api.handle_change(2, iid, {'value': 23.0}, source="POLLING")
+    assert tracker.summary()['overridden'] == 1
+    # The other write is still unconfirmed, so the prediction is kept
+    assert device_id in tado_api.state_manager.optimistic_state
+
+    for write in tracker.pending.values():
+        write['sent_at'] = time.monotonic() - tracker.timeout - 1
+    assert tracker.summary()['timeout'] == 1
+    assert device_id not in tado_api.state_manager.optimistic_state
+
+
+@pytest.mark.asyncio
+async def test_unconfirmed_writes_time_out_without_further_activity(start_api):
+    tado_api, pairing = await start_api(seed=8, echo_writes=False, WRITE_DEBOUNCE=0.0, initialize=False)
+    tado_api.write_tracker.check_interval = 0.01
+    await tado_api.initialize(pairing)
+    device_id = tado_api.state_manager.device_id_cache['RU0000000002']
+    tracker = tado_api.write_tracker
+    await tado_api.set_device_characteristics(device_id, {'target_temperature': 24.0})
+    for write in tracker.pending.values():
+        write['sent_at'] = time.monotonic() - tracker.timeout - 1
+
+    # The tracker's periodic check settles it; no write, report or /status needed
+    await asyncio.sleep(0.05)
+    assert not tracker.pending
+    assert tracker.outcomes[device_id]['timeout'] == 1
+
+
+@pytest.mark.asyncio
+async def test_late_confirmation_keeps_prediction_of_queued_write(start_api):
+    tado_api, pairing = await start_api(seed=8, echo_writes=False, WRITE_DEBOUNCE=10.0)
+    device_id = tado_api.state_manager.device_id_cache['RU0000000002']
+    await tado_api.set_device_characteristics(device_id, {'target_temperature': 20.0})
+    await tado_api.set_device_characteristics(device_id, {'target_temperature': 21.0}, wait=False)
+
+    # The echo of the first write arrives while 21.0 is still queued
+    await tado_api.handle_change(2, pairing.find_iid(2, 'TargetTemperature'), {'value': 20.0}, source="EVENT")
+    assert tado_api.write_tracker.outcomes[device_id]['confirmed'] == 1
+    assert tado_api.state_manager.get_state_with_optimistic(device_id)['target_temperature'] == 21.0
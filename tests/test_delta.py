@@ -0,0 +1,107 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import FastAPI
+
+from tado_local.delta import DeltaEncoder
+from tado_local.routes import register_routes
+
+
+def device_event(**state):
+    return {'type': 'device', 'device_id': 4, 'serial': 'VA1', 'zone_name': 'Living',
+            'state': {'cur_temp_c': 20.0, 'valve_position': 10, **state}, 'timestamp': 1.0}
+
+
+def test_delta_encoder_sends_changes_and_keyframes():
+    now = [0.0]
+    encoder = DeltaEncoder(keyframe_every=2, keyframe_interval=60, clock=lambda: now[0])
+
+    first = encoder.encode(device_event())
+    assert first['keyframe'] and first['seq'] == 1 and first['state']['valve_position'] == 10
+    assert encoder.encode(device_event()) is None
+
+    delta = encoder.encode(device_event(valve_position=45))
+    assert delta == {'type': 'device', 'device_id': 4, 'seq': 2, 'delta': {'valve_position': 45}, 'timestamp': 1.0}
+    assert encoder.encode(device_event(valve_position=50))['delta'] == {'valve_position': 50}
+    # keyframe_every deltas reached
+    assert encoder.encode(device_event(valve_position=55))['keyframe']
+
+    # Renamed zone and keyframe interval both force a full event
+    assert encoder.encode({**device_event(valve_position=55, cur_temp_c=21.0), 'zone_name': 'Study'})['keyframe']
+    now[0] = 61
+    assert encoder.encode(device_event(valve_position=60))['keyframe']
+
+    # Non-state events pass through with a sequence number of their own type
+    assert encoder.encode({'type': 'keepalive'}) == {'type': 'keepalive', 'seq': 1}
+    assert [event['seq'] for event in encoder.snapshot()] == [encoder.seq['device']]
+
+
+def test_each_event_type_has_its_own_sequence():
+    encoder = DeltaEncoder()
+    zone_event = {'type': 'zone', 'zone_id': 1, 'name': 'Living', 'state': {'cur_temp_c': 20.0}, 'timestamp': 1.0}
+    seqs = [encoder.encode(event)['seq'] for event in (
+        zone_event, device_event(), {'type': 'freshness', 'device_id': 4},
+        {**zone_event, 'state': {'cur_temp_c': 20.5}}, device_event(valve_position=20))]
+    assert seqs == [1, 1, 1, 2, 2]
+    assert encoder.summary()['seq'] == {'zone': 2, 'device': 2, 'freshness': 1}
+
+
+@pytest.mark.asyncio
+async def test_sse_delta_stream(start_api):
+    tado_api, pairing = await start_api(seed=2)
+    app = FastAPI()
+    register_routes(app, lambda: tado_api)
+    get_events = next(r.endpoint for r in app.routes if getattr(r, 'path', None) == '/events')
+    aid = 2
+    iid = pairing.find_iid(aid, 'CurrentTemperature')
+    # Prime the encoder with the device's current state
+    await tado_api.handle_change(aid, iid, {'value': 18.0}, source="EVENT")
+
+    response = await get_events(refresh_interval=None, types='device', format='delta', api_key=None)
+    stream = response.body_iterator
+
+    async def next_event():
+        return json.loads((await asyncio.wait_for(anext(stream), timeout=2))[len('data: '):])
+
+    keyframe = await next_event()
+    assert keyframe['keyframe'] and keyframe['state']['cur_temp_c'] == 18.0
+
+    await tado_api.handle_change(aid, iid, {'value': 18.5}, source="EVENT")
+    delta = await next_event()
+    assert delta['seq'] == keyframe['seq'] + 1
+    assert delta['delta'] == {'cur_temp_c': 18.5, 'cur_temp_f': 65.3}
+    assert tado_api.delta_listeners
+    await stream.aclose()
+    assert not tado_api.delta_listeners
+
+
+@pytest.mark.asyncio
+async def test_type_filtered_delta_stream_has_no_gaps(start_api, assign_zones):
+    tado_api, pairing = await start_api(1, 1, seed=2)
+    assign_zones(tado_api, {1: ('Living', 2, (2, 3))})
+    app = FastAPI()
+    register_routes(app, lambda: tado_api)
+    get_events = next(r.endpoint for r in app.routes if getattr(r, 'path', None) == '/events')
+    iid = pairing.find_iid(2, 'CurrentTemperature')
+    await tado_api.handle_change(2, iid, {'value': 18.0}, source="EVENT")
+
+    response = await get_events(refresh_interval=None, types='device', format='delta', api_key=None)
+    stream = response.body_iterator
+
+    async def next_event():
+        return json.loads((await asyncio.wait_for(anext(stream), timeout=2))[len('data: '):])
+
+    device_keyframes = [event for event in tado_api.delta_encoder.snapshot() if event['type'] == 'device']
+    keyframes = [await next_event() for _ in device_keyframes]
+    assert all(event['type'] == 'device' for event in keyframes)
+    seq = max(event['seq'] for event in keyframes)
+
+    # Each change also produces a zone event, which this client does not see
+    for value in (18.5, 19.0, 19.5):
+        await tado_api.handle_change(2, iid, {'value': value}, source="EVENT")
+        delta = await next_event()
+        assert delta['type'] == 'device' and delta['seq'] == seq + 1
+        seq = delta['seq']
+    assert tado_api.delta_encoder.seq['zone'] >= 3
+    await stream.aclose()
@@ -0,0 +1,54 @@
+import asyncio
+import marshal
+import time
+
+import pytest
+
+from tado_local import metrics
+from tado_local.diagnostics import LoopDiagnostics, stats_to_bytes, stats_to_text
+
+
+def blocking_step():
+    time.sleep(0.15)
+
+
+@pytest.mark.asyncio
+async def test_loop_stall_is_recorded_with_stack():
+    diagnostics = LoopDiagnostics(slow_threshold=0.05, interval=0.01)
+    lag_samples = metrics.EVENT_LOOP_LAG_SECONDS.labels().count
+    diagnostics.start()
+    try:
+        await asyncio.sleep(0.05)
+        blocking_step()
+        await asyncio.sleep(0.05)
+
+        summary = diagnostics.summary()
+        assert summary['stall_count'] == 1
+        stall = summary['recent_stalls'][0]
+        assert stall['duration_ms'] >= 100
+        assert any('blocking_step' in line for line in stall['stack'])
+        assert summary['lag_ms']['max'] >= 100
+        # The same lag samples feed /metrics (one monitor loop, not two)
+        assert metrics.EVENT_LOOP_LAG_SECONDS.labels().count - lag_samples == summary['samples']
+    finally:
+        await diagnostics.stop()
+
+
+@pytest.mark.asyncio
+async def test_profile_capture_is_exclusive_and_serializable():
+    diagnostics = LoopDiagnostics()
+
+    async def busy():
+        for _ in range(20):
+            sum(range(1000))
+            await asyncio.sleep(0)
+
+    capture = asyncio.create_task(diagnostics.capture_profile(0.05))
+    await asyncio.sleep(0)
+    with pytest.raises(RuntimeError):
+        await diagnostics.capture_profile(0.05)
+    await busy()
+    stats = await capture
+
+    assert 'busy' in stats_to_text(stats)
+    assert marshal.loads(stats_to_bytes(stats)) == stats.stats
@@ -0,0 +1,42 @@
+import pytest
+
+from tado_local import api as api_module
+
+
+def find_char(accessories, aid, iid):
+    for accessory in accessories:
+        if accessory['aid'] != aid:
+            continue
+        for service in accessory['services']:
+            for char in service['characteristics']:
+                if char['iid'] == iid:
+                    return char
+    return None
+
+
+@pytest.mark.asyncio
+async def test_enhanced_structure_is_cached_and_overlaid_with_live_values(monkeypatch, start_api):
+    tado_api, pairing = await start_api(1, 1, seed=5, config_num=1)
+    builds = []
+    build = api_module.build_enhanced_structure
+    monkeypatch.setattr(api_module, 'build_enhanced_structure', lambda accessories: builds.append(1) or build(accessories))
+
+    iid = pairing.find_iid(2, 'CurrentTemperature')
+    first = tado_api.enhanced_accessories()
+    assert find_char(first, 2, iid)['type_name'] == 'CurrentTemperature'
+
+    # A new value is served without rebuilding the structure
+    await tado_api.handle_change(2, iid, {'value': 17.3}, source="POLLING")
+    assert find_char(tado_api.enhanced_accessories(), 2, iid)['value'] == 17.3
+    assert find_char(first, 2, iid)['value'] != 17.3
+    accessory_id = first[1]['id']
+    single = tado_api.enhanced_accessories(accessory_id)
+    assert [accessory['id'] for accessory in single] == [accessory_id]
+    assert len(builds) == 1
+
+    # Reloading the accessory list or a new c# rebuilds it
+    await tado_api.refresh_accessories()
+    tado_api.enhanced_accessories()
+    tado_api.config_num = 2
+    tado_api.enhanced_accessories()
+    assert len(builds) == 3
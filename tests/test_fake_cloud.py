@@ -0,0 +1,46 @@
+import pytest
+
+from tado_local.api import TadoLocalAPI
+from tado_local.cloud import TadoCloudAPI
+from tado_local.fake_cloud import FakeTadoCloud
+from tado_local.sync import TadoCloudSync
+
+
+@pytest.mark.asyncio
+async def test_device_flow_sync_and_etag(tmp_path):
+    db_file = str(tmp_path / "cloud.db")
+    tado_api = TadoLocalAPI(db_file)
+
+    async with FakeTadoCloud.generate(num_zones=3, valves_per_zone=2, home_id=77, seed=1) as cloud:
+        cloud_api = TadoCloudAPI(db_file, tado_api,
+                                 api_base_url=cloud.api_base_url,
+                                 auth_base_url=cloud.auth_base_url)
+
+        assert await cloud_api.authenticate()
+        assert cloud_api.home_id == 77
+        assert cloud_api.is_authenticated()
+
+        sync = TadoCloudSync(db_file, tado_api.state_manager)
+        assert await sync.sync_all(cloud_api)
+        assert len(tado_api.state_manager.zone_cache) == 3
+        assert len(tado_api.state_manager.get_devices_by_tado_zone(2)) == 3
+        assert cloud_api.rate_limit.granted_calls == 100
+        assert cloud_api.rate_limit.remaining_calls == 100 - cloud.calls_made
+
+        # Cached responses are served locally, forced refreshes revalidate with the ETag
+        assert await cloud_api.get_zones() == cloud.zones
+        assert cloud.requests['zones'] == 1
+        assert await cloud_api.get_zones(force_refresh=True) == cloud.zones
+        assert cloud.not_modified['zones'] == 1
+
+        # Refresh tokens rotate
+        old_refresh = cloud_api.refresh_token
+        assert await cloud_api.refresh_access_token()
+        assert cloud_api.refresh_token != old_refresh
+
+        # Injected failures and rate limiting surface as None
+        cloud.fail_next()
+        assert await cloud_api.get_device_list(force_refresh=True) is None
+        cloud.rate_limit = cloud.calls_made
+        assert await cloud_api.get_zone_states(force_refresh=True) is None
+        assert cloud_api.rate_limit.remaining_calls == 0
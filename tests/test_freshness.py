@@ -0,0 +1,82 @@
+import asyncio
+import json
+import sqlite3
+
+import pytest
+from fastapi import FastAPI
+
+from tado_local.routes import register_routes
+
+
+@pytest.mark.asyncio
+async def test_characteristic_recency(start_api):
+    tado_api, pairing = await start_api(1, 1, seed=3)
+    device_id = tado_api.state_manager.device_id_cache['VA0000000003']
+    iid = pairing.find_iid(3, 'CurrentTemperature')
+    baseline = tado_api.device_freshness(device_id)['characteristics']['current_temperature']
+    assert baseline['last_seen'] is not None and baseline['last_event'] is None
+
+    await tado_api.handle_change(3, iid, {'value': 19.2}, source="EVENT")
+    entry = tado_api.freshness.characteristics[(3, iid)]
+    assert entry['last_changed'] == entry['last_seen']
+    entry.update(last_seen=1.0, last_event=1.0, last_changed=1.0)
+    await tado_api.handle_change(3, iid, {'value': 19.2}, source="EVENT")
+
+    freshness = tado_api.device_freshness(device_id)
+    recency = freshness['characteristics']['current_temperature']
+    assert recency['last_event'] == recency['last_seen'] == freshness['last_event']
+    assert recency['last_seen'] > 1.0  # An unchanged value is still a sign of life
+    assert recency['last_changed'] == 1.0
+    assert 'characteristics' not in tado_api.device_freshness(device_id, characteristics=False)
+
+
+@pytest.mark.asyncio
+async def test_device_list_leaves_characteristic_recency_to_device_details(start_api):
+    tado_api, pairing = await start_api(1, 1, seed=3)
+    app = FastAPI()
+    register_routes(app, lambda: tado_api)
+    get_devices = next(r.endpoint for r in app.routes if getattr(r, 'path', None) == '/devices')
+    get_device = next(r.endpoint for r in app.routes if getattr(r, 'path', None) == '/devices/{device_id}')
+    device_id = tado_api.state_manager.device_id_cache['VA0000000003']
+    await tado_api.handle_change(3, pairing.find_iid(3, 'CurrentTemperature'), {'value': 19.2}, source="EVENT")
+
+    listed = next(device for device in (await get_devices(api_key=None))['devices'] if device['device_id'] == device_id)
+    detail = (await get_device(device_id=device_id, api_key=None))['freshness']
+    assert 'characteristics' not in listed['freshness']
+    assert detail['characteristics']['current_temperature']['last_changed'] == detail['last_changed']
+    assert listed['freshness']['last_changed'] == detail['last_changed'] is not None
+    assert listed['freshness']['stale'] == detail['stale']
+
+
+@pytest.mark.asyncio
+async def test_stale_device_events_and_persistence(tmp_path, start_api, assign_zones):
+    db_path = str(tmp_path / "stale.db")
+    tado_api, pairing = await start_api(1, 1, seed=3, STALE_AFTER=60.0, db_path=db_path)
+    assign_zones(tado_api, {1: ('Living', 2, (2, 3))})
+    queue = asyncio.Queue()
+    tado_api.event_listeners.append(queue)
+    monitor = tado_api.freshness
+    assert await monitor.check() == []
+
+    valve_id = tado_api.state_manager.device_id_cache['VA0000000003']
+    tado_api.accessory_last_seen[3] -= 120
+    assert await monitor.check() == [valve_id]
+    event = json.loads((await queue.get())[len('data: '):])
+    assert event['type'] == 'freshness' and event['device_id'] == valve_id and event['freshness']['stale']
+    assert await monitor.check() == []  # Announced once
+    zone_freshness = tado_api.zone_freshness(1)
+    assert zone_freshness['stale'] and zone_freshness['stale_devices'] == [valve_id]
+
+    # The next report announces the device as fresh right away
+    await tado_api.handle_change(3, pairing.find_iid(3, 'CurrentTemperature'), {'value': 20.5}, source="EVENT")
+    event = json.loads((await queue.get())[len('data: '):])
+    assert event['type'] == 'freshness' and not event['freshness']['stale']
+    assert tado_api.freshness.summary()['stale_devices'] == []
+
+    # devices.last_seen is written in batches, only for devices seen since the last batch
+    assert monitor.persist() == 2
+    assert monitor.persist() == 0
+    conn = sqlite3.connect(db_path)
+    last_seen = conn.execute("SELECT last_seen FROM devices WHERE device_id = ?", (valve_id,)).fetchone()[0]
+    conn.close()
+    assert last_seen is not None and len(last_seen) == len('2025-01-01 00:00:00')
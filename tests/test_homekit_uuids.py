@@ -0,0 +1,48 @@
+import pytest
+
+from tado_local.homekit_uuids import (
+    CHARACTERISTIC_NAMES, STATE_FIELDS, full_uuid, get_characteristic_name, get_service_name, normalize_uuid,
+)
+from tado_local.simulator import SimulatedPairing
+
+
+def test_normalize_uuid_forms():
+    assert normalize_uuid('0000004A-0000-1000-8000-0026BB765291') == 0x4A
+    assert normalize_uuid('0000004a-0000-1000-8000-0026bb765291') == 0x4A
+    assert normalize_uuid('4A') == 0x4A
+    assert normalize_uuid(0x4A) == 0x4A
+    # Vendor UUIDs keep their full (upper-case) form
+    assert normalize_uuid('e44673a0-247b-4360-8a76-db9da69c0100') == 'E44673A0-247B-4360-8A76-DB9DA69C0100'
+    assert full_uuid(0x35) == '00000035-0000-1000-8000-0026BB765291'
+
+
+def test_lookup_tables():
+    assert get_service_name('0000004a-0000-1000-8000-0026bb765291') == 'Thermostat'
+    assert get_service_name('E44673A0-247B-4360-8A76-DB9DA69C0100') == 'TadoProprietaryService'
+    assert get_characteristic_name(0x35) == 'TargetTemperature'
+    assert get_characteristic_name('11') == 'CurrentTemperature'
+    assert get_characteristic_name('abc') == 'abc'
+    assert STATE_FIELDS[normalize_uuid('00000035-0000-1000-8000-0026bb765291')] == 'target_temperature'
+    with pytest.raises(TypeError):
+        CHARACTERISTIC_NAMES[0x35] = 'Other'
+
+
+@pytest.mark.asyncio
+async def test_accessories_with_short_lower_case_uuids(start_api):
+    pairing = SimulatedPairing.generate(num_zones=1, valves_per_zone=0, seed=6)
+    for accessory in pairing._accessories:
+        for service in accessory['services']:
+            service['type'] = service['type'].lower()
+            for char in service['characteristics']:
+                canonical = normalize_uuid(char['type'])
+                char['type'] = f"{canonical:X}" if isinstance(canonical, int) else canonical.lower()
+
+    tado_api, _ = await start_api(pairing=pairing)
+    device_id = tado_api.state_manager.device_id_cache['RU0000000002']
+    assert tado_api.state_manager.device_info_cache[device_id]['device_type'] == 'thermostat'
+    assert 'target_temperature' in tado_api.write_plans[device_id]
+
+    iid = pairing.find_iid(2, 'CurrentTemperature')
+    await tado_api.handle_change(2, iid, {'value': 18.4}, source="POLLING")
+    assert tado_api.characteristic_map[(2, iid)] == 'CurrentTemperature'
+    assert tado_api.state_manager.get_current_state(device_id)['current_temperature'] == 18.4
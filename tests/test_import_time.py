@@ -0,0 +1,46 @@
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Third-party packages that must only be imported when the server actually starts
+HEAVY_MODULES = ('fastapi', 'uvicorn', 'aiohttp', 'aiohomekit', 'zeroconf', 'cryptography')
+
+# Cumulative import time budget in milliseconds (generous; the eager package took ~600 ms)
+IMPORT_BUDGET_MS = float(os.environ.get('TADO_IMPORT_BUDGET_MS', '250'))
+
+
+def _run(code: str, *flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *flags, '-c', code],
+        cwd=REPO_ROOT, capture_output=True, text=True, timeout=60, check=True,
+    )
+
+
+@pytest.mark.parametrize('module', ['tado_local', 'tado_local.database', 'tado_local.state',
+                                    'tado_local.api', 'tado_local.cloud', 'tado_local.__main__'])
+def test_import_does_not_load_server_stack(module):
+    result = _run(f"import sys, {module}; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    assert result.stdout.strip() == ''
+
+
+@pytest.mark.parametrize('module', ['tado_local.api', 'tado_local.__main__'])
+def test_import_time_budget(module):
+    stderr = _run(f"import {module}", '-X', 'importtime').stderr
+    match = re.search(rf"^import time:\s+\d+ \|\s+(\d+) \| {re.escape(module)}$", stderr, re.MULTILINE)
+    assert match, stderr[-2000:]
+    assert int(match.group(1)) / 1000 < IMPORT_BUDGET_MS
+
+
+def test_lazy_package_exports():
+    import tado_local
+
+    assert tado_local.TadoLocalAPI.__module__ == 'tado_local.api'
+    assert tado_local.DB_SCHEMA
+    assert set(tado_local.__all__) <= set(dir(tado_local))
+    with pytest.raises(AttributeError):
+        tado_local.does_not_exist
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from tado_local import metrics
+
+
+def test_registry_renders_prometheus_text():
+    registry = metrics.Registry()
+    counter = metrics.Counter('test_requests_total', 'Requests', ['path'], registry=registry)
+    histogram = metrics.Histogram('test_latency_seconds', 'Latency', buckets=(0.1, 1.0), registry=registry)
+    gauge = metrics.Gauge('test_depth', 'Depth', registry=registry)
+
+    counter.labels('/zones').inc()
+    counter.labels('/zones').inc(2)
+    counter.labels('/a"b').inc()
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5)
+    gauge.set_function(lambda: 7)
+
+    text = registry.generate_latest()
+    assert '# TYPE test_requests_total counter' in text
+    assert 'test_requests_total{path="/zones"} 3' in text
+    assert 'test_requests_total{path="/a\\"b"} 1' in text
+    assert 'test_latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{le="1"} 2' in text
+    assert 'test_latency_seconds_bucket{le="+Inf"} 3' in text
+    assert 'test_latency_seconds_count 3' in text
+    assert 'test_depth 7' in text
+
+
+@pytest.mark.asyncio
+async def test_hot_paths_are_instrumented(start_api):
+    tado_api, pairing = await start_api(seed=3)
+    queue = asyncio.Queue()
+    tado_api.event_listeners.append(queue)
+    client_id = metrics.register_sse_client(queue)
+
+    aid = 2
+    received = metrics.EVENTS_RECEIVED.labels(aid, 'CurrentTemperature').value
+    pairing.emit(aid, pairing.find_iid(aid, 'CurrentTemperature'), 24.2)
+    await asyncio.sleep(0.01)
+
+    text = metrics.generate_latest()
+    assert metrics.EVENTS_RECEIVED.labels(aid, 'CurrentTemperature').value == received + 1
+    assert f'tado_local_events_received_total{{aid="{aid}",characteristic="CurrentTemperature"}} {received + 1:g}' in text
+    assert 'tado_local_handle_change_seconds_count{result="changed"}' in text
+    assert f'tado_local_sse_queue_depth{{client="{client_id}"}} {queue.qsize()}' in text
+    assert 'tado_local_homekit_request_seconds_count{operation="get_characteristics"}' in text
+    assert 'tado_local_history_write_seconds_count' in text
+
+    queue.get_nowait()
+    metrics.sse_dequeued(queue)
+    metrics.unregister_sse_client(queue)
+    assert f'client="{client_id}"' not in metrics.generate_latest()
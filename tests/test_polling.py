@@ -0,0 +1,78 @@
+import asyncio
+import random
+
+import pytest
+
+from tado_local.polling import TIER_INTERVALS, AdaptivePollScheduler, importance
+from tado_local.simulator import SimulatedPairing
+from tado_local.state import DeviceStateManager
+
+
+def test_importance_tiers():
+    assert importance('00000035-0000-1000-8000-0026BB765291') == 'control'  # TargetTemperature
+    assert importance(DeviceStateManager.CHAR_CURRENT_HUMIDITY) == 'sensor'
+    assert importance('00000052-0000-1000-8000-0026bb765291') == 'static'  # FirmwareRevision
+
+
+def test_intervals_adapt_to_change_frequency():
+    tiers = {'target': 'control', 'firmware': 'static'}
+    scheduler = AdaptivePollScheduler(tiers, tiers.get, jitter=0.0, rng=random.Random(1), clock=lambda: 0.0)
+    low, initial, high = TIER_INTERVALS['control']
+    assert scheduler.interval('target') == initial
+    assert scheduler.next_deadline() <= TIER_INTERVALS['static'][1]
+
+    # The first round is spread over each initial interval
+    assert set(scheduler.pop_due(now=10_000, limit=10)) == {'target', 'firmware'}
+
+    scheduler.record('target', 20.0, now=0)
+    assert scheduler.interval('target') == initial  # first reading sets the baseline
+    scheduler.record('target', 21.0, now=0)
+    assert scheduler.interval('target') == initial / 2
+    for _ in range(20):
+        scheduler.record('target', 21.0, now=0)
+    assert scheduler.interval('target') == high
+
+    for _ in range(20):
+        scheduler.record('target', object(), now=0)
+    assert scheduler.interval('target') == low
+
+    # A failed read keeps the interval and reschedules
+    scheduler.record('firmware', None, now=0)
+    assert scheduler.interval('firmware') == TIER_INTERVALS['static'][1]
+
+
+def test_batch_size_follows_latency():
+    scheduler = AdaptivePollScheduler([], lambda key: 'sensor', target_latency=1.0, min_batch=5, max_batch=50)
+    scheduler.observe_latency(0.2, 10)  # 20 ms per characteristic
+    assert scheduler.batch_size == 50
+    for _ in range(20):
+        scheduler.observe_latency(5.0, 10)  # 500 ms per characteristic
+    assert scheduler.batch_size == 5
+
+
+@pytest.mark.asyncio
+async def test_polling_stops_once_events_resume(start_api):
+    pairing = SimulatedPairing.generate(num_zones=1, valves_per_zone=1, seed=3)
+    real_subscribe = pairing.subscribe
+    attempts = []
+
+    async def flaky_subscribe(characteristics):
+        attempts.append(len(attempts))
+        if len(attempts) == 1:
+            raise ConnectionError("bridge refused subscription")
+        await real_subscribe(characteristics)
+
+    pairing.subscribe = flaky_subscribe
+
+    tado_api, _ = await start_api(pairing=pairing, EVENT_RETRY_INTERVAL=0.05)
+    assert tado_api.poll_scheduler is not None
+    assert not tado_api.subscribed_characteristics
+
+    for _ in range(100):
+        if tado_api.poll_scheduler is None:
+            break
+        await asyncio.sleep(0.02)
+
+    assert tado_api.poll_scheduler is None
+    assert tado_api.subscribed_characteristics
+    assert len(attempts) == 2
@@ -0,0 +1,82 @@
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from tado_local.schedule import ScheduleEngine, parse_entries
+
+MONDAY = datetime(2026, 10, 19)
+
+
+def at(day: int, hour: int, minute: int = 0, second: int = 0) -> float:
+    return MONDAY.replace(day=MONDAY.day + day, hour=hour, minute=minute, second=second).timestamp()
+
+
+def test_parse_entries_validates():
+    assert parse_entries([{'day': 'Tuesday', 'time': '7:05', 'temperature': 20},
+                          {'day': 0, 'time': '22:00', 'temperature': 0}]) == [(0, '22:00', None), (1, '07:05', 20.0)]
+    for bad in ({'day': 7, 'time': '07:00'}, {'day': 'mon', 'time': '24:00'}, {'day': 'mon', 'time': '07:00', 'temperature': 3}):
+        with pytest.raises(ValueError):
+            parse_entries([bad])
+    with pytest.raises(ValueError, match="Duplicate"):
+        parse_entries([{'day': 0, 'time': '07:00'}, {'day': 'mon', 'time': '07:00', 'temperature': 20}])
+
+
+@pytest.mark.asyncio
+async def test_simultaneous_transitions_are_one_write(zoned_api):
+    tado_api, pairing = zoned_api
+    now = [at(0, 6, 59, 30)]
+    engine = ScheduleEngine(tado_api, clock=lambda: now[0])
+
+    engine.set_schedule(1, [{'day': 'mon', 'time': '07:00', 'temperature': 21.5},
+                            {'day': 'sun', 'time': '23:00', 'temperature': 16}])
+    engine.set_schedule(2, [{'day': 'mon', 'time': '07:00', 'temperature': 0}])
+    assert engine.next_due() == at(0, 7)
+    # Before Monday's first entry the previous week's last entry is in effect
+    assert engine.active_entry(1)['temperature'] == 16.0
+
+    writes = pairing.calls['put_characteristics']
+    assert await engine.apply_due() == {}
+
+    now[0] = at(0, 7)
+    assert await engine.apply_due() == {1: 21.5, 2: None}
+    assert pairing.calls['put_characteristics'] == writes + 1
+    assert pairing._chars[(2, pairing.find_iid(2, 'TargetTemperature'))]['value'] == 21.5
+    assert pairing._chars[(4, pairing.find_iid(4, 'TargetHeatingCoolingState'))]['value'] == 0
+
+    # Next transitions: zone 1 on Sunday evening, zone 2 a week later
+    assert engine.next_due() == at(6, 23)
+    assert engine.summary()['applied'] == 2
+
+    # Programs are persisted
+    reloaded = ScheduleEngine(tado_api, clock=lambda: now[0])
+    reloaded.load()
+    assert reloaded.get_schedule(1) == engine.get_schedule(1)
+    assert reloaded.get_schedule(1)[0] == {'day': 'mon', 'time': '07:00', 'temperature': 21.5}
+
+
+@pytest.mark.asyncio
+async def test_replaced_program_drops_pending_transition(zoned_api):
+    tado_api, pairing = zoned_api
+    now = [at(2, 12)]
+    engine = ScheduleEngine(tado_api, clock=lambda: now[0])
+
+    engine.set_schedule(1, [{'day': 'wed', 'time': '13:00', 'temperature': 22}])
+    engine.set_schedule(1, [{'day': 'wed', 'time': '18:00', 'temperature': 19}])
+    assert engine.next_due() == at(2, 18)
+
+    engine.set_schedule(1, [])
+    assert engine.next_due() is None and engine.get_schedule(1) == []
+
+
+@pytest.mark.asyncio
+async def test_setpoints_are_checked_against_leader_write_plan(zoned_api):
+    tado_api, pairing = zoned_api
+    engine = ScheduleEngine(tado_api)
+
+    # parse_entries allows up to 30°C, but the leader only accepts 5..25
+    with pytest.raises(ValueError, match="mon 07:00: .*outside"):
+        engine.set_schedule(1, [{'day': 'mon', 'time': '07:00', 'temperature': 28}])
+    assert engine.get_schedule(1) == []
+    with sqlite3.connect(tado_api.state_manager.db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM zone_schedules").fetchone()[0] == 0
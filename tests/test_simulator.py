@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+from tado_local.simulator import SimulatedPairing
+
+
+@pytest.mark.asyncio
+async def test_api_runs_against_simulated_bridge(start_api):
+    tado_api, pairing = await start_api(3, 2, seed=7)
+    manager = tado_api.state_manager
+    assert len(tado_api.accessories_cache) == 10
+    assert set(manager.device_id_cache) >= {'IB0000000001', 'RU0000000002', 'VA0000000003'}
+
+    # Baseline poll populated state for every thermostat
+    ru_id = manager.device_id_cache['RU0000000002']
+    assert manager.get_current_state(ru_id)['target_temperature'] == 20.0
+    assert pairing.subscriptions
+
+    # Device-side changes arrive as events
+    aid = manager.get_device_info(ru_id)['aid']
+    iid = pairing.find_iid(aid, 'CurrentTemperature')
+    pairing.emit(aid, iid, 23.4)
+    await asyncio.sleep(0.01)
+    assert manager.get_current_state(ru_id)['current_temperature'] == 23.4
+
+    # Writes go through put_characteristics and are echoed back as events
+    await tado_api.set_device_characteristics(ru_id, {'target_temperature': 18.5})
+    await asyncio.sleep(0.01)
+    assert manager.get_current_state(ru_id)['target_temperature'] == 18.5
+
+
+@pytest.mark.asyncio
+async def test_simulated_bridge_scales_and_generates_events():
+    pairing = SimulatedPairing.generate(num_zones=100, valves_per_zone=3, seed=1)
+    accessories = await pairing.list_accessories_and_characteristics()
+    assert len(accessories) == 401
+
+    received = []
+    pairing.dispatcher_connect(received.append)
+    keys = [(acc['aid'], char['iid']) for acc in accessories for svc in acc['services']
+            for char in svc['characteristics'] if 'ev' in char['perms']]
+    await pairing.subscribe(keys)
+
+    pairing.start_events(rate=1000)
+    await asyncio.sleep(0.1)
+    await pairing.stop_events()
+    assert 20 <= len(received) <= 200
@@ -0,0 +1,75 @@
+import asyncio
+import json
+import sqlite3
+
+import pytest
+
+from tado_local import database
+from tado_local.api import TadoLocalAPI
+from tado_local.cache import CharacteristicCacheSQLite
+
+
+def test_migrations_run_once_per_database(tmp_path, monkeypatch):
+    calls = []
+    real_migrate = database._migrate
+    monkeypatch.setattr(database, '_migrate', lambda path: calls.append(path) or real_migrate(path))
+
+    db_path = str(tmp_path / "once.db")
+    database.ensure_schema_and_migrate(db_path)
+    TadoLocalAPI(db_path)
+    CharacteristicCacheSQLite(db_path)
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_persisted_state_is_served_stale_until_baseline(tmp_path, start_api):
+    db_path = str(tmp_path / "warm.db")
+    first, _ = await start_api(seed=2, db_path=db_path)
+    await first.cleanup()
+
+    # Restart: persisted state is available before the bridge is connected
+    tado_api, pairing = await start_api(seed=2, db_path=db_path, initialize=False)
+    device_id = tado_api.state_manager.device_id_cache['RU0000000002']
+    assert tado_api.state_manager.get_current_state(device_id)['target_temperature'] == 20.0
+    assert tado_api.state_is_stale and not tado_api.is_ready
+
+    queue = asyncio.Queue()
+    tado_api.event_listeners.append(queue)
+
+    # The device changed while we were down
+    pairing.emit(2, pairing.find_iid(2, 'TargetTemperature'), 22.5)
+
+    await tado_api.initialize(pairing)
+    status = tado_api.startup_status()
+    assert status['ready'] and not status['state_stale']
+    assert all(status['phases'][name]['status'] == 'done' for name in TadoLocalAPI.READY_PHASES)
+
+    # Connected clients get the polled value without waiting for an event
+    events = [json.loads(queue.get_nowait()[len('data: '):]) for _ in range(queue.qsize())]
+    device_events = [e for e in events if e['type'] == 'device' and e['device_id'] == device_id]
+    assert device_events[-1]['state']['target_temp_c'] == 22.5
+    # The event change tracker (seeded concurrently from persisted state) has the polled value
+    assert tado_api.change_tracker['last_values'][(2, pairing.find_iid(2, 'TargetTemperature'))] == 22.5
+
+
+@pytest.mark.asyncio
+async def test_baseline_poll_batches_reads_and_history(tmp_path, start_api):
+    db_path = str(tmp_path / "baseline.db")
+    tado_api, pairing = await start_api(6, 2, seed=4, db_path=db_path)
+    polled = sum(len(chars) for chars in tado_api.device_to_characteristics.values())
+    expected_requests = -(-polled // TadoLocalAPI.BASELINE_BATCH_SIZE)
+
+    # Fresh state manager: every device changes, so every device needs a history row
+    tado_api.state_manager.current_state.clear()
+    tado_api.state_manager.last_saved_bucket.clear()
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("DELETE FROM device_state_history")
+    before = pairing.calls['get_characteristics']
+
+    await tado_api.initialize_device_states()
+
+    assert pairing.calls['get_characteristics'] - before == expected_requests
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute("SELECT device_id, COUNT(*) FROM device_state_history GROUP BY device_id").fetchall()
+    assert len(rows) == sum(1 for chars in tado_api.device_to_characteristics.values() if chars)
+    assert all(count == 1 for _, count in rows)
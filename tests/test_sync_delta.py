@@ -0,0 +1,147 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from tado_local import sync as sync_module
+from tado_local.api import TadoLocalAPI
+from tado_local.state import DeviceStateManager
+from tado_local.sync import TadoCloudSync
+
+
+ZONES = [
+    {'id': 1, 'name': 'Living', 'type': 'HEATING', 'devices': [
+        {'serialNo': 'RU0000000001', 'deviceType': 'RU02', 'currentFwVersion': '1.0',
+         'batteryState': 'NORMAL', 'duties': ['ZONE_LEADER', 'ZONE_UI']},
+        {'serialNo': 'VA0000000002', 'deviceType': 'VA02', 'currentFwVersion': '2.0',
+         'batteryState': 'NORMAL', 'duties': []},
+    ]},
+    {'id': 2, 'name': 'Bedroom', 'type': 'HEATING', 'devices': [
+        {'serialNo': 'VA0000000003', 'deviceType': 'VA02', 'currentFwVersion': '2.0',
+         'batteryState': 'LOW', 'duties': ['ZONE_LEADER']},
+    ]},
+]
+
+DEVICE_LIST = {'entries': [
+    {'device': {'serialNo': 'VA0000000003', 'deviceType': 'VA02', 'currentFwVersion': '2.0',
+                'batteryState': 'LOW'}, 'zone': {'discriminator': 2}},
+]}
+
+
+def test_zone_sync_patches_caches_and_skips_unchanged(tmp_path, monkeypatch):
+    db_file = str(tmp_path / "sync.db")
+    manager = DeviceStateManager(db_file)
+    sync = TadoCloudSync(db_file, manager)
+
+    assert sync.sync_zones(ZONES, home_id=42)
+
+    # Caches are patched in place, without a reload
+    zones = {z['name']: z for z in manager.zone_cache.values()}
+    assert set(zones) == {'Living', 'Bedroom'}
+    living_leader = manager.device_id_cache['RU0000000001']
+    assert zones['Living']['leader_device_id'] == living_leader
+    assert zones['Living']['leader_serial'] == 'RU0000000001'
+    assert manager.device_info_cache[living_leader]['zone_name'] == 'Living'
+    assert manager.device_info_cache[manager.device_id_cache['VA0000000003']]['battery_state'] == 'LOW'
+
+    # Caches match what a fresh load from the database produces
+    fresh = DeviceStateManager(db_file)
+    for zone_id, zone in fresh.zone_cache.items():
+        assert manager.zone_cache[zone_id] == zone
+
+    # Unchanged payloads never open a database connection
+    connects = []
+    real_connect = sqlite3.connect
+    monkeypatch.setattr(sync_module.sqlite3, 'connect', lambda *a, **k: connects.append(a) or real_connect(*a, **k))
+    assert sync.sync_zones(ZONES, home_id=42)
+    assert sync.sync_device_list(DEVICE_LIST, home_id=42)
+    assert connects == []
+
+
+def test_zone_sync_writes_only_changes(tmp_path):
+    db_file = str(tmp_path / "sync.db")
+    manager = DeviceStateManager(db_file)
+    sync = TadoCloudSync(db_file, manager)
+    assert sync.sync_zones(ZONES, home_id=42)
+
+    renamed = [dict(ZONES[0], name='Lounge')]
+    assert sync.sync_zones(renamed, home_id=42)
+
+    names = sorted(z['name'] for z in manager.zone_cache.values())
+    assert names == ['Lounge']
+
+    conn = sqlite3.connect(db_file)
+    rows = conn.execute("SELECT name FROM zones ORDER BY zone_id").fetchall()
+    conn.close()
+    assert rows == [('Lounge',)]
+
+
+@pytest.mark.asyncio
+async def test_zone_states_apply_as_one_batch(tmp_path):
+    db_file = str(tmp_path / "sync.db")
+    api = TadoLocalAPI(db_file)
+    manager = api.state_manager
+    sync = TadoCloudSync(db_file, manager)
+    assert sync.sync_zones(ZONES, home_id=42)
+
+    # Wire up HomeKit humidity characteristics as setup_event_listeners would
+    for aid, device_id in enumerate(manager.device_info_cache, start=2):
+        api.device_to_characteristics[device_id] = [(aid, 10, manager.CHAR_CURRENT_HUMIDITY)]
+    api.change_tracker = {'events_received': 0, 'polling_changes': 0, 'last_values': {}}
+    zone_listener = asyncio.Queue()
+    api.zone_event_listeners.append(zone_listener)
+
+    zone_states = {'zoneStates': {
+        '1': {'setting': {'type': 'HEATING'}, 'sensorDataPoints': {'humidity': {'percentage': 48.2}}},
+        '2': {'setting': {'type': 'HEATING'}, 'sensorDataPoints': {}},
+    }}
+    assert await sync.sync_zone_states_data(zone_states, home_id=42, tado_api=api)
+
+    living_ids = manager.get_devices_by_tado_zone(1)
+    assert len(living_ids) == 2
+    for device_id in living_ids:
+        assert manager.get_current_state(device_id)['humidity'] == 48.2
+    # Two devices changed in the zone, but the zone is broadcast once
+    assert zone_listener.qsize() == 1
+
+    # Same values again: nothing changes, nothing is broadcast
+    assert await api.apply_state_batch([(d, 'CurrentRelativeHumidity', 48.2) for d in living_ids]) == 0
+    assert zone_listener.qsize() == 1
+
+
+def test_zone_sync_assigns_new_leader_to_existing_zone(tmp_path):
+    db_file = str(tmp_path / "sync.db")
+    manager = DeviceStateManager(db_file)
+    sync = TadoCloudSync(db_file, manager)
+    leaderless = [dict(ZONES[1], devices=[dict(ZONES[1]['devices'][0], duties=[])])]
+    assert sync.sync_zones(leaderless, home_id=42)
+    zone_id = next(iter(manager.zone_cache))
+    assert manager.zone_cache[zone_id]['leader_device_id'] is None
+
+    # The leader is a device the catalog has not seen yet
+    new_leader = {'serialNo': 'RU0000000009', 'deviceType': 'RU02', 'currentFwVersion': '1.0',
+                  'batteryState': 'NORMAL', 'duties': ['ZONE_LEADER']}
+    assert sync.sync_zones([dict(ZONES[1], devices=[new_leader])], home_id=42)
+
+    leader_id = manager.device_id_cache['RU0000000009']
+    assert manager.zone_cache[zone_id]['leader_device_id'] == leader_id
+    conn = sqlite3.connect(db_file)
+    assert conn.execute("SELECT leader_device_id FROM zones WHERE zone_id = ?", (zone_id,)).fetchone()[0] == leader_id
+    conn.close()
+
+
+def test_device_cache_reload_rebuilds_tado_zone_index(tmp_path):
+    db_file = str(tmp_path / "sync.db")
+    manager = DeviceStateManager(db_file)
+    sync = TadoCloudSync(db_file, manager)
+    assert sync.sync_zones(ZONES, home_id=42)
+    living = next(zone_id for zone_id, zone in manager.zone_cache.items() if zone['tado_zone_id'] == 1)
+
+    # A HomeKit-only device assigned to a zone over REST reloads the device cache
+    conn = sqlite3.connect(db_file)
+    conn.execute("INSERT INTO devices (serial_number, device_type, zone_id) VALUES ('VA0000000077', 'valve', ?)", (living,))
+    conn.commit()
+    conn.close()
+    manager._load_device_cache()
+
+    assert manager.device_id_cache['VA0000000077'] in manager.get_devices_by_tado_zone(1)
@@ -0,0 +1,92 @@
+import asyncio
+import io
+import json
+import logging
+
+import pytest
+from fastapi import FastAPI
+
+from tado_local import tracing
+
+
+def read_spans(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+@pytest.fixture
+def span_file(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    tracing.configure('file', str(path))
+    yield path
+    tracing.shutdown()
+
+
+def test_disabled_tracing_is_a_noop():
+    assert not tracing.enabled()
+    with tracing.span('anything', x=1) as span:
+        span.set_attribute('y', 2)
+    assert tracing.current_ids() is None
+
+
+@pytest.mark.asyncio
+async def test_echoed_event_joins_the_write_trace(span_file, start_api):
+    tado_api, pairing = await start_api(echo_writes=False, seed=5)
+    device_id = tado_api.state_manager.device_id_cache['RU0000000002']
+    with tracing.span('request') as root:
+        await tado_api.set_device_characteristics(device_id, {'target_temperature': 18.5})
+
+    # The bridge reports the new value later, outside the request
+    pairing.emit(2, pairing.find_iid(2, 'TargetTemperature'), 18.5)
+    await asyncio.sleep(0.01)
+
+    spans = read_spans(span_file)
+    by_name = {span['name']: span for span in spans}
+    put = by_name['homekit.put_characteristics']
+    assert put['trace_id'] == root.trace_id
+    assert put['parent_id'] == root.span_id
+
+    echo = [s for s in spans if s['name'] == 'homekit.change' and s['trace_id'] == root.trace_id]
+    assert echo and echo[0]['attributes']['source'] == 'EVENT'
+    assert any(s['name'] == 'sqlite.history_write' and s['parent_id'] == echo[0]['span_id'] for s in spans)
+
+
+@pytest.mark.asyncio
+async def test_http_requests_get_a_span_and_trace_header(span_file):
+    app = FastAPI()
+    app.add_middleware(tracing.TracingMiddleware)
+
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(tracing.TraceLogFormatter(logging.Formatter('%(message)s')))
+    log = logging.getLogger('tests.tracing')
+    log.addHandler(handler)
+
+    @app.get("/zones/{zone_id}")
+    async def zone(zone_id: int):
+        log.warning(f"zone {zone_id}")
+        return {'zone_id': zone_id}
+
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': '/zones/3', 'raw_path': b'/zones/3', 'query_string': b'',
+        'root_path': '', 'headers': [(b'host', b'localhost')], 'client': ('127.0.0.1', 1), 'server': ('localhost', 80),
+    }
+    try:
+        await app(scope, receive, send)
+    finally:
+        log.removeHandler(handler)
+
+    headers = dict(messages[0]['headers'])
+    [span] = read_spans(span_file)
+    assert span['name'] == 'GET /zones/{zone_id}'
+    assert span['attributes']['http.status_code'] == 200
+    assert headers[b'x-trace-id'].decode() == span['trace_id']
+    assert stream.getvalue().strip() == f"zone 3 trace_id={span['trace_id']} span_id={span['span_id']}"
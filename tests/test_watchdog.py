@@ -0,0 +1,64 @@
+import asyncio
+import time
+
+import pytest
+
+from tado_local.api import TadoLocalAPI
+
+
+@pytest.mark.asyncio
+async def test_watchdog_detects_silent_event_loss(start_api):
+    tado_api, pairing = await start_api(2, 1, seed=5)
+    watchdog = tado_api.event_watchdog
+    assert watchdog is not None and watchdog.verify_chars
+    assert await watchdog.check_once() == []
+
+    # The bridge silently drops our subscriptions; a change arrives without an event
+    aid, iid = next(iter(watchdog.verify_chars.values()))
+    pairing.subscriptions.clear()
+    pairing.emit(aid, iid, 12.5)
+    tado_api.accessory_last_event[aid] = time.time() - 60
+
+    subscribe_calls = pairing.calls['subscribe']
+    assert await watchdog.check_once() == [aid]
+    assert tado_api.change_tracker['last_values'][(aid, iid)] == 12.5
+    assert pairing.calls['subscribe'] == subscribe_calls + 1
+    assert (aid, iid) in pairing.subscriptions
+    assert aid in watchdog.targeted
+    assert watchdog.summary()['divergences'] == 1
+
+    # Events flow again for the accessory: targeted polling ends
+    pairing.emit(aid, iid, 13.0)
+    await asyncio.sleep(0)
+    await watchdog.check_once()
+    assert aid not in watchdog.targeted
+
+
+@pytest.mark.asyncio
+async def test_device_freshness(start_api):
+    tado_api, pairing = await start_api(seed=6)
+    device_id = tado_api.state_manager.device_id_cache['RU0000000002']
+    freshness = tado_api.device_freshness(device_id)
+    assert not freshness['stale'] and freshness['age_seconds'] < 5
+
+    aid = tado_api.state_manager.get_device_info(device_id)['aid']
+    tado_api.accessory_last_seen[aid] = time.time() - TadoLocalAPI.STALE_AFTER - 1
+    assert tado_api.device_freshness(device_id)['stale']
+
+
+@pytest.mark.asyncio
+async def test_config_change_resubscribes_and_rebuilds_watchdog(start_api):
+    tado_api, pairing = await start_api(seed=5, config_num=1)
+    watchdog = tado_api.event_watchdog
+    assert watchdog.verify_chars[2] == (2, 12)
+
+    # The bridge renumbers CurrentTemperature and announces a new c#
+    char = pairing._chars.pop((2, 12))
+    char['iid'] = 40
+    pairing._chars[(2, 40)] = char
+    assert await tado_api.handle_config_change(2)
+
+    assert (2, 40) in pairing.subscriptions and (2, 40) in tado_api.subscribed_characteristics
+    assert (2, 12) not in tado_api.subscribed_characteristics
+    assert watchdog.verify_chars[2] == (2, 40)
+    assert (2, 12) not in watchdog.accessory_chars[2]
@@ -0,0 +1,124 @@
+import asyncio
+import json
+
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+
+from tado_local.routes import register_routes
+
+
+class FakeWebSocket:
+    """Scripted stand-in for a Starlette WebSocket."""
+
+    def __init__(self):
+        self.incoming = asyncio.Queue()
+        self.sent = asyncio.Queue()
+        self.accepted = False
+        self.closed = None
+
+    async def accept(self):
+        self.accepted = True
+
+    async def close(self, code=1000, reason=None):
+        self.closed = code
+        await self.incoming.put({'type': 'websocket.disconnect'})
+
+    async def receive(self):
+        return await self.incoming.get()
+
+    async def send_text(self, text):
+        await self.sent.put(json.loads(text))
+
+    async def request(self, **message):
+        await self.incoming.put({'type': 'websocket.receive', 'text': json.dumps(message)})
+
+    async def next(self, predicate=lambda m: True):
+        while True:
+            message = await asyncio.wait_for(self.sent.get(), timeout=2)
+            if predicate(message):
+                return message
+
+
+@pytest_asyncio.fixture
+async def session(start_api, assign_zones):
+    tado_api, pairing = await start_api(1, 1, seed=4, WRITE_DEBOUNCE=0.0)
+    assign_zones(tado_api, {1: ('Living', 2, (2, 3))})
+
+    app = FastAPI()
+    register_routes(app, lambda: tado_api)
+    endpoint = next(r.endpoint for r in app.routes if getattr(r, 'path', None) == '/ws')
+    websocket = FakeWebSocket()
+    task = asyncio.create_task(endpoint(websocket, format=None, api_key=None))
+
+    yield websocket, tado_api, pairing
+    await tado_api.cleanup()
+    await asyncio.wait_for(task, timeout=2)
+
+
+@pytest.mark.asyncio
+async def test_subscribe_snapshot_and_events(session):
+    websocket, tado_api, pairing = session
+    await websocket.request(id='a', op='subscribe', types=['zone'], snapshot=True)
+    response = await websocket.next()
+    assert websocket.accepted
+    assert response['id'] == 'a' and response['ok']
+    assert [zone['zone_id'] for zone in response['result']['snapshot']['zones']] == [1]
+    assert 'devices' not in response['result']['snapshot']
+
+    # A temperature change reaches the subscriber as a zone event (device events are filtered out)
+    iid = pairing.find_iid(2, 'CurrentTemperature')
+    await tado_api.handle_change(2, iid, {'value': 17.3}, source="EVENT")
+    event = await websocket.next(lambda m: 'type' in m)
+    assert event['type'] == 'zone' and event['state']['cur_temp_c'] == 17.3
+
+
+@pytest.mark.asyncio
+async def test_delta_subscription(session):
+    websocket, tado_api, pairing = session
+    iid = pairing.find_iid(3, 'CurrentTemperature')
+    await tado_api.handle_change(3, iid, {'value': 16.0}, source="EVENT")
+
+    await websocket.request(id=1, op='subscribe', types=['device'], format='delta')
+    response = await websocket.next()
+    keyframes = {event['device_id']: event for event in response['result']['keyframes']}
+    assert keyframes[3]['state']['cur_temp_c'] == 16.0
+
+    await tado_api.handle_change(3, iid, {'value': 16.5}, source="EVENT")
+    event = await websocket.next(lambda m: 'type' in m)
+    assert event['device_id'] == 3 and event['delta']['cur_temp_c'] == 16.5
+    assert event['seq'] > keyframes[3]['seq']
+
+
+@pytest.mark.asyncio
+async def test_commands_are_answered_with_their_id(session):
+    websocket, tado_api, pairing = session
+    await websocket.request(id=1, op='set_zone', zone_id=1, temperature=19.5)
+    await websocket.request(id=2, op='set_zone', zone_id=42, temperature=19.5)
+    await websocket.request(id=3, op='nonsense')
+    await websocket.request(id=4, op='set_zone')
+
+    responses = {}
+    for _ in range(4):
+        response = await websocket.next()
+        responses[response['id']] = response
+
+    assert responses[1]['ok'] and responses[1]['result']['applied']['target_temperature'] == 19.5
+    assert pairing._chars[(2, pairing.find_iid(2, 'TargetTemperature'))]['value'] == 19.5
+    assert responses[2]['error']['status'] == 404
+    assert responses[3]['error']['status'] == 400
+    assert responses[4]['error']['status'] == 400
+
+
+@pytest.mark.asyncio
+async def test_msgpack_frames(session):
+    msgpack = pytest.importorskip("msgpack")
+    websocket, tado_api, pairing = session
+    replies = []
+    websocket.send_bytes = lambda data: asyncio.sleep(0, replies.append(msgpack.unpackb(data)))
+    await websocket.incoming.put({'type': 'websocket.receive', 'bytes': msgpack.packb({'id': 9, 'op': 'ping'})})
+    for _ in range(100):
+        if replies:
+            break
+        await asyncio.sleep(0.01)
+    assert replies == [{'id': 9, 'ok': True, 'result': 'pong'}]
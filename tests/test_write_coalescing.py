@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from tado_local import metrics
+
+
+@pytest.mark.asyncio
+async def test_burst_of_writes_becomes_one_put(start_api):
+    tado_api, pairing = await start_api(seed=7, WRITE_DEBOUNCE=0.05)
+    device_id = tado_api.state_manager.device_id_cache['RU0000000002']
+    writes = pairing.calls['put_characteristics']
+    coalesced = metrics.WRITES_COALESCED.labels().value
+
+    calls = [tado_api.set_device_characteristics(device_id, {'target_temperature': t}) for t in (19.0, 19.5, 20.0)]
+    calls.append(tado_api.set_device_characteristics(device_id, {'target_heating_cooling_state': 1}))
+    results = await asyncio.gather(*calls)
+
+    assert pairing.calls['put_characteristics'] == writes + 1
+    assert metrics.WRITES_COALESCED.labels().value == coalesced + 3
+    # Every caller gets the merged values that were written
+    assert all(r == {'target_temperature': 20.0, 'target_heating_cooling_state': 1} for r in results)
+    assert pairing._chars[(2, pairing.find_iid(2, 'TargetTemperature'))]['value'] == 20.0
+
+
+@pytest.mark.asyncio
+async def test_queued_write_returns_immediately_and_flushes_on_cleanup(start_api):
+    tado_api, pairing = await start_api(seed=7, WRITE_DEBOUNCE=10.0)
+    device_id = tado_api.state_manager.device_id_cache['RU0000000002']
+    writes = pairing.calls['put_characteristics']
+
+    queued = await tado_api.set_device_characteristics(device_id, {'target_heating_cooling_state': 0}, wait=False)
+    queued = await tado_api.set_device_characteristics(device_id, {'target_temperature': 17.0}, wait=False)
+    assert queued == {'target_heating_cooling_state': 0, 'target_temperature': 17.0}
+    assert pairing.calls['put_characteristics'] == writes
+
+    # The optimistic state shows both queued fields right away
+    state = tado_api.state_manager.get_state_with_optimistic(device_id)
+    assert state['target_heating_cooling_state'] == 0 and state['target_temperature'] == 17.0
+
+    with pytest.raises(ValueError):
+        await tado_api.set_device_characteristics(device_id, {'not_a_field': 1}, wait=False)
+
+    await tado_api.cleanup()
+    assert pairing.calls['put_characteristics'] == writes + 1
+    assert pairing._chars[(2, pairing.find_iid(2, 'TargetTemperature'))]['value'] == 17.0
+
+
+@pytest.mark.asyncio
+async def test_one_off_write_is_sent_without_debounce(start_api):
+    tado_api, pairing = await start_api(seed=7, WRITE_DEBOUNCE=10.0)
+    device_id = tado_api.state_manager.device_id_cache['RU0000000002']
+    writes = pairing.calls['put_characteristics']
+    await asyncio.wait_for(tado_api.set_device_characteristics(device_id, {'target_temperature': 18.0}), 1.0)
+    assert pairing.calls['put_characteristics'] == writes + 1
+
+    # A write right after it is part of a burst and waits for the debounce delay
+    await tado_api.set_device_characteristics(device_id, {'target_temperature': 18.5}, wait=False)
+    await asyncio.sleep(0.01)
+    assert pairing.calls['put_characteristics'] == writes + 1 and device_id in tado_api.pending_writes
+
+
+@pytest.mark.asyncio
+async def test_failed_queued_writes_complete_and_clear_optimistic_state(start_api):
+    tado_api, pairing = await start_api(seed=7, WRITE_DEBOUNCE=10.0, config_num=1)
+    device_id = tado_api.state_manager.device_id_cache['RU0000000002']
+    iid = pairing.find_iid(2, 'TargetTemperature')
+    actual = tado_api.state_manager.get_current_state(device_id)['target_temperature']
+
+    # The bridge rejects the write: the caller gets the error
+    pairing._chars[(2, iid)]['perms'].remove('pw')
+    with pytest.raises(RuntimeError, match="rejected"):
+        await asyncio.wait_for(tado_api.set_device_characteristics(device_id, {'target_temperature': 19.0}), 1.0)
+    assert tado_api.state_manager.get_state_with_optimistic(device_id)['target_temperature'] == actual
+
+    # The configuration changes while a write is queued: the waiting caller is not left hanging
+    queued = asyncio.create_task(tado_api.set_device_characteristics(device_id, {'target_temperature': 19.5}))
+    await asyncio.sleep(0)
+    assert device_id in tado_api.pending_writes
+    tado_api.config_num = 2
+    await tado_api.flush_pending_writes()
+    with pytest.raises(ValueError, match="configuration changed"):
+        await asyncio.wait_for(queued, 1.0)
+    assert tado_api.state_manager.get_state_with_optimistic(device_id)['target_temperature'] == actual
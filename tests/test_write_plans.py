@@ -0,0 +1,93 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from zeroconf import ServiceStateChange
+
+from tado_local.api import BridgeUnavailableError
+from tado_local.bridge import TadoBridge
+
+
+@pytest.mark.asyncio
+async def test_write_plan_built_from_accessory_metadata(start_api):
+    tado_api, pairing = await start_api(1, 1, seed=9, WRITE_DEBOUNCE=0.0, config_num=1)
+    device_id = tado_api.state_manager.device_id_cache['RU0000000002']
+    plan = tado_api.write_plans[device_id]
+    assert set(plan) == {'target_temperature', 'target_heating_cooling_state'}
+    assert plan['target_temperature'] == {
+        'aid': 2, 'iid': pairing.find_iid(2, 'TargetTemperature'), 'format': 'float',
+        'min': 5, 'max': 25, 'step': 0.1, 'valid': None,
+    }
+    # The bridge has no writable fields
+    assert tado_api.state_manager.device_id_cache['IB0000000001'] not in tado_api.write_plans
+
+    # Values are snapped to minStep before they are written
+    written = await tado_api.set_device_characteristics(device_id, {'target_temperature': 21.04})
+    assert written == {'target_temperature': 21.0}
+
+    writes = pairing.calls['put_characteristics']
+    with pytest.raises(ValueError, match="outside"):
+        await tado_api.set_device_characteristics(device_id, {'target_temperature': 28})
+    with pytest.raises(ValueError, match="not supported"):
+        await tado_api.set_device_characteristics(device_id, {'target_heating_cooling_state': 2})
+    with pytest.raises(ValueError, match="whole number"):
+        await tado_api.set_device_characteristics(device_id, {'target_heating_cooling_state': 1.5})
+    with pytest.raises(ValueError):
+        await tado_api.set_characteristics_bulk({device_id: {'target_temperature': 'warm'}})
+    assert pairing.calls['put_characteristics'] == writes
+
+
+@pytest.mark.asyncio
+async def test_config_change_rebuilds_write_plans(start_api):
+    tado_api, pairing = await start_api(seed=9, config_num=1)
+    device_id = tado_api.state_manager.device_id_cache['RU0000000002']
+    assert not await tado_api.handle_config_change(1)
+
+    # Plans built for an older configuration are not used
+    tado_api.config_num = 2
+    with pytest.raises(ValueError, match="configuration changed"):
+        await tado_api.set_device_characteristics(device_id, {'target_temperature': 20.0})
+    tado_api.config_num = 1
+
+    downloads = pairing.calls['list_accessories_and_characteristics']
+    assert await tado_api.handle_config_change(2)
+    assert pairing.calls['list_accessories_and_characteristics'] == downloads + 1
+    assert tado_api.write_plans_config_num == 2 and device_id in tado_api.write_plans
+
+
+@pytest.mark.asyncio
+async def test_failed_config_change_keeps_previous_configuration(monkeypatch, start_api):
+    tado_api, pairing = await start_api(seed=9, WRITE_DEBOUNCE=0.0, config_num=1)
+    device_id = tado_api.state_manager.device_id_cache['RU0000000002']
+    monkeypatch.setattr(pairing, 'list_accessories_and_characteristics', AsyncMock(side_effect=OSError("unreachable")))
+    with pytest.raises(BridgeUnavailableError):
+        await tado_api.handle_config_change(2)
+
+    # Writes keep working, and the same c# is applied again on the next announcement
+    assert tado_api.config_num == 1
+    assert await tado_api.set_device_characteristics(device_id, {'target_temperature': 20.0})
+    monkeypatch.undo()
+    assert await tado_api.handle_config_change(2)
+    assert tado_api.write_plans_config_num == 2
+
+
+@pytest.mark.asyncio
+async def test_watch_config_num_retries_failed_changes():
+    registered = []
+
+    def browser(zeroconf, service_type, **kwargs):
+        registered.extend(kwargs['handlers'])
+        return MagicMock(async_cancel=AsyncMock())
+
+    on_change = AsyncMock(side_effect=[RuntimeError("download failed"), True])
+    with patch('tado_local.bridge.AsyncZeroconf', MagicMock(return_value=AsyncMock())), \
+            patch('zeroconf.asyncio.AsyncServiceBrowser', side_effect=browser), \
+            patch.object(TadoBridge, '_resolve_config_num', AsyncMock(return_value=7)):
+        watcher = asyncio.create_task(TadoBridge.watch_config_num('AA:BB', on_change, retry_interval=0.01))
+        await asyncio.sleep(0)
+        registered[0](None, "_hap._tcp.local.", "Tado Bridge._hap._tcp.local.", ServiceStateChange.Updated)
+        await asyncio.sleep(0.05)
+        watcher.cancel()
+        await asyncio.gather(watcher, return_exceptions=True)
+
+    assert [call.args for call in on_change.await_args_list] == [(7,), (7,)]